@@ -0,0 +1,45 @@
+"""Add document_jobs table
+
+Revision ID: 5626015246fb
+Revises: 0805289f0150
+Create Date: 2026-10-19 10:12:41.208114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5626015246fb'
+down_revision: Union[str, None] = '0805289f0150'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('document_jobs',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('room_id', sa.String(length=50), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('source_lang', sa.String(length=10), nullable=False),
+    sa.Column('target_lang', sa.String(length=10), nullable=False),
+    sa.Column('context', sa.String(length=20), nullable=True),
+    sa.Column('original_text', sa.Text(), nullable=False),
+    sa.Column('translated_text', sa.Text(), nullable=True),
+    sa.Column('total_chunks', sa.Integer(), nullable=True),
+    sa.Column('completed_chunks', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['room_id'], ['chat_rooms.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_document_jobs_room_id', 'document_jobs', ['room_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_document_jobs_room_id', table_name='document_jobs')
+    op.drop_table('document_jobs')
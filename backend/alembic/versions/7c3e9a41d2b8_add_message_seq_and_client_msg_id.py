@@ -0,0 +1,34 @@
+"""Add message seq and client_msg_id
+
+Revision ID: 7c3e9a41d2b8
+Revises: 5626015246fb
+Create Date: 2026-10-19 14:05:12.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e9a41d2b8'
+down_revision: Union[str, None] = '5626015246fb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('messages', sa.Column('seq', sa.BigInteger(), nullable=True))
+    op.add_column('messages', sa.Column('client_msg_id', sa.String(length=64), nullable=True))
+    # 기존 메시지는 id를 seq로 사용 (서버 발급 ID보다 항상 작아 순서 유지)
+    op.execute("UPDATE messages SET seq = id WHERE seq IS NULL")
+    op.create_unique_constraint('uq_messages_seq', 'messages', ['seq'])
+    op.create_index('idx_messages_room_seq', 'messages', ['room_id', 'seq'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_messages_room_seq', table_name='messages')
+    op.drop_constraint('uq_messages_seq', 'messages', type_='unique')
+    op.drop_column('messages', 'client_msg_id')
+    op.drop_column('messages', 'seq')
@@ -0,0 +1,34 @@
+"""Add agent languages and dispatch indexes
+
+Revision ID: b41f7d2e9c60
+Revises: 7c3e9a41d2b8
+Create Date: 2026-10-19 16:42:37.105822
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41f7d2e9c60'
+down_revision: Union[str, None] = '7c3e9a41d2b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('agents', sa.Column('languages', sa.JSON(), nullable=True))
+    # scripts/create_indexes.sql로 이미 만든 환경이 있어 IF NOT EXISTS
+    op.execute("CREATE INDEX IF NOT EXISTS idx_chat_rooms_agent_status ON chat_rooms (agent_id, status)")
+    op.create_index(
+        'idx_chat_rooms_waiting', 'chat_rooms', ['customer_language', 'created_at'],
+        postgresql_where=sa.text("status = 'waiting' AND agent_id IS NULL")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_chat_rooms_waiting', table_name='chat_rooms')
+    # idx_chat_rooms_agent_status는 초기 인덱스 스크립트에도 있으므로 유지
+    op.drop_column('agents', 'languages')
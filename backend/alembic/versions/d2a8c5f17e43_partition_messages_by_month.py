@@ -0,0 +1,140 @@
+"""Partition messages by month and add chat_rooms.archived_at
+
+Revision ID: d2a8c5f17e43
+Revises: b41f7d2e9c60
+Create Date: 2026-10-19 18:20:54.631907
+
+messages를 seq(시간순 메시지 ID) 범위로 월별 파티션된 테이블로 다시 만듭니다.
+seq가 파티션 키이므로 기존 UNIQUE(seq)/ON CONFLICT(seq)를 그대로 사용할 수 있습니다.
+
+- messages_legacy: 이번 달 이전 메시지 (seq = id로 채운 기존 메시지 포함)
+- messages_pYYYY_MM: 이번 달부터 3개월 (이후는 app/services/message_archive.py가 미리 생성)
+- messages_default: 파티션이 없는 범위 (정상 운영 시 비어 있음)
+
+기존 행을 새 테이블로 복사하므로 메시지가 많으면 점검 시간에 실행하세요.
+"""
+from datetime import datetime
+import calendar
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a8c5f17e43'
+down_revision: Union[str, None] = 'b41f7d2e9c60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# app/services/message_ids.py와 같은 값 (마이그레이션은 앱 코드 변경과 무관하게 유지)
+EPOCH_MS = 1735689600000
+ID_SHIFT = 12
+MONTHS_AHEAD = 3
+
+COLUMNS = (
+    "id, seq, client_msg_id, room_id, sender_type, sender_id, original_text, "
+    "translated_text, source_lang, target_lang, created_at, extra_data"
+)
+# seq가 비어 있는 행은 id로 채움 (파티션 키는 NOT NULL)
+SELECT_COLUMNS = COLUMNS.replace("seq,", "COALESCE(seq, id),", 1)
+
+
+def _month_floor(year: int, month: int) -> int:
+    """해당 월 1일 0시(UTC) 이후 발급되는 seq의 하한"""
+    ms = calendar.timegm((year, month, 1, 0, 0, 0)) * 1000
+    return max(ms - EPOCH_MS, 0) << ID_SHIFT
+
+
+def _next_month(year: int, month: int):
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def upgrade() -> None:
+    op.add_column('chat_rooms', sa.Column('archived_at', sa.DateTime(), nullable=True))
+    # 보관 대상 조회 (종료 후 보관 전인 방)
+    op.create_index(
+        'idx_chat_rooms_archivable', 'chat_rooms', ['ended_at'],
+        postgresql_where=sa.text("status = 'ended' AND archived_at IS NULL")
+    )
+
+    op.execute("ALTER SEQUENCE messages_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE messages RENAME TO messages_unpartitioned")
+    op.execute("""
+        CREATE TABLE messages (
+            id INTEGER NOT NULL DEFAULT nextval('messages_id_seq'),
+            seq BIGINT NOT NULL,
+            client_msg_id VARCHAR(64),
+            room_id VARCHAR(50) NOT NULL REFERENCES chat_rooms (id),
+            sender_type VARCHAR(20) NOT NULL,
+            sender_id VARCHAR(50),
+            original_text TEXT NOT NULL,
+            translated_text TEXT,
+            source_lang VARCHAR(10) NOT NULL,
+            target_lang VARCHAR(10),
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            extra_data JSON
+        ) PARTITION BY RANGE (seq)
+    """)
+
+    now = datetime.utcnow()
+    year, month = now.year, now.month
+    op.execute(
+        f"CREATE TABLE messages_legacy PARTITION OF messages "
+        f"FOR VALUES FROM (MINVALUE) TO ({_month_floor(year, month)})"
+    )
+    for _ in range(MONTHS_AHEAD + 1):
+        next_year, next_month = _next_month(year, month)
+        op.execute(
+            f"CREATE TABLE messages_p{year:04d}_{month:02d} PARTITION OF messages "
+            f"FOR VALUES FROM ({_month_floor(year, month)}) TO ({_month_floor(next_year, next_month)})"
+        )
+        year, month = next_year, next_month
+    op.execute("CREATE TABLE messages_default PARTITION OF messages DEFAULT")
+
+    op.execute(
+        f"INSERT INTO messages ({COLUMNS}) "
+        f"SELECT {SELECT_COLUMNS} FROM messages_unpartitioned"
+    )
+    op.execute("DROP TABLE messages_unpartitioned")
+
+    # 파티션 키(seq)를 포함해야 하므로 PK는 (id, seq)
+    op.execute("ALTER TABLE messages ADD CONSTRAINT messages_pkey PRIMARY KEY (id, seq)")
+    op.execute("ALTER TABLE messages ADD CONSTRAINT uq_messages_seq UNIQUE (seq)")
+    op.create_index('idx_messages_room_seq', 'messages', ['room_id', 'seq'])
+    op.create_index('idx_messages_created_at', 'messages', ['created_at'])
+    op.execute("ALTER SEQUENCE messages_id_seq OWNED BY messages.id")
+
+
+def downgrade() -> None:
+    # 보관(archival)된 메시지는 보관 파일에만 있으므로 되돌리지 않음
+    op.execute("ALTER SEQUENCE messages_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE messages RENAME TO messages_partitioned")
+    op.execute("ALTER TABLE messages_partitioned RENAME CONSTRAINT messages_pkey TO messages_partitioned_pkey")
+    op.execute("ALTER TABLE messages_partitioned RENAME CONSTRAINT uq_messages_seq TO uq_messages_partitioned_seq")
+    op.execute("ALTER INDEX idx_messages_room_seq RENAME TO idx_messages_partitioned_room_seq")
+    op.execute("ALTER INDEX idx_messages_created_at RENAME TO idx_messages_partitioned_created_at")
+    op.execute("""
+        CREATE TABLE messages (
+            id INTEGER NOT NULL DEFAULT nextval('messages_id_seq') PRIMARY KEY,
+            seq BIGINT,
+            client_msg_id VARCHAR(64),
+            room_id VARCHAR(50) NOT NULL REFERENCES chat_rooms (id),
+            sender_type VARCHAR(20) NOT NULL,
+            sender_id VARCHAR(50),
+            original_text TEXT NOT NULL,
+            translated_text TEXT,
+            source_lang VARCHAR(10) NOT NULL,
+            target_lang VARCHAR(10),
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            extra_data JSON
+        )
+    """)
+    op.execute(f"INSERT INTO messages ({COLUMNS}) SELECT {COLUMNS} FROM messages_partitioned")
+    op.execute("DROP TABLE messages_partitioned CASCADE")
+    op.create_unique_constraint('uq_messages_seq', 'messages', ['seq'])
+    op.create_index('idx_messages_room_seq', 'messages', ['room_id', 'seq'])
+    op.execute("ALTER SEQUENCE messages_id_seq OWNED BY messages.id")
+
+    op.drop_index('idx_chat_rooms_archivable', table_name='chat_rooms')
+    op.drop_column('chat_rooms', 'archived_at')
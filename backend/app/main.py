@@ -5,8 +5,17 @@ import uvicorn
 
 from app.config import settings
 from app.socket.handlers import register_socket_handlers
-from app.routers import chat, monitoring, auth
+from app.socket.transport import create_server
+from app.routers import chat, monitoring, auth, translation
 from app.services.cache import cache_service
+from app.services.cache_warmup import start_warmup_job
+from app.services.dispatcher import dispatcher
+from app.services.document_jobs import document_job_queue
+from app.services.message_outbox import message_outbox
+from app.services.message_archive import message_archiver
+from app.services.worker_lease import worker_lease
+from app.services.providers.http_pool import http_pool
+from app.services.translation import translation_service
 
 # FastAPI 앱
 app = FastAPI(
@@ -24,13 +33,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Socket.io 서버
-sio = socketio.AsyncServer(
-    async_mode='asgi',
-    cors_allowed_origins=settings.CORS_ORIGINS,
-    logger=True,
-    engineio_logger=True,
-)
+# Socket.io 서버 (전송 설정은 SOCKET_TRANSPORT_PROFILE)
+sio = create_server()
 
 # Socket.io 핸들러 등록
 register_socket_handlers(sio)
@@ -55,10 +59,50 @@ async def startup_event():
     # Redis 연결
     await cache_service.connect()
 
+    # 번역 캐시 워밍업 (백그라운드, 기동을 막지 않음)
+    if settings.CACHE_WARMUP_ON_STARTUP and cache_service.redis_client:
+        start_warmup_job()
+
+    # 채팅방 배정 대기열 재구성
+    await dispatcher.rebuild()
+
+    # 메시지 워커 ID 임대 (seq/outbox 리스트가 프로세스마다 겹치지 않도록, 실패 시 기동 중단)
+    await worker_lease.start()
+
+    # 문서 번역 워커 (임대한 워커 ID의 처리 목록에 남은 작업 복구)
+    await document_job_queue.start()
+
+    # 메시지 저장 outbox 워커 (이전 실행에서 남은 메시지 포함)
+    await message_outbox.start()
+
+    # 메시지 파티션 생성 (항상, 실패 시 기동 중단) + 보관 워커 (MESSAGE_ARCHIVE_ENABLED)
+    await message_archiver.start()
+
+    # 프로바이더 HTTP 사전 연결 (첫 번역 요청의 TCP/TLS 지연 제거)
+    if settings.PROVIDER_HTTP_WARMUP:
+        await http_pool.warmup()
+
+    # 로컬 번역 모델 로드 (설치/모델이 있을 때만)
+    if settings.LOCAL_WARMUP:
+        await translation_service.warmup()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """앱 종료 시 정리"""
+    await document_job_queue.stop()
+    await message_outbox.stop()
+    await worker_lease.stop()
+    await message_archiver.stop()
+    await http_pool.close()
+    await translation_service.close()
+    await cache_service.close()
+
 
 # API 라우터
 app.include_router(auth.router)
 app.include_router(chat.router)
+app.include_router(translation.router)
 app.include_router(monitoring.router)
 
 
@@ -68,4 +112,5 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
+        ws_per_message_deflate=settings.SOCKET_WS_PER_MESSAGE_DEFLATE,
     )
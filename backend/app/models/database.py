@@ -1,13 +1,24 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey, JSON
+from sqlalchemy import Column, String, Text, DateTime, Integer, BigInteger, ForeignKey, JSON, Index, UniqueConstraint, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
+from app.services.message_ids import message_ids
+
 Base = declarative_base()
 
 
 class ChatRoom(Base):
     __tablename__ = "chat_rooms"
+    __table_args__ = (
+        Index('idx_chat_rooms_agent_status', 'agent_id', 'status'),
+        # 미배정 대기 방 (디스패처 대기열 재구성)
+        Index('idx_chat_rooms_waiting', 'customer_language', 'created_at',
+              postgresql_where=text("status = 'waiting' AND agent_id IS NULL")),
+        # 보관 대상 (종료 후 보관 전인 방)
+        Index('idx_chat_rooms_archivable', 'ended_at',
+              postgresql_where=text("status = 'ended' AND archived_at IS NULL")),
+    )
 
     id = Column(String(50), primary_key=True)
     customer_language = Column(String(10), nullable=False)
@@ -15,6 +26,7 @@ class ChatRoom(Base):
     status = Column(String(20), default='waiting')  # waiting, active, ended
     created_at = Column(DateTime, default=datetime.utcnow)
     ended_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, nullable=True)  # 메시지를 보관 파일로 옮긴 시각
     extra_data = Column(JSON, nullable=True)  # metadata is reserved
 
     messages = relationship("Message", back_populates="room")
@@ -23,8 +35,18 @@ class ChatRoom(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        UniqueConstraint('seq', name='uq_messages_seq'),
+        Index('idx_messages_room_seq', 'room_id', 'seq'),
+        Index('idx_messages_created_at', 'created_at'),
+        # seq 범위 월별 파티션 (파티션 생성은 app/services/message_archive.py)
+        {'postgresql_partition_by': 'RANGE (seq)'},
+    )
 
+    # PK는 파티션 키(seq)를 포함해야 하므로 (id, seq)
     id = Column(Integer, primary_key=True, autoincrement=True)
+    seq = Column(BigInteger, primary_key=True)  # 서버 발급 메시지 ID (시간순 증가, 파티션 키)
+    client_msg_id = Column(String(64), nullable=True)  # 클라이언트 재전송 중복 판별용
     room_id = Column(String(50), ForeignKey('chat_rooms.id'), nullable=False)
     sender_type = Column(String(20), nullable=False)  # customer, agent
     sender_id = Column(String(50), nullable=True)
@@ -49,6 +71,7 @@ class Agent(Base):
     role = Column(String(20), default='agent')  # agent, admin
     status = Column(String(20), default='offline')  # online, away, offline
     max_concurrent_chats = Column(Integer, default=5)
+    languages = Column(JSON, nullable=True)  # 상담 가능 고객 언어 (예: ["vi", "th"], 비어 있으면 전체)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_login = Column(DateTime, nullable=True)
 
@@ -83,6 +106,26 @@ class CustomerSession(Base):
     extra_data = Column(JSON, nullable=True)  # metadata is reserved
 
 
+class DocumentJob(Base):
+    """장문 문서 번역 작업 테이블"""
+    __tablename__ = "document_jobs"
+
+    id = Column(String(50), primary_key=True)
+    room_id = Column(String(50), ForeignKey('chat_rooms.id'), nullable=True)
+    status = Column(String(20), default='queued')  # queued, running, completed, failed
+    source_lang = Column(String(10), nullable=False)
+    target_lang = Column(String(10), nullable=False)
+    context = Column(String(20), default='medical')
+    original_text = Column(Text, nullable=False)
+    translated_text = Column(Text, nullable=True)
+    total_chunks = Column(Integer, default=0)
+    completed_chunks = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
 # DB 헬퍼 함수
 def save_message(
     db_session,
@@ -92,11 +135,16 @@ def save_message(
     translated_text: str = None,
     source_lang: str = None,
     target_lang: str = None,
-    sender_id: str = None
+    sender_id: str = None,
+    seq: int = None,
+    client_msg_id: str = None
 ) -> Message:
     """
     메시지를 데이터베이스에 저장
 
+    동기 단건 저장입니다. 소켓 메시지는 message_outbox를 거쳐 저장되며
+    방별 최근 메시지 버퍼(recent_messages)도 그쪽에서 갱신합니다.
+
     Args:
         db_session: SQLAlchemy 세션
         room_id: 채팅방 ID
@@ -106,11 +154,15 @@ def save_message(
         source_lang: 원문 언어
         target_lang: 번역 대상 언어
         sender_id: 발신자 ID (optional)
+        seq: 서버 메시지 ID (기본: 새로 발급)
+        client_msg_id: 클라이언트 메시지 ID (optional)
 
     Returns:
         Message: 저장된 메시지 객체
     """
     message = Message(
+        seq=seq if seq is not None else message_ids.next_id(),
+        client_msg_id=client_msg_id,
         room_id=room_id,
         sender_type=sender_type,
         sender_id=sender_id,
@@ -124,11 +176,11 @@ def save_message(
     db_session.add(message)
     db_session.commit()
     db_session.refresh(message)
-
     return message
 
 
-def get_messages(db_session, room_id: str, limit: int = 100, offset: int = 0):
+def get_messages(db_session, room_id: str, limit: int = 100, offset: int = 0, after: int = None,
+                 before: int = None):
     """
     채팅방의 메시지 히스토리 조회
 
@@ -137,15 +189,25 @@ def get_messages(db_session, room_id: str, limit: int = 100, offset: int = 0):
         room_id: 채팅방 ID
         limit: 조회할 메시지 수 (기본 100)
         offset: 건너뛸 메시지 수 (기본 0)
+        after: 이 메시지 ID(seq) 이후만 조회 - 재접속 시 이어받기 (room_id, seq) 인덱스 범위 조회
+        before: 이 메시지 ID(seq) 이전 limit개 조회 - 이전 페이지
 
     Returns:
         List[Message]: 메시지 리스트 (오래된 순)
     """
-    messages = db_session.query(Message)\
-        .filter(Message.room_id == room_id)\
-        .order_by(Message.created_at.asc())\
-        .offset(offset)\
-        .limit(limit)\
-        .all()
+    query = db_session.query(Message).filter(Message.room_id == room_id)
+    if before is not None:
+        messages = query.filter(Message.seq < before)\
+            .order_by(Message.seq.desc())\
+            .offset(offset)\
+            .limit(limit)\
+            .all()
+        return list(reversed(messages))
+    if after is not None:
+        query = query.filter(Message.seq > after).order_by(Message.seq.asc())
+    else:
+        query = query.order_by(Message.created_at.asc())
+
+    messages = query.offset(offset).limit(limit).all()
 
     return messages
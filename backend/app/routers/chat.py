@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import asyncio
 import uuid
 from datetime import datetime
 
@@ -8,17 +9,35 @@ from app.schemas.chat import (
     ChatRoomCreate,
     ChatRoomResponse,
     MessageResponse,
+    SyncRequest,
+    RoomSyncResponse,
     TranslationTestRequest,
     TranslationTestResponse
 )
-from app.models.database import ChatRoom, Message, Agent
+from app.models.database import ChatRoom, Message, Agent, get_messages
 from app.database import get_db
 from app.services.translation import translation_service
+from app.services.recent_messages import recent_messages, sync_rooms
+from app.services.room_state import room_state
+from app.services.dispatcher import dispatcher, AssignmentError
+from app.services.message_archive import message_archiver, page_records
+from app.services.message_ids import message_ids
+from app.config import settings
 from app.dependencies import get_current_agent
 import time
 
 router = APIRouter(prefix="/api/chat", tags=["Chat"])
 
+# 배정 실패 사유 → (상태 코드, 메시지)
+ASSIGNMENT_ERRORS = {
+    'not_found': (404, "채팅방을 찾을 수 없습니다"),
+    'not_waiting': (400, "대기 중인 채팅방만 할당할 수 있습니다"),
+    'taken': (400, "이미 다른 상담사에게 할당된 채팅방입니다"),
+    'capacity': (409, "동시 상담 가능한 채팅방 수를 초과했습니다"),
+    'language': (403, "상담 가능한 언어가 아닙니다"),
+    'no_agent': (401, "사용자를 찾을 수 없습니다"),
+}
+
 
 @router.post("/rooms", response_model=ChatRoomResponse, status_code=201)
 async def create_chat_room(
@@ -45,7 +64,13 @@ async def create_chat_room(
     db.commit()
     db.refresh(new_room)
 
-    return new_room
+    await room_state.upsert(new_room)
+    await dispatcher.enqueue(new_room)
+
+    # 자동 배정 (DISPATCH_AUTO_ASSIGN)
+    assigned = await dispatcher.auto_assign(new_room)
+
+    return assigned or new_room
 
 
 @router.get("/rooms", response_model=List[ChatRoomResponse])
@@ -73,7 +98,6 @@ async def get_chat_rooms(
 @router.get("/agent/rooms", response_model=List[ChatRoomResponse])
 async def get_agent_rooms(
     include_waiting: bool = True,
-    db: Session = Depends(get_db),
     current_agent: Agent = Depends(get_current_agent)
 ):
     """
@@ -83,57 +107,43 @@ async def get_agent_rooms(
 
     Returns:
         - 상담사에게 할당된 활성 채팅방
-        - include_waiting=True인 경우, 미할당 대기 채팅방도 포함
-    """
-    # 상담사에게 할당된 활성 채팅방
-    query = db.query(ChatRoom).filter(
-        ChatRoom.agent_id == current_agent.id,
-        ChatRoom.status.in_(['waiting', 'active'])
-    )
+        - include_waiting=True인 경우, 미할당 대기 채팅방도 포함 (최신 10개)
 
-    assigned_rooms = query.order_by(ChatRoom.created_at.desc()).all()
-
-    # 대기 중인 미할당 채팅방 추가
-    if include_waiting:
-        waiting_rooms = db.query(ChatRoom).filter(
-            ChatRoom.agent_id == None,
-            ChatRoom.status == 'waiting'
-        ).order_by(ChatRoom.created_at.desc()).limit(10).all()
-
-        return assigned_rooms + waiting_rooms
-
-    return assigned_rooms
+    DB 조회 없이 메모리 뷰에서 응답합니다. 변경 사항은 소켓 'subscribe_agent_rooms' 구독 시
+    'room_state' 이벤트로 받을 수 있습니다.
+    """
+    await room_state.ensure_loaded()
+    return room_state.get_agent_rooms(current_agent.id, include_waiting)
 
 
 @router.post("/rooms/{room_id}/assign", response_model=ChatRoomResponse)
 async def assign_room_to_agent(
     room_id: str,
-    db: Session = Depends(get_db),
     current_agent: Agent = Depends(get_current_agent)
 ):
     """
     채팅방을 현재 상담사에게 할당
 
     대기 중인 채팅방을 상담사가 수락할 때 사용
+    동시에 수락해도 한 상담사만 성공하며, 동시 상담 수(max_concurrent_chats)와 상담 가능 언어를 확인합니다.
     """
-    room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
-
-    if not room:
-        raise HTTPException(status_code=404, detail="채팅방을 찾을 수 없습니다")
-
-    if room.status != 'waiting':
-        raise HTTPException(status_code=400, detail="대기 중인 채팅방만 할당할 수 있습니다")
-
-    if room.agent_id and room.agent_id != current_agent.id:
-        raise HTTPException(status_code=400, detail="이미 다른 상담사에게 할당된 채팅방입니다")
-
-    # 상담사 할당 및 상태 변경
-    room.agent_id = current_agent.id
-    room.status = 'active'
+    try:
+        return await dispatcher.assign(room_id, current_agent.id)
+    except AssignmentError as e:
+        status_code, detail = ASSIGNMENT_ERRORS[e.reason]
+        raise HTTPException(status_code=status_code, detail=detail)
 
-    db.commit()
-    db.refresh(room)
 
+@router.post("/agent/rooms/next", response_model=ChatRoomResponse)
+async def claim_next_room(
+    current_agent: Agent = Depends(get_current_agent)
+):
+    """
+    상담 가능한 언어의 가장 오래 기다린 채팅방을 현재 상담사에게 할당
+    """
+    room = await dispatcher.claim_next(current_agent.id)
+    if room is None:
+        raise HTTPException(status_code=404, detail="할당할 수 있는 대기 채팅방이 없습니다")
     return room
 
 
@@ -157,26 +167,68 @@ async def get_chat_room(
 async def get_room_messages(
     room_id: str,
     limit: int = 100,
+    after: Optional[int] = None,
+    before: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
     """
-    채팅방의 메시지 히스토리 조회
+    채팅방의 메시지 히스토리 조회 (오래된 순)
 
     - **limit**: 최대 결과 수 (기본 100)
+    - **after**: 이 메시지 ID(seq) 이후 메시지만 조회 (재접속 시 마지막으로 받은 ID부터 이어받기)
+    - **before**: 이 메시지 ID(seq) 이전 limit개 조회 (이전 페이지)
+
+    커서가 없으면 최근 limit개를 반환합니다.
+    최근 메시지는 방별 Redis 버퍼에서 DB 조회 없이 응답하고, 이전 페이지는 DB에서 조회합니다.
+    보관(archival)된 방은 보관 파일에서 읽습니다.
     """
+    recent_page = before is None and limit <= settings.SYNC_MAX_MESSAGES_PER_ROOM
+    if recent_page:
+        buffered = (await recent_messages.since({room_id: after}, limit))[room_id]
+        if buffered is not None:
+            recent_messages.record_history('cache')
+            return buffered[0]
+
     # 채팅방 존재 확인
     room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
     if not room:
         raise HTTPException(status_code=404, detail="채팅방을 찾을 수 없습니다")
 
-    # 메시지 조회
-    messages = db.query(Message)\
-        .filter(Message.room_id == room_id)\
-        .order_by(Message.created_at.asc())\
-        .limit(limit)\
-        .all()
+    # 버퍼 미스: DB 조회 후 버퍼 적재
+    if recent_page:
+        recent_messages.record_history('db')
+        result = await sync_rooms({room_id: after}, limit, use_buffer=False)
+        return result[0]['messages']
+
+    if room.archived_at:
+        recent_messages.record_history('archive')
+        records = await asyncio.to_thread(message_archiver.read_room, room)
+        return page_records(records, limit, after=after, before=before)
 
-    return messages
+    # 이전 페이지 / 큰 limit: DB 조회 (커서가 없으면 지금 발급한 ID 이전 = 최근 limit개)
+    recent_messages.record_history('older_pages')
+    if after is None and before is None:
+        before = message_ids.next_id()
+    return get_messages(db, room_id, limit=limit, after=after, before=before)
+
+
+@router.post("/sync", response_model=List[RoomSyncResponse])
+async def sync_messages(request: SyncRequest):
+    """
+    여러 채팅방의 놓친 메시지 이어받기 (재접속 시 방마다 히스토리를 다시 조회하지 않음)
+
+    - **rooms**: 채팅방 ID → 마지막으로 받은 메시지 ID (없으면 최근 메시지)
+    - **limit**: 방별 최대 메시지 수 (has_more이면 cursor로 다시 요청)
+
+    최근 메시지는 Redis 버퍼에서, 버퍼 범위를 벗어난 요청만 DB에서 조회합니다.
+    """
+    if len(request.rooms) > settings.SYNC_MAX_ROOMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {settings.SYNC_MAX_ROOMS}개 채팅방까지 요청할 수 있습니다"
+        )
+
+    return await sync_rooms(request.rooms, request.limit)
 
 
 @router.delete("/rooms/{room_id}", status_code=204)
@@ -192,11 +244,19 @@ async def end_chat_room(
     if not room:
         raise HTTPException(status_code=404, detail="채팅방을 찾을 수 없습니다")
 
+    was_waiting = room.status == 'waiting'
     room.status = 'ended'
     room.ended_at = datetime.utcnow()
 
     db.commit()
 
+    await room_state.upsert(room)
+    if was_waiting:
+        await dispatcher.discard(room.id, room.customer_language)
+    if room.agent_id:
+        # 상담사 여유가 생겼으므로 자동 배정 시 대기 방 가져오기
+        await dispatcher.fill(room.agent_id)
+
     return None
 
 
@@ -1,6 +1,27 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Depends
+from typing import List
+
 from app.services.cache import cache_service
+from app.services.cache_jobs import cache_job_manager
+from app.services.cache_warmup import start_warmup_job
 from app.services.translation import translation_service
+from app.services.translation_cache import translation_cache
+from app.services.providers.token_budget import token_budget
+from app.services.providers.http_pool import http_pool
+from app.services.langdetect import language_detector
+from app.services.passthrough import passthrough_filter
+from app.services.message_outbox import message_outbox
+from app.services.worker_lease import worker_lease
+from app.services.recent_messages import recent_messages
+from app.services.message_archive import message_archiver
+from app.services.typing_indicator import typing_coalescer
+from app.services.room_state import room_state
+from app.services.dispatcher import dispatcher
+from app.socket.codec import socket_codec
+from app.socket.transport import socket_metrics
+from app.schemas.monitoring import CachePurgeRequest, CacheJobResponse, CacheInvalidateRequest
+from app.models.database import Agent
+from app.dependencies import get_current_admin
 
 router = APIRouter(prefix="/api/monitoring", tags=["Monitoring"])
 
@@ -30,9 +51,245 @@ async def reset_cache_stats():
     return {"message": "Cache stats reset successfully"}
 
 
+@router.post("/cache/purge", response_model=CacheJobResponse, status_code=202)
+async def start_cache_purge(
+    request: CachePurgeRequest,
+    current_admin: Agent = Depends(get_current_admin)
+):
+    """
+    캐시 purge 백그라운드 작업 시작 (관리자)
+
+    SCAN + UNLINK 청크 단위로 점진 삭제하므로 Redis를 블로킹하지 않습니다.
+
+    - **pattern**: 삭제할 키 패턴 (예: trans:*)
+    - **scan_count**: SCAN COUNT 힌트
+    - **chunk_size**: UNLINK 1회당 키 수
+    """
+    job = cache_job_manager.start_purge(
+        request.pattern,
+        scan_count=request.scan_count,
+        chunk_size=request.chunk_size
+    )
+    return job.to_dict()
+
+
+@router.post("/cache/invalidate", response_model=CacheJobResponse, status_code=202)
+async def invalidate_translation_cache(
+    request: CacheInvalidateRequest,
+    current_admin: Agent = Depends(get_current_admin)
+):
+    """
+    번역 캐시 인덱스 단위 무효화 (관리자)
+
+    보조 인덱스 ZSET에 등록된 키만 삭제하므로 전체 SCAN이 필요 없습니다.
+
+    - **kind**: pair(언어쌍), provider, model, glossary(용어집 버전)
+    - **value**: 인덱스 값
+    """
+    def runner(cancel_event):
+        return translation_cache.invalidate_iter(
+            request.kind, request.value, cancel_event=cancel_event
+        )
+
+    job = cache_job_manager.start(
+        'invalidate',
+        {'kind': request.kind, 'value': request.value},
+        runner
+    )
+    return job.to_dict()
+
+
+@router.get("/cache/namespace")
+async def get_cache_namespace():
+    """
+    번역 캐시 네임스페이스 정보 (버전, 프로바이더, 모델, 용어집 버전)
+    """
+    return await translation_cache.get_info(translation_service.provider)
+
+
+@router.post("/cache/namespace/bump")
+async def bump_cache_namespace(
+    current_admin: Agent = Depends(get_current_admin)
+):
+    """
+    번역 캐시 네임스페이스 버전 증가 (관리자)
+
+    이전 버전 키는 즉시 조회 대상에서 빠지고 TTL로 소멸합니다.
+    다른 워커에는 CACHE_NAMESPACE_REFRESH_SECONDS 이내에 반영됩니다.
+    """
+    version = await translation_cache.bump()
+    return {"version": version}
+
+
+@router.post("/cache/warmup", response_model=CacheJobResponse, status_code=202)
+async def start_cache_warmup(
+    current_admin: Agent = Depends(get_current_admin)
+):
+    """
+    번역 캐시 워밍업 백그라운드 작업 시작 (관리자)
+
+    메시지 히스토리 빈도 상위 문장과 큐레이션 문구를 미리 번역합니다.
+    진행률/ETA는 작업 상태의 progress에서 확인합니다.
+    """
+    job = start_warmup_job()
+    return job.to_dict()
+
+
+@router.get("/cache/jobs", response_model=List[CacheJobResponse])
+async def list_cache_jobs():
+    """
+    캐시 백그라운드 작업 목록 (최근 순)
+    """
+    return [job.to_dict() for job in cache_job_manager.list()]
+
+
+@router.get("/cache/jobs/{job_id}", response_model=CacheJobResponse)
+async def get_cache_job(job_id: str):
+    """
+    캐시 백그라운드 작업 상태 조회
+    """
+    job = cache_job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    return job.to_dict()
+
+
+@router.post("/cache/jobs/{job_id}/cancel", response_model=CacheJobResponse)
+async def cancel_cache_job(
+    job_id: str,
+    current_admin: Agent = Depends(get_current_admin)
+):
+    """
+    캐시 백그라운드 작업 취소 (관리자)
+    """
+    job = cache_job_manager.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    return job.to_dict()
+
+
 @router.get("/translation/provider")
 async def get_translation_provider():
     """
     현재 사용 중인 번역 프로바이더 정보 조회
     """
     return translation_service.get_provider_info()
+
+
+@router.get("/translation/tokens")
+async def get_translation_token_stats():
+    """
+    언어쌍별 출력 토큰 추정치 vs 실제값, 잘림(truncation) 비율 조회
+    """
+    return token_budget.get_stats()
+
+
+@router.get("/translation/http-pool")
+async def get_translation_http_pool():
+    """
+    프로바이더 HTTP 커넥션 풀 상태 (진행 중 요청, 연결 대기, 열린/유휴 연결)
+    """
+    return http_pool.get_stats()
+
+
+@router.get("/translation/routing")
+async def get_translation_routing():
+    """
+    모델 라우팅 통계 (경로별 결정 수, 호출 수, 지연 시간 avg/p50/p95)
+    """
+    return translation_service.router.get_stats()
+
+
+@router.get("/translation/langdetect")
+async def get_language_detection_stats():
+    """
+    원문 언어 감지 통계 (보정 횟수, 언어쌍별 보정, 같은 언어로 번역 생략)
+    """
+    return language_detector.get_stats()
+
+
+@router.get("/translation/passthrough")
+async def get_passthrough_stats():
+    """
+    번역 생략 통계 (생략 사유별 프로바이더 호출 절감 수, 마스킹/복원 실패 수)
+    """
+    return passthrough_filter.get_stats()
+
+
+@router.get("/messages/outbox")
+async def get_message_outbox_stats():
+    """
+    메시지 저장 outbox 통계 (대기 중인 메시지, 배치 수/평균 크기, 중복 재전송 수, seq 충돌, 워커 ID 임대)
+    """
+    return {**message_outbox.get_stats(), 'worker_lease': worker_lease.get_stats()}
+
+
+@router.get("/messages/recent")
+async def get_recent_message_buffer_stats():
+    """
+    방별 최근 메시지 버퍼 통계 (히트/미스, 히스토리 API 응답 출처)
+    """
+    return recent_messages.get_stats()
+
+
+@router.get("/socket/typing")
+async def get_typing_stats():
+    """
+    타이핑 이벤트 병합 통계 (수신/전달/억제 수, 자동 stop_typing 수)
+    """
+    return typing_coalescer.get_stats()
+
+
+@router.get("/socket/codec")
+async def get_socket_codec_stats():
+    """
+    Socket.IO 코덱 통계 (코덱별 연결 수, msgpack 인코딩 수/바이트, 압축 스키마)
+    """
+    return socket_codec.get_stats()
+
+
+@router.get("/socket/transport")
+async def get_socket_transport_stats():
+    """
+    Socket.IO 송수신 패킷 수/바이트 (전송 프로파일, 샘플링 비율 포함)
+    """
+    return socket_metrics.get_stats()
+
+
+@router.get("/rooms/state")
+async def get_room_state_stats():
+    """
+    상담사 방 목록 메모리 뷰 통계 (진행 중인 방 수, 조회/갱신/delta 전송 수, 마지막 적재 시점)
+    """
+    return room_state.get_stats()
+
+
+@router.get("/rooms/dispatch")
+async def get_dispatch_stats():
+    """
+    채팅방 배정 통계 (배정/충돌/정원 초과 거절 수, 언어별 대기 방 수)
+    """
+    return {
+        **dispatcher.get_stats(),
+        'waiting_by_language': await dispatcher.queue_lengths(),
+    }
+
+
+@router.get("/messages/archive")
+async def get_message_archive_stats():
+    """
+    메시지 보관 통계 (보관한 방/메시지 수, 생성/제거한 파티션 수, 마지막 실행 시각)
+    """
+    return message_archiver.get_stats()
+
+
+@router.post("/messages/archive/run")
+async def run_message_archive(
+    current_admin: Agent = Depends(get_current_admin)
+):
+    """
+    파티션 생성 + 보관 + 빈 파티션 정리 즉시 실행 (관리자)
+
+    다른 인스턴스에서 실행 중이면 빈 결과를 반환합니다.
+    """
+    return await message_archiver.run_once()
@@ -0,0 +1,135 @@
+"""
+번역 API 라우터
+"""
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+import json
+import time
+
+from app.schemas.translation import (
+    BatchTranslationRequest,
+    BatchTranslationResponse,
+    DocumentTranslationRequest,
+    DocumentJobResponse,
+)
+from app.models.database import Agent
+from app.services.translation import translation_service
+from app.services.document_jobs import document_job_queue
+from app.dependencies import get_current_agent
+from app.config import settings
+
+router = APIRouter(prefix="/api/translation", tags=["Translation"])
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+@router.post("/batch", response_model=BatchTranslationResponse)
+async def translate_batch(
+    request: BatchTranslationRequest,
+    http_request: Request,
+    current_agent: Agent = Depends(get_current_agent)
+):
+    """
+    일괄 번역 API (FAQ, 퇴원 안내문, 상용구 등)
+
+    - **texts**: 번역할 텍스트 목록
+    - **source_lang**: 원문 언어
+    - **target_langs**: 번역 대상 언어 목록
+    - **stream**: true 또는 `Accept: application/x-ndjson`이면 NDJSON 스트리밍
+
+    캐시는 mget 한 번으로 조회하고, 미스만 프로바이더 동시성 제한 하에 병렬 번역합니다.
+    일부 항목이 실패해도 나머지 결과는 항목별 status와 함께 반환됩니다.
+    """
+    total = len(request.texts) * len(set(request.target_langs))
+    if total > settings.TRANSLATION_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {settings.TRANSLATION_BATCH_MAX_ITEMS}개 항목까지 번역할 수 있습니다"
+        )
+
+    results = translation_service.translate_batch(
+        texts=request.texts,
+        source_lang=request.source_lang,
+        target_langs=request.target_langs,
+        context=request.context
+    )
+
+    wants_stream = request.stream or NDJSON_MEDIA_TYPE in http_request.headers.get("accept", "")
+    if wants_stream:
+        async def ndjson():
+            counts = {'cached': 0, 'translated': 0, 'skipped': 0, 'failed': 0}
+            start_time = time.time()
+            async for item in results:
+                _count(counts, item['status'])
+                yield json.dumps({'type': 'result', **item}, ensure_ascii=False) + "\n"
+            yield json.dumps({
+                'type': 'summary',
+                'total': total,
+                **counts,
+                'elapsed_time_ms': round((time.time() - start_time) * 1000, 2)
+            }) + "\n"
+
+        return StreamingResponse(ndjson(), media_type=NDJSON_MEDIA_TYPE)
+
+    start_time = time.time()
+    counts = {'cached': 0, 'translated': 0, 'skipped': 0, 'failed': 0}
+    items = []
+    async for item in results:
+        _count(counts, item['status'])
+        items.append(item)
+    items.sort(key=lambda item: (item['index'], item['target_lang']))
+
+    return BatchTranslationResponse(
+        results=items,
+        total=total,
+        elapsed_time_ms=round((time.time() - start_time) * 1000, 2),
+        **counts
+    )
+
+
+@router.post("/documents", response_model=DocumentJobResponse, status_code=202)
+async def create_document_job(request: DocumentTranslationRequest):
+    """
+    장문 문서 번역 작업 등록 (비동기)
+
+    문서를 청크로 나눠 백그라운드에서 병렬 번역합니다.
+    진행 상황은 Socket.IO `document_job_progress` 이벤트
+    (`subscribe_document_job` 또는 room_id 채팅방)로 전달되고,
+    결과는 GET /api/translation/documents/{job_id}로 조회합니다.
+    """
+    if len(request.text) > settings.DOCUMENT_MAX_CHARS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"문서는 최대 {settings.DOCUMENT_MAX_CHARS}자까지 번역할 수 있습니다"
+        )
+
+    return await document_job_queue.submit(
+        text=request.text,
+        source_lang=request.source_lang,
+        target_lang=request.target_lang,
+        room_id=request.room_id,
+        context=request.context
+    )
+
+
+@router.get("/documents/{job_id}", response_model=DocumentJobResponse)
+async def get_document_job(job_id: str):
+    """
+    문서 번역 작업 상태/결과 조회
+    """
+    job = await document_job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="번역 작업을 찾을 수 없습니다")
+    return job
+
+
+def _count(counts: dict, status: str):
+    """항목 상태별 집계"""
+    if status == 'cached':
+        counts['cached'] += 1
+    elif status == 'translated':
+        counts['translated'] += 1
+    elif status == 'skipped':
+        counts['skipped'] += 1
+    elif status == 'error':
+        counts['failed'] += 1
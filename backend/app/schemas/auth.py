@@ -1,6 +1,8 @@
 """
 인증 관련 Pydantic 스키마
 """
+from typing import List, Optional
+
 from pydantic import BaseModel, EmailStr
 
 
@@ -23,6 +25,8 @@ class AgentResponse(BaseModel):
     email: EmailStr
     role: str
     status: str
+    max_concurrent_chats: Optional[int] = None
+    languages: Optional[List[str]] = None
 
     class Config:
         from_attributes = True
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 
@@ -23,6 +23,8 @@ class ChatRoomResponse(BaseModel):
     status: str
     created_at: datetime
     ended_at: Optional[datetime] = None
+    customer_online: bool = False  # 상담사 방 목록에서만 (소켓 접속 여부)
+    agent_online: bool = False
 
     class Config:
         from_attributes = True
@@ -46,7 +48,9 @@ class MessageCreate(BaseModel):
 
 class MessageResponse(BaseModel):
     """메시지 응답"""
-    id: int
+    id: Optional[int] = None  # 최근 메시지 버퍼에서 읽은 경우 없음 (seq 사용)
+    seq: Optional[int] = None
+    client_msg_id: Optional[str] = None
     room_id: str
     sender_type: str
     sender_id: Optional[str] = None
@@ -60,6 +64,29 @@ class MessageResponse(BaseModel):
         from_attributes = True
 
 
+class SyncRequest(BaseModel):
+    """재접속 이어받기 요청"""
+    rooms: Dict[str, Optional[int]] = Field(..., description="채팅방 ID → 마지막으로 받은 메시지 ID (없으면 최근 메시지)")
+    limit: int = Field(100, ge=1, le=200, description="방별 최대 메시지 수")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "rooms": {"room_abc123": 1792435770851328, "room_def456": None},
+                "limit": 100
+            }
+        }
+
+
+class RoomSyncResponse(BaseModel):
+    """채팅방별 이어받기 결과"""
+    room_id: str
+    messages: List[MessageResponse]
+    cursor: Optional[int] = None  # 다음 요청에 사용할 마지막 메시지 ID
+    has_more: bool = False  # limit을 넘는 메시지가 더 있음 (cursor로 다시 요청)
+    source: str  # cache | db
+
+
 class TranslationTestRequest(BaseModel):
     """번역 테스트 요청"""
     text: str = Field(..., description="번역할 텍스트")
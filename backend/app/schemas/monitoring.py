@@ -0,0 +1,49 @@
+"""
+모니터링 관련 Pydantic 스키마
+"""
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, Literal
+from datetime import datetime
+
+
+class CachePurgeRequest(BaseModel):
+    """캐시 purge 작업 요청"""
+    pattern: str = Field("trans:*", description="삭제할 키 패턴")
+    scan_count: int = Field(1000, ge=10, le=100000, description="SCAN 1회당 COUNT 힌트")
+    chunk_size: int = Field(500, ge=1, le=10000, description="UNLINK 1회당 최대 키 수")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "pattern": "trans:*",
+                "scan_count": 1000,
+                "chunk_size": 500
+            }
+        }
+
+
+class CacheJobResponse(BaseModel):
+    """캐시 백그라운드 작업 상태"""
+    job_id: str
+    kind: str
+    params: Dict[str, Any]
+    status: str
+    progress: Dict[str, Any]
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class CacheInvalidateRequest(BaseModel):
+    """번역 캐시 인덱스 단위 무효화 요청"""
+    kind: Literal['pair', 'provider', 'model', 'glossary'] = Field(..., description="인덱스 종류")
+    value: str = Field(..., description="인덱스 값 (예: ko-vi, OpenAI-gpt-4, 용어집 버전)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "kind": "pair",
+                "value": "ko-vi"
+            }
+        }
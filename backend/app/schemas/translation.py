@@ -0,0 +1,85 @@
+"""
+번역 API Pydantic 스키마
+"""
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+
+
+class BatchTranslationRequest(BaseModel):
+    """일괄 번역 요청"""
+    texts: List[str] = Field(..., min_length=1, description="번역할 텍스트 목록")
+    source_lang: str = Field(..., description="원문 언어")
+    target_langs: List[str] = Field(..., min_length=1, description="번역 대상 언어 목록")
+    context: str = Field('medical', description="번역 컨텍스트 (medical, general)")
+    stream: bool = Field(False, description="NDJSON 스트리밍 응답 (완료 순서대로 전송)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "texts": ["진료 예약은 전화로 가능합니다", "공복으로 내원해 주세요"],
+                "source_lang": "ko",
+                "target_langs": ["en", "vi", "zh", "th", "ja"],
+                "context": "medical",
+                "stream": False
+            }
+        }
+
+
+class BatchTranslationItem(BaseModel):
+    """일괄 번역 항목 결과"""
+    index: int = Field(..., description="texts 내 원문 위치")
+    target_lang: str
+    status: str = Field(..., description="cached, translated, skipped, error")
+    translated_text: Optional[str] = None
+    error: Optional[str] = None
+    elapsed_ms: float
+
+
+class BatchTranslationResponse(BaseModel):
+    """일괄 번역 응답"""
+    results: List[BatchTranslationItem]
+    total: int
+    cached: int
+    translated: int
+    skipped: int  # 번역 불필요 (숫자/이모지만 있는 항목 등)
+    failed: int
+    elapsed_time_ms: float
+
+
+class DocumentTranslationRequest(BaseModel):
+    """장문 문서 번역 작업 요청"""
+    text: str = Field(..., min_length=1, description="번역할 문서 본문")
+    source_lang: str = Field(..., description="원문 언어")
+    target_lang: str = Field(..., description="번역 대상 언어")
+    room_id: Optional[str] = Field(None, description="진행 상황을 받을 채팅방 ID")
+    context: str = Field('medical', description="번역 컨텍스트 (medical, general)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "text": "진료의뢰서\n\n환자는 3일 전부터 복통을 호소하였으며...",
+                "source_lang": "ko",
+                "target_lang": "vi",
+                "room_id": "room_123abc456def"
+            }
+        }
+
+
+class DocumentJobResponse(BaseModel):
+    """문서 번역 작업 상태"""
+    id: str
+    room_id: Optional[str] = None
+    status: str
+    source_lang: str
+    target_lang: str
+    total_chunks: int
+    completed_chunks: int
+    translated_text: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,8 +1,11 @@
 import redis.asyncio as redis
 from app.config import settings
-from typing import Optional, List, Dict, Any
+from app.services.client_cache import TrackedLocalCache
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator, Set
+import asyncio
 import logging
 import json
+import time
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -15,58 +18,213 @@ class CacheService:
             'hits': 0,
             'misses': 0,
             'sets': 0,
-            'deletes': 0
+            'deletes': 0,
+            'pipelines': 0,
+            'pipelined_commands': 0
         }
+        # 자동 파이프라인 대기열: (명령, args, kwargs, future)
+        self._pending: List[Tuple[str, tuple, dict, asyncio.Future]] = []
+        self._flush_scheduled = False
+        # 전송 중인 파이프라인 태스크 (루프는 약한 참조만 가지므로 완료까지 보관)
+        self._flush_tasks: Set[asyncio.Task] = set()
+        # 서버 지원 클라이언트 사이드 캐시 (CACHE_CLIENT_TRACKING)
+        self.local_cache: Optional[TrackedLocalCache] = None
 
     async def connect(self):
-        """Redis 연결"""
+        """Redis 연결 (커넥션 풀 명시 설정)"""
         try:
-            self.redis_client = redis.from_url(
+            pool = redis.ConnectionPool.from_url(
                 settings.REDIS_URL,
                 encoding="utf-8",
-                decode_responses=True
+                decode_responses=True,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+                socket_keepalive=settings.REDIS_SOCKET_KEEPALIVE,
+                health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                retry_on_timeout=True,
             )
+            self.redis_client = redis.Redis(connection_pool=pool)
             await self.redis_client.ping()
-            logger.info("Redis connected successfully")
+            logger.info(
+                f"Redis connected successfully "
+                f"(max_connections={settings.REDIS_MAX_CONNECTIONS}, "
+                f"auto_pipeline={settings.REDIS_AUTO_PIPELINE})"
+            )
         except Exception as e:
             logger.error(f"Redis connection failed: {str(e)}")
             self.redis_client = None
+            return
+
+        if settings.CACHE_CLIENT_TRACKING:
+            self.local_cache = TrackedLocalCache(
+                max_keys=settings.CACHE_LOCAL_MAX_KEYS,
+                ttl=settings.CACHE_LOCAL_TTL,
+                prefixes=settings.CACHE_TRACKING_PREFIXES,
+            )
+            await self.local_cache.start(
+                settings.REDIS_URL, settings.REDIS_HEALTH_CHECK_INTERVAL
+            )
+
+    async def close(self):
+        """Redis 연결 종료 (대기 중인 파이프라인 정리 포함)"""
+        if self.local_cache:
+            await self.local_cache.stop()
+            self.local_cache = None
+        if self._pending:
+            batch, self._pending = self._pending, []
+            await self._flush(batch)
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        if self.redis_client:
+            await self.redis_client.close()
+            await self.redis_client.connection_pool.disconnect()
+            self.redis_client = None
+
+    async def _execute(self, command: str, *args, **kwargs):
+        """
+        Redis 명령 실행 (자동 파이프라인)
+
+        같은 이벤트 루프 틱에서 들어온 명령들을 모아 하나의 파이프라인으로
+        전송합니다. 호출자는 일반 명령과 동일하게 결과를 await 합니다.
+        """
+        if not settings.REDIS_AUTO_PIPELINE:
+            return await getattr(self.redis_client, command)(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((command, args, kwargs, future))
+
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            # 현재 틱의 다른 코루틴이 명령을 쌓을 수 있도록 다음 틱에 전송
+            loop.call_soon(self._schedule_flush)
+
+        return await future
+
+    def _schedule_flush(self):
+        """대기열을 비우고 파이프라인 전송 태스크 생성"""
+        batch, self._pending = self._pending, []
+        self._flush_scheduled = False
+        max_batch = max(1, settings.REDIS_PIPELINE_MAX_BATCH)
+        for i in range(0, len(batch), max_batch):
+            task = asyncio.ensure_future(self._flush(batch[i:i + max_batch]))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, batch: List[Tuple[str, tuple, dict, asyncio.Future]]):
+        """모인 명령을 파이프라인 한 번으로 실행하고 각 future에 결과 전달"""
+        if not batch:
+            return
+
+        client = self.redis_client
+        if client is None:
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(ConnectionError("Redis not connected"))
+            return
+
+        # 단일 명령은 파이프라인 오버헤드 없이 바로 실행
+        if len(batch) == 1:
+            command, args, kwargs, future = batch[0]
+            try:
+                result = await getattr(client, command)(*args, **kwargs)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            return
 
-    async def get(self, key: str) -> Optional[str]:
-        """캐시 조회 (히트율 추적)"""
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for command, args, kwargs, _ in batch:
+                    getattr(pipe, command)(*args, **kwargs)
+                results = await pipe.execute(raise_on_error=False)
+            self.stats['pipelines'] += 1
+            self.stats['pipelined_commands'] += len(batch)
+        except Exception as e:
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def get(self, key: str, track_stats: bool = True) -> Optional[str]:
+        """캐시 조회 (히트율 추적, 로컬 캐시 우선)"""
+        stats = self.stats if track_stats else dict.fromkeys(self.stats, 0)
         if not self.redis_client:
-            self.stats['misses'] += 1
+            stats['misses'] += 1
             return None
+
+        local = self.local_cache if self.local_cache and self.local_cache.accepts(key) else None
+        if local:
+            value = local.get(key)
+            if value is not None:
+                stats['hits'] += 1
+                return value
+            local.begin(key)
+
+        value = None
         try:
-            value = await self.redis_client.get(key)
+            value = await self._execute('get', key)
             if value:
-                self.stats['hits'] += 1
+                stats['hits'] += 1
             else:
-                self.stats['misses'] += 1
+                stats['misses'] += 1
             return value
         except Exception as e:
             logger.error(f"Cache get error: {str(e)}")
-            self.stats['misses'] += 1
+            stats['misses'] += 1
             return None
+        finally:
+            if local:
+                local.finish(key, value)
 
     async def set(self, key: str, value: str, expire: int = 3600):
         """캐시 저장"""
         if not self.redis_client:
             return False
+        self._invalidate_local([key])
         try:
-            await self.redis_client.set(key, value, ex=expire)
+            await self._execute('set', key, value, ex=expire)
             self.stats['sets'] += 1
             return True
         except Exception as e:
             logger.error(f"Cache set error: {str(e)}")
             return False
 
+    async def set_indexed(
+        self,
+        key: str,
+        value: str,
+        expire: int = 3600,
+        indexes: Optional[List[str]] = None
+    ):
+        """
+        캐시 저장 + 보조 인덱스 ZSET 등록
+
+        인덱스 ZSET에 키를 추가해 두면 SCAN 없이 인덱스 단위로 무효화할 수 있습니다.
+        인덱스 TTL은 가장 최근 멤버의 TTL까지 연장됩니다.
+        """
+        if not indexes:
+            return await self.set(key, value, expire=expire)
+        return await self.mset({key: value}, expire=expire, indexes={key: indexes})
+
     async def delete(self, key: str):
         """캐시 삭제"""
         if not self.redis_client:
             return False
+        self._invalidate_local([key])
         try:
-            await self.redis_client.delete(key)
+            await self._execute('delete', key)
             self.stats['deletes'] += 1
             return True
         except Exception as e:
@@ -74,29 +232,155 @@ class CacheService:
             return False
 
     async def delete_pattern(self, pattern: str):
-        """패턴 매칭으로 캐시 일괄 삭제"""
-        if not self.redis_client:
-            return 0
+        """패턴 매칭으로 캐시 일괄 삭제 (스트리밍 purge 사용)"""
+        deleted = 0
         try:
-            keys = []
-            async for key in self.redis_client.scan_iter(match=pattern):
-                keys.append(key)
-
-            if keys:
-                deleted = await self.redis_client.delete(*keys)
-                self.stats['deletes'] += deleted
-                return deleted
-            return 0
+            async for progress in self.purge_iter(pattern):
+                deleted = progress['deleted']
         except Exception as e:
             logger.error(f"Cache delete pattern error: {str(e)}")
+        return deleted
+
+    async def purge_iter(
+        self,
+        pattern: str,
+        scan_count: int = 1000,
+        chunk_size: int = 500,
+        cancel_event: Optional[asyncio.Event] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        패턴 매칭 키를 점진적으로 삭제 (non-blocking)
+
+        SCAN(COUNT 지정)으로 조금씩 순회하며 chunk_size 단위로 UNLINK 합니다.
+        전체 키를 메모리에 모으지 않고, Redis를 오래 블로킹하지 않습니다.
+
+        Args:
+            pattern: 삭제할 키 패턴 (예: 'trans:*')
+            scan_count: SCAN 1회당 COUNT 힌트
+            chunk_size: UNLINK 1회당 최대 키 수
+            cancel_event: set 되면 현재 청크 처리 후 중단
+
+        Yields:
+            진행 상황 {'scanned', 'deleted', 'done', 'cancelled'}
+        """
+        progress = {'scanned': 0, 'deleted': 0, 'done': False, 'cancelled': False}
+        if not self.redis_client:
+            progress['done'] = True
+            yield progress
+            return
+
+        cursor = 0
+        buffer: List[str] = []
+        try:
+            while True:
+                cursor, keys = await self.redis_client.scan(
+                    cursor=cursor, match=pattern, count=scan_count
+                )
+                progress['scanned'] += len(keys)
+                buffer.extend(keys)
+
+                while len(buffer) >= chunk_size:
+                    chunk, buffer = buffer[:chunk_size], buffer[chunk_size:]
+                    progress['deleted'] += await self._unlink_chunk(chunk)
+
+                if cursor == 0:
+                    break
+                if cancel_event is not None and cancel_event.is_set():
+                    progress['cancelled'] = True
+                    break
+                yield dict(progress)
+
+            if buffer:
+                progress['deleted'] += await self._unlink_chunk(buffer)
+        except Exception as e:
+            logger.error(f"Cache purge error: {str(e)}")
+            raise
+
+        progress['done'] = True
+        yield dict(progress)
+
+    async def purge_index_iter(
+        self,
+        index_key: str,
+        scan_count: int = 1000,
+        chunk_size: int = 500,
+        cancel_event: Optional[asyncio.Event] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        보조 인덱스 ZSET에 등록된 키만 삭제 (전체 SCAN 없이 O(인덱스 크기))
+
+        이미 만료된 멤버를 먼저 제거한 뒤 ZSCAN으로 순회하며 청크 단위로 UNLINK 하고,
+        완료되면 인덱스 자체도 삭제합니다.
+        """
+        progress = {'scanned': 0, 'deleted': 0, 'done': False, 'cancelled': False}
+        if not self.redis_client:
+            progress['done'] = True
+            yield progress
+            return
+
+        await self.redis_client.zremrangebyscore(index_key, '-inf', time.time())
+        cursor = 0
+        buffer: List[str] = []
+        while True:
+            cursor, entries = await self.redis_client.zscan(
+                index_key, cursor=cursor, count=scan_count
+            )
+            members = [member for member, _ in entries]
+            progress['scanned'] += len(members)
+            buffer.extend(members)
+
+            while len(buffer) >= chunk_size:
+                chunk, buffer = buffer[:chunk_size], buffer[chunk_size:]
+                progress['deleted'] += await self._unlink_chunk(chunk)
+
+            if cursor == 0:
+                break
+            if cancel_event is not None and cancel_event.is_set():
+                progress['cancelled'] = True
+                break
+            yield dict(progress)
+
+        if buffer:
+            progress['deleted'] += await self._unlink_chunk(buffer)
+        if not progress['cancelled']:
+            await self.redis_client.unlink(index_key)
+
+        progress['done'] = True
+        yield dict(progress)
+
+    async def _unlink_chunk(self, keys: List[str]) -> int:
+        """키 묶음 UNLINK (메모리 회수는 Redis 백그라운드 스레드에서 수행)"""
+        if not keys:
             return 0
+        self._invalidate_local(keys)
+        deleted = await self.redis_client.unlink(*keys)
+        self.stats['deletes'] += deleted
+        return deleted
 
     async def mget(self, keys: List[str]) -> List[Optional[str]]:
         """여러 키 일괄 조회"""
         if not self.redis_client:
             return [None] * len(keys)
+
+        # 로컬 캐시에서 먼저 채우고 나머지만 Redis 조회
+        values: List[Optional[str]] = [None] * len(keys)
+        remote_idx = []
+        tracked = []
+        for i, key in enumerate(keys):
+            if self.local_cache and self.local_cache.accepts(key):
+                local_value = self.local_cache.get(key)
+                if local_value is not None:
+                    values[i] = local_value
+                    continue
+                self.local_cache.begin(key)
+                tracked.append(i)
+            remote_idx.append(i)
+
         try:
-            values = await self.redis_client.mget(keys)
+            if remote_idx:
+                remote = await self.redis_client.mget([keys[i] for i in remote_idx])
+                for i, val in zip(remote_idx, remote):
+                    values[i] = val
             for val in values:
                 if val:
                     self.stats['hits'] += 1
@@ -106,15 +390,46 @@ class CacheService:
         except Exception as e:
             logger.error(f"Cache mget error: {str(e)}")
             return [None] * len(keys)
+        finally:
+            for i in tracked:
+                self.local_cache.finish(keys[i], values[i])
+
+    async def mset(
+        self,
+        mapping: Dict[str, str],
+        expire: int = 3600,
+        indexes: Optional[Dict[str, List[str]]] = None
+    ):
+        """
+        여러 키-값 일괄 저장
+
+        Args:
+            mapping: 저장할 키-값
+            expire: TTL (초)
+            indexes: 키별 보조 인덱스 ZSET 목록 (선택)
 
-    async def mset(self, mapping: Dict[str, str], expire: int = 3600):
-        """여러 키-값 일괄 저장"""
+        인덱스는 멤버 점수를 만료 시각으로 두고, 쓸 때마다 만료된 멤버를 제거합니다.
+        (키가 TTL로 사라져도 인덱스 멤버가 남아 무한히 커지지 않도록)
+        """
         if not self.redis_client:
             return False
+        self._invalidate_local(list(mapping))
         try:
-            async with self.redis_client.pipeline() as pipe:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
                 for key, value in mapping.items():
                     pipe.set(key, value, ex=expire)
+                index_members: Dict[str, List[str]] = {}
+                for key, index_keys in (indexes or {}).items():
+                    for index_key in index_keys:
+                        index_members.setdefault(index_key, []).append(key)
+                now = time.time()
+                expires_at = now + expire
+                for index_key, members in index_members.items():
+                    pipe.zadd(index_key, {member: expires_at for member in members})
+                    pipe.zremrangebyscore(index_key, '-inf', now)
+                    # 신규 인덱스는 TTL 설정(NX), 기존 인덱스는 더 길 때만 연장(GT)
+                    pipe.expire(index_key, expire, nx=True)
+                    pipe.expire(index_key, expire, gt=True)
                 await pipe.execute()
                 self.stats['sets'] += len(mapping)
             return True
@@ -122,12 +437,28 @@ class CacheService:
             logger.error(f"Cache mset error: {str(e)}")
             return False
 
+    def _invalidate_local(self, keys: List[str]):
+        """자기 쓰기를 로컬 캐시에 즉시 반영 (서버 무효화 메시지 도착 전)"""
+        if self.local_cache:
+            self.local_cache.invalidate(keys)
+
+    async def incr(self, key: str) -> Optional[int]:
+        """카운터 증가 (네임스페이스 버전 등)"""
+        if not self.redis_client:
+            return None
+        self._invalidate_local([key])
+        try:
+            return await self._execute('incr', key)
+        except Exception as e:
+            logger.error(f"Cache incr error: {str(e)}")
+            return None
+
     async def exists(self, key: str) -> bool:
         """캐시 키 존재 여부 확인"""
         if not self.redis_client:
             return False
         try:
-            return await self.redis_client.exists(key) > 0
+            return await self._execute('exists', key) > 0
         except Exception as e:
             logger.error(f"Cache exists error: {str(e)}")
             return False
@@ -137,7 +468,7 @@ class CacheService:
         if not self.redis_client:
             return -2
         try:
-            return await self.redis_client.ttl(key)
+            return await self._execute('ttl', key)
         except Exception as e:
             logger.error(f"Cache TTL error: {str(e)}")
             return -2
@@ -171,7 +502,10 @@ class CacheService:
             'hit_rate': round(hit_rate, 2),
             'sets': self.stats['sets'],
             'deletes': self.stats['deletes'],
-            'total_requests': total_requests
+            'total_requests': total_requests,
+            'pipelines': self.stats['pipelines'],
+            'pipelined_commands': self.stats['pipelined_commands'],
+            'local_cache': self.local_cache.get_stats() if self.local_cache else {'enabled': False}
         }
 
     def reset_stats(self):
@@ -180,8 +514,12 @@ class CacheService:
             'hits': 0,
             'misses': 0,
             'sets': 0,
-            'deletes': 0
+            'deletes': 0,
+            'pipelines': 0,
+            'pipelined_commands': 0
         }
+        if self.local_cache:
+            self.local_cache.stats = {key: 0 for key in self.local_cache.stats}
 
 
 # 싱글톤 인스턴스
@@ -0,0 +1,128 @@
+"""
+캐시 백그라운드 작업 관리
+
+대량 purge처럼 오래 걸리는 캐시 작업을 백그라운드 태스크로 실행하고
+진행 상황/취소를 모니터링 API에서 다룰 수 있게 합니다.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Callable, AsyncIterator
+import asyncio
+import logging
+import uuid
+
+from app.services.cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+# 작업 러너: 취소 이벤트를 받아 진행 상황 dict를 yield 하는 async generator
+JobRunner = Callable[[asyncio.Event], AsyncIterator[Dict[str, Any]]]
+
+
+class CacheJob:
+    """백그라운드 캐시 작업 상태"""
+
+    def __init__(self, kind: str, params: Dict[str, Any]):
+        self.id = f"job_{uuid.uuid4().hex[:12]}"
+        self.kind = kind
+        self.params = params
+        self.status = 'pending'  # pending, running, completed, cancelled, failed
+        self.progress: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.cancel_event = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'params': self.params,
+            'status': self.status,
+            'progress': self.progress,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class CacheJobManager:
+    """캐시 작업 레지스트리 (최근 작업만 보관)"""
+
+    def __init__(self, max_jobs: int = 100):
+        self.max_jobs = max_jobs
+        self.jobs: "OrderedDict[str, CacheJob]" = OrderedDict()
+
+    def start(self, kind: str, params: Dict[str, Any], runner: JobRunner) -> CacheJob:
+        """작업 생성 후 백그라운드 실행"""
+        job = CacheJob(kind, params)
+        self.jobs[job.id] = job
+        self._evict_finished()
+        job.task = asyncio.create_task(self._run(job, runner))
+        return job
+
+    async def _run(self, job: CacheJob, runner: JobRunner):
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        logger.info(f"Cache job started: {job.id} ({job.kind}) {job.params}")
+        try:
+            async for progress in runner(job.cancel_event):
+                job.progress = progress
+            # 마지막 단계 이후 들어온 취소 요청은 무시 (러너가 실제로 중단했을 때만 cancelled)
+            job.status = 'cancelled' if job.progress.get('cancelled') else 'completed'
+        except asyncio.CancelledError:
+            job.status = 'cancelled'
+        except Exception as e:
+            logger.error(f"Cache job failed: {job.id} - {str(e)}")
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+            logger.info(f"Cache job finished: {job.id} status={job.status} progress={job.progress}")
+
+    def _evict_finished(self):
+        """보관 한도 초과 시 오래된 종료 작업부터 제거"""
+        if len(self.jobs) <= self.max_jobs:
+            return
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.max_jobs:
+                break
+            if self.jobs[job_id].finished_at is not None:
+                del self.jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[CacheJob]:
+        return self.jobs.get(job_id)
+
+    def list(self) -> List[CacheJob]:
+        return list(reversed(self.jobs.values()))
+
+    def cancel(self, job_id: str) -> Optional[CacheJob]:
+        """작업 취소 요청 (현재 청크 처리 후 중단)"""
+        job = self.jobs.get(job_id)
+        if job and job.finished_at is None:
+            job.cancel_event.set()
+        return job
+
+    def start_purge(self, pattern: str, scan_count: int = 1000, chunk_size: int = 500) -> CacheJob:
+        """패턴 purge 작업 시작"""
+        def runner(cancel_event: asyncio.Event):
+            return cache_service.purge_iter(
+                pattern,
+                scan_count=scan_count,
+                chunk_size=chunk_size,
+                cancel_event=cancel_event
+            )
+
+        return self.start(
+            'purge',
+            {'pattern': pattern, 'scan_count': scan_count, 'chunk_size': chunk_size},
+            runner
+        )
+
+
+# 싱글톤 인스턴스
+cache_job_manager = CacheJobManager()
@@ -0,0 +1,279 @@
+"""
+번역 캐시 워밍업
+
+배포/Redis 재시작 직후 캐시 미스로 인한 LLM 호출 지연을 줄이기 위해
+자주 쓰인 문장을 미리 번역해 캐시에 채웁니다.
+
+- messages 테이블에서 언어쌍별 빈도 상위 original_text 추출
+- 큐레이션된 상담사 자주 쓰는 문구 (한국어 → 고객 언어)
+- 이미 캐시된 항목은 mget으로 건너뛰고, 미스만 동시성 제한 하에 번역
+- cache_service.mset으로 일괄 저장, 진행률/ETA 보고
+
+사용:
+    python -m app.services.cache_warmup --per-pair 100 --days 30 --concurrency 4
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Tuple, Dict, Any, Optional, AsyncIterator
+import argparse
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select, func
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.database import Message
+from app.services.cache import cache_service
+from app.services.cache_jobs import cache_job_manager
+from app.services.translation import translation_service
+
+logger = logging.getLogger(__name__)
+
+CUSTOMER_LANGUAGES = ['en', 'ja', 'zh', 'vi', 'th']
+
+# 상담사가 자주 사용하는 문구 (한국어 원문)
+CURATED_PHRASES = [
+    "안녕하세요, 무엇을 도와드릴까요?",
+    "잠시만 기다려 주세요.",
+    "예약을 도와드리겠습니다.",
+    "어떤 증상이 있으신가요?",
+    "언제부터 아프셨나요?",
+    "통증은 어느 정도인가요?",
+    "복용 중인 약이 있으신가요?",
+    "알레르기가 있으신가요?",
+    "진료 예약 날짜를 알려주세요.",
+    "처방전은 약국에서 받으시면 됩니다.",
+    "검사 결과는 내일 안내해 드리겠습니다.",
+    "입원 수속을 안내해 드리겠습니다.",
+    "신분증과 보험증을 지참해 주세요.",
+    "감사합니다. 좋은 하루 되세요.",
+    "다른 문의 사항이 있으신가요?",
+]
+
+# (text, source_lang, target_lang)
+WarmupItem = Tuple[str, str, str]
+
+
+def mine_frequent_phrases(per_pair: int, days: int, max_chars: int) -> List[WarmupItem]:
+    """
+    언어쌍별 빈도 상위 원문 조회 (동기 DB 접근)
+
+    Args:
+        per_pair: 언어쌍당 최대 문장 수
+        days: 최근 N일 메시지만 집계
+        max_chars: 이보다 긴 메시지는 제외 (재사용 가능성 낮음)
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+    count = func.count().label('cnt')
+    ranked = (
+        select(
+            Message.source_lang,
+            Message.target_lang,
+            Message.original_text,
+            count,
+            func.row_number().over(
+                partition_by=(Message.source_lang, Message.target_lang),
+                order_by=func.count().desc()
+            ).label('rn')
+        )
+        .where(
+            Message.created_at >= since,
+            Message.target_lang.isnot(None),
+            func.length(Message.original_text) <= max_chars
+        )
+        .group_by(Message.source_lang, Message.target_lang, Message.original_text)
+        .subquery()
+    )
+    query = (
+        select(ranked.c.original_text, ranked.c.source_lang, ranked.c.target_lang)
+        .where(ranked.c.rn <= per_pair, ranked.c.cnt >= 2)
+        .order_by(ranked.c.cnt.desc())
+    )
+
+    db = SessionLocal()
+    try:
+        return [(row.original_text, row.source_lang, row.target_lang) for row in db.execute(query)]
+    finally:
+        db.close()
+
+
+def curated_items() -> List[WarmupItem]:
+    """큐레이션 문구 × 고객 언어"""
+    return [
+        (phrase, 'ko', target_lang)
+        for phrase in CURATED_PHRASES
+        for target_lang in CUSTOMER_LANGUAGES
+    ]
+
+
+async def run_warmup(
+    per_pair: int = 100,
+    days: int = 30,
+    max_chars: int = 200,
+    concurrency: int = 4,
+    include_history: bool = True,
+    cancel_event: Optional[asyncio.Event] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    캐시 워밍업 실행
+
+    Yields:
+        진행 상황 {'total', 'skipped', 'cached', 'translated', 'failed', 'done',
+                  'rate_per_sec', 'eta_seconds', 'elapsed_seconds'}
+    """
+    started = time.monotonic()
+    items: List[WarmupItem] = curated_items()
+    if include_history:
+        try:
+            loop = asyncio.get_running_loop()
+            items += await loop.run_in_executor(
+                None, mine_frequent_phrases, per_pair, days, max_chars
+            )
+        except Exception as e:
+            logger.error(f"Warm-up history mining failed: {str(e)}")
+
+    # 중복 제거 (순서 유지), 채팅 번역에서도 생략되는 항목(숫자/이모지/URL만)은 제외
+    items = list(dict.fromkeys(item for item in items if item[1] != item[2]))
+    translatable = [
+        item for item in items if not translation_service.is_untranslatable(item[0], track_stats=False)
+    ]
+    skipped = len(items) - len(translatable)
+    items = translatable
+
+    progress: Dict[str, Any] = {
+        'total': len(items),
+        'skipped': skipped,
+        'cached': 0,
+        'translated': 0,
+        'failed': 0,
+        'done': False,
+        'cancelled': False,
+        'rate_per_sec': 0.0,
+        'eta_seconds': None,
+        'elapsed_seconds': 0.0,
+    }
+
+    # 1. 이미 캐시된 항목 제외 (mget 한 번)
+    lookups = await translation_service.lookup_cache(items)
+    misses = []
+    for item, (cache_key, cached) in zip(items, lookups):
+        if cached:
+            progress['cached'] += 1
+        else:
+            misses.append((item, cache_key))
+
+    logger.info(
+        f"Cache warm-up: {progress['total']} phrases, "
+        f"{progress['cached']} already cached, {len(misses)} to translate"
+    )
+    yield dict(progress)
+
+    # 2. 미스만 동시성 제한 하에 번역
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    pending: List[Tuple[str, str, str, str, str]] = []
+    flush_size = 50
+
+    async def translate_one(item: WarmupItem, cache_key: str):
+        text, source_lang, target_lang = item
+        async with semaphore:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            try:
+                _, cache_value = await translation_service.translate_for_cache(
+                    text, source_lang, target_lang
+                )
+                if cache_value is not None:
+                    pending.append((cache_key, text, source_lang, target_lang, cache_value))
+                progress['translated'] += 1
+            except Exception as e:
+                logger.warning(f"Warm-up translation failed ({source_lang}->{target_lang}): {str(e)}")
+                progress['failed'] += 1
+
+    def update_eta():
+        elapsed = time.monotonic() - started
+        finished = progress['translated'] + progress['failed']
+        remaining = len(misses) - finished
+        rate = finished / elapsed if elapsed > 0 else 0.0
+        progress['elapsed_seconds'] = round(elapsed, 1)
+        progress['rate_per_sec'] = round(rate, 2)
+        progress['eta_seconds'] = round(remaining / rate, 1) if rate > 0 else None
+
+    tasks = [asyncio.create_task(translate_one(item, key)) for item, key in misses]
+    try:
+        for finished_task in asyncio.as_completed(tasks):
+            await finished_task
+            # 캐시 저장은 flush_size개씩 묶고, 진행률/ETA는 항목마다 갱신 (모두 실패해도 진행 표시)
+            if len(pending) >= flush_size:
+                batch = pending[:]
+                pending.clear()
+                await translation_service.store_cache(batch)
+            update_eta()
+            yield dict(progress)
+            finished = progress['translated'] + progress['failed']
+            if cancel_event is not None and cancel_event.is_set() and finished < len(misses):
+                progress['cancelled'] = True
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        if pending:
+            await translation_service.store_cache(list(pending))
+
+    update_eta()
+    progress['done'] = True
+    logger.info(f"Cache warm-up finished: {progress}")
+    yield dict(progress)
+
+
+def start_warmup_job():
+    """
+    워밍업을 캐시 백그라운드 작업으로 시작 (non-blocking)
+
+    진행 상황은 /api/monitoring/cache/jobs/{job_id}에서 조회할 수 있습니다.
+    """
+    params = {
+        'per_pair': settings.CACHE_WARMUP_PER_PAIR,
+        'days': settings.CACHE_WARMUP_DAYS,
+        'concurrency': settings.CACHE_WARMUP_CONCURRENCY,
+    }
+
+    def runner(cancel_event: asyncio.Event):
+        return run_warmup(cancel_event=cancel_event, **params)
+
+    return cache_job_manager.start('warmup', params, runner)
+
+
+async def _main(args: argparse.Namespace):
+    await cache_service.connect()
+    if not cache_service.redis_client:
+        logger.error("Redis not available, aborting warm-up")
+        return
+    try:
+        async for progress in run_warmup(
+            per_pair=args.per_pair,
+            days=args.days,
+            max_chars=args.max_chars,
+            concurrency=args.concurrency,
+            include_history=not args.no_history,
+        ):
+            eta = progress['eta_seconds']
+            print(
+                f"[warmup] cached={progress['cached']} translated={progress['translated']} "
+                f"failed={progress['failed']} / total={progress['total']} "
+                f"rate={progress['rate_per_sec']}/s eta={eta if eta is not None else '-'}s"
+            )
+    finally:
+        await cache_service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-translate frequent phrases into the cache")
+    parser.add_argument("--per-pair", type=int, default=settings.CACHE_WARMUP_PER_PAIR)
+    parser.add_argument("--days", type=int, default=settings.CACHE_WARMUP_DAYS)
+    parser.add_argument("--max-chars", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=settings.CACHE_WARMUP_CONCURRENCY)
+    parser.add_argument("--no-history", action="store_true", help="큐레이션 문구만 워밍업")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,202 @@
+"""
+Redis 서버 지원 클라이언트 사이드 캐시
+
+Redis `CLIENT TRACKING`(BCAST 모드)으로 지정한 prefix의 키가 변경/삭제되면
+`__redis__:invalidate` 채널로 무효화 메시지를 받아 워커 로컬 캐시를 비웁니다.
+다른 워커가 번역을 덮어쓰거나 지워도 로컬 복사본이 stale 상태로 남지 않습니다.
+"""
+
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple
+import asyncio
+import logging
+import time
+import uuid
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "__redis__:invalidate"
+
+
+class TrackedLocalCache:
+    """
+    무효화 추적 기반 로컬 LRU 캐시
+
+    - 최대 키 수(LRU)와 TTL로 메모리 상한 유지
+    - Redis 조회 중(in-flight) 무효화가 도착한 키는 저장하지 않음 (stale 방지)
+    - 추적 연결이 끊기면 전체 비움 (무효화 누락 가능성)
+    """
+
+    def __init__(self, max_keys: int, ttl: int, prefixes: List[str]):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self.prefixes = tuple(prefixes)
+        self._data: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        # key -> [진행 중 조회 수, 조회 중 무효화 여부]
+        self._inflight: Dict[str, list] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._running = False
+        self._connected = False
+        self.stats = {
+            'local_hits': 0,
+            'invalidations': 0,
+            'flushes': 0
+        }
+
+    def accepts(self, key: str) -> bool:
+        """로컬 캐싱 대상 키인지 (추적 연결이 살아있을 때만)"""
+        return self._connected and key.startswith(self.prefixes)
+
+    def get(self, key: str) -> Optional[str]:
+        """로컬 조회 (만료 시 제거)"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        self.stats['local_hits'] += 1
+        return value
+
+    def begin(self, key: str):
+        """Redis 조회 시작 표시"""
+        state = self._inflight.setdefault(key, [0, False])
+        state[0] += 1
+
+    def finish(self, key: str, value: Optional[str]):
+        """Redis 조회 완료 - 조회 중 무효화가 없었을 때만 로컬 저장"""
+        state = self._inflight.get(key)
+        if state is None:
+            return
+        state[0] -= 1
+        invalidated = state[1]
+        if state[0] <= 0:
+            del self._inflight[key]
+        if value is None or invalidated or not self._connected:
+            return
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_keys:
+            self._data.popitem(last=False)
+
+    def invalidate(self, keys: List[str]):
+        """키 무효화"""
+        for key in keys:
+            self._data.pop(key, None)
+            state = self._inflight.get(key)
+            if state is not None:
+                state[1] = True
+        self.stats['invalidations'] += len(keys)
+
+    def clear(self):
+        """전체 무효화 (FLUSHALL 또는 추적 연결 유실)"""
+        self._data.clear()
+        for state in self._inflight.values():
+            state[1] = True
+        self.stats['flushes'] += 1
+
+    async def start(self, redis_url: str, health_check_interval: int = 30):
+        """무효화 리스너 시작"""
+        if self._running:
+            return
+        self._running = True
+        self._listener = asyncio.create_task(
+            self._listen(redis_url, health_check_interval)
+        )
+
+    async def stop(self):
+        """무효화 리스너 종료"""
+        self._running = False
+        self._connected = False
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self._data.clear()
+
+    async def _listen(self, redis_url: str, health_check_interval: int):
+        """
+        무효화 채널 구독 루프
+
+        구독 연결의 client id로 추적 연결을 REDIRECT 합니다.
+        (RESP2/RESP3 모두 동작하는 redirect 방식)
+        """
+        while self._running:
+            client_name = f"medtranslate-inv-{uuid.uuid4().hex[:8]}"
+            subscriber = redis.Redis.from_url(
+                redis_url, decode_responses=True, client_name=client_name
+            )
+            tracker = redis.Redis.from_url(
+                redis_url, decode_responses=True, single_connection_client=True
+            )
+            pubsub = subscriber.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                clients = await subscriber.client_list(_type='pubsub')
+                target_id = next(
+                    c['id'] for c in clients if c.get('name') == client_name
+                )
+
+                prefix_args = []
+                for prefix in self.prefixes:
+                    prefix_args += ['PREFIX', prefix]
+                await tracker.execute_command(
+                    'CLIENT', 'TRACKING', 'ON',
+                    'REDIRECT', target_id, 'BCAST', *prefix_args
+                )
+
+                self._connected = True
+                logger.info(f"Client-side cache tracking enabled (prefixes={list(self.prefixes)})")
+
+                last_check = time.monotonic()
+                while self._running:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1.0
+                    )
+                    if message and message['type'] == 'message':
+                        keys = message['data']
+                        if keys is None:
+                            self.clear()
+                        elif isinstance(keys, str):
+                            self.invalidate([keys])
+                        else:
+                            self.invalidate(list(keys))
+
+                    # 추적 연결이 끊기면 무효화가 더 이상 오지 않으므로 주기적으로 확인
+                    if time.monotonic() - last_check >= health_check_interval:
+                        await tracker.ping()
+                        last_check = time.monotonic()
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Client-side cache tracking error: {str(e)}")
+            finally:
+                self._connected = False
+                self.clear()
+                try:
+                    await pubsub.close()
+                    await subscriber.close()
+                    await tracker.close()
+                except Exception:
+                    pass
+
+            if self._running:
+                await asyncio.sleep(1.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """로컬 캐시 통계"""
+        return {
+            'enabled': True,
+            'connected': self._connected,
+            'size': len(self._data),
+            'max_keys': self.max_keys,
+            **self.stats
+        }
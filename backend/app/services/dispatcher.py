@@ -0,0 +1,374 @@
+"""
+채팅방 배정 디스패처 (언어별 대기열 + 원자적 배정)
+
+기존 배정은 방을 읽어 status/agent_id를 Python에서 확인한 뒤 커밋했기 때문에 두 상담사가
+동시에 수락하면 둘 다 성공할 수 있었고 max_concurrent_chats도 확인하지 않았습니다.
+
+- 배정: 한 트랜잭션에서
+  1. 상담사 행을 잠그고(SELECT ... FOR UPDATE) 진행 중인 방 수와 max_concurrent_chats 비교
+     (같은 상담사의 동시 배정 직렬화)
+  2. 조건부 UPDATE (status='waiting' AND 미배정 AND 상담 가능 언어)
+     영향받은 행이 없으면 다른 상담사가 먼저 가져간 것 → 실패 사유만 조회
+- 대기열: 언어별 Redis ZSET (dispatch:waiting:{lang}, score = 생성 시각 ms)
+  다음 방 가져오기는 대기열 앞쪽 후보를 ZREM으로 선점(인스턴스 간 중복 방지)한 뒤 DB 조건부 UPDATE
+  대기 방을 테이블에서 찾지 않으므로 대기 방 수와 무관 (시작 시 부분 인덱스로 한 번 재구성)
+- 자동 배정 (DISPATCH_AUTO_ASSIGN): 방 생성 시 접속 중인 상담사 중 언어가 맞고 여유가 가장 많은
+  상담사에게 배정, 상담 종료/구독 시 상담사 여유만큼 대기열에서 가져옴
+- 상담 가능 언어: agents.languages (비어 있으면 모든 언어)
+"""
+
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Set, Tuple
+import asyncio
+import logging
+
+from sqlalchemy import func, or_, update
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.database import ChatRoom, Agent
+from app.services.cache import cache_service
+from app.services.room_state import room_state
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "dispatch:waiting"
+LANGUAGES_KEY = "dispatch:languages"
+
+
+class AssignmentError(Exception):
+    """배정 실패 (reason: not_found, not_waiting, taken, capacity, language, no_agent)"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def _score(created_at: Optional[datetime]) -> float:
+    return (created_at or datetime.utcnow()).timestamp() * 1000
+
+
+class RoomDispatcher:
+    """언어별 대기열 및 원자적 채팅방 배정"""
+
+    def __init__(self):
+        self._local: Dict[str, Dict[str, float]] = {}  # Redis 미연결 시 언어별 대기열
+        self._online: Dict[str, Set[str]] = {}  # 접속 중인 상담사 → sid
+        self.stats = {
+            'assigned': 0,
+            'auto_assigned': 0,
+            'conflicts': 0,
+            'capacity_rejects': 0,
+            'stale_entries': 0,
+            'rebuilds': 0,
+        }
+
+    def _key(self, language: str) -> str:
+        return f"{KEY_PREFIX}:{language}"
+
+    # ----- 대기열 -----
+
+    async def rebuild(self):
+        """DB의 미배정 대기 방으로 대기열 재구성 (시작 시)"""
+        try:
+            rooms = await asyncio.to_thread(self._load_waiting)
+        except Exception as e:
+            logger.error(f"Dispatch queue load error: {str(e)}")
+            return
+        by_language: Dict[str, Dict[str, float]] = {}
+        for room_id, language, created_at in rooms:
+            by_language.setdefault(language, {})[room_id] = _score(created_at)
+
+        self._local = {}
+        client = cache_service.redis_client
+        if client:
+            try:
+                languages = await client.smembers(LANGUAGES_KEY)
+                async with client.pipeline(transaction=True) as pipe:
+                    for language in set(languages) | set(by_language):
+                        pipe.delete(self._key(language))
+                    for language, entries in by_language.items():
+                        pipe.zadd(self._key(language), entries)
+                        pipe.sadd(LANGUAGES_KEY, language)
+                    await pipe.execute()
+            except Exception as e:
+                logger.error(f"Dispatch queue rebuild error, using local queues: {str(e)}")
+                self._local = by_language
+        else:
+            self._local = by_language
+        self.stats['rebuilds'] += 1
+        logger.info(f"Dispatch queues rebuilt: {len(rooms)} waiting rooms")
+
+    def _load_waiting(self) -> List[Tuple[str, str, datetime]]:
+        db = SessionLocal()
+        try:
+            return db.query(ChatRoom.id, ChatRoom.customer_language, ChatRoom.created_at)\
+                .filter(ChatRoom.status == 'waiting', ChatRoom.agent_id.is_(None))\
+                .all()
+        finally:
+            db.close()
+
+    async def enqueue(self, room: ChatRoom):
+        """미배정 대기 방 추가 (생성 시)"""
+        await self._push(room.id, room.customer_language, _score(room.created_at))
+
+    async def _push(self, room_id: str, language: str, score: float):
+        client = cache_service.redis_client
+        if client:
+            try:
+                async with client.pipeline(transaction=False) as pipe:
+                    pipe.zadd(self._key(language), {room_id: score})
+                    pipe.sadd(LANGUAGES_KEY, language)
+                    await pipe.execute()
+                return
+            except Exception as e:
+                logger.error(f"Dispatch enqueue error: {str(e)}")
+        self._local.setdefault(language, {})[room_id] = score
+
+    async def discard(self, room_id: str, language: str) -> bool:
+        """
+        대기열에서 제거
+
+        Returns:
+            이 호출이 제거했으면 True (다른 인스턴스가 먼저 가져갔으면 False)
+        """
+        removed = self._local.get(language, {}).pop(room_id, None) is not None
+        client = cache_service.redis_client
+        if client:
+            try:
+                return bool(await client.zrem(self._key(language), room_id)) or removed
+            except Exception as e:
+                logger.error(f"Dispatch discard error: {str(e)}")
+        return removed
+
+    async def _candidates(self, languages: List[str]) -> List[Tuple[float, str, str]]:
+        """언어별 대기열 앞쪽 후보 (오래된 순) [(score, room_id, language)]"""
+        limit = settings.DISPATCH_CANDIDATES
+        entries: List[Tuple[float, str, str]] = []
+        client = cache_service.redis_client
+        if client:
+            try:
+                if not languages:
+                    languages = sorted(await client.smembers(LANGUAGES_KEY))
+                async with client.pipeline(transaction=False) as pipe:
+                    for language in languages:
+                        pipe.zrange(self._key(language), 0, limit - 1, withscores=True)
+                    replies = await pipe.execute()
+                for language, members in zip(languages, replies):
+                    entries.extend((score, room_id, language) for room_id, score in members)
+            except Exception as e:
+                logger.error(f"Dispatch queue read error: {str(e)}")
+        for language, queue in self._local.items():
+            if languages and language not in languages:
+                continue
+            entries.extend(
+                (score, room_id, language)
+                for room_id, score in sorted(queue.items(), key=lambda item: item[1])[:limit]
+            )
+        return sorted(entries)[:limit]
+
+    # ----- 배정 -----
+
+    def _assign_in_db(self, room_id: str, agent_id: str) -> ChatRoom:
+        """상담사 잠금 → 여유 확인 → 조건부 UPDATE (한 트랜잭션)"""
+        db = SessionLocal()
+        try:
+            agent = db.query(Agent).filter(Agent.id == agent_id).with_for_update().first()
+            if agent is None:
+                raise AssignmentError('no_agent')
+
+            active = db.query(func.count(ChatRoom.id))\
+                .filter(ChatRoom.agent_id == agent_id, ChatRoom.status == 'active')\
+                .scalar()
+            if active >= (agent.max_concurrent_chats or 0):
+                db.rollback()
+                raise AssignmentError('capacity')
+
+            conditions = [
+                ChatRoom.id == room_id,
+                ChatRoom.status == 'waiting',
+                or_(ChatRoom.agent_id.is_(None), ChatRoom.agent_id == agent_id),
+            ]
+            if agent.languages:
+                conditions.append(ChatRoom.customer_language.in_(agent.languages))
+            result = db.execute(
+                update(ChatRoom)
+                .where(*conditions)
+                .values(agent_id=agent_id, status='active')
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                db.rollback()
+                room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
+                if room is None:
+                    raise AssignmentError('not_found')
+                if room.status != 'waiting':
+                    raise AssignmentError('not_waiting')
+                if room.agent_id and room.agent_id != agent_id:
+                    raise AssignmentError('taken')
+                raise AssignmentError('language')
+
+            db.commit()
+            return db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
+        finally:
+            db.close()
+
+    async def assign(self, room_id: str, agent_id: str) -> ChatRoom:
+        """
+        채팅방을 상담사에게 배정 (수락)
+
+        Raises:
+            AssignmentError: 배정 실패 사유
+        """
+        try:
+            room = await asyncio.to_thread(self._assign_in_db, room_id, agent_id)
+        except AssignmentError as e:
+            if e.reason in ('not_waiting', 'taken'):
+                self.stats['conflicts'] += 1
+            elif e.reason == 'capacity':
+                self.stats['capacity_rejects'] += 1
+            raise
+        self.stats['assigned'] += 1
+        await self.discard(room.id, room.customer_language)
+        await room_state.upsert(room)
+        return room
+
+    async def claim_next(self, agent_id: str) -> Optional[ChatRoom]:
+        """
+        상담사가 받을 수 있는 가장 오래된 대기 방 배정
+
+        Returns:
+            배정된 방 (대기 방이 없거나 여유가 없으면 None)
+        """
+        languages = await asyncio.to_thread(self._agent_languages, agent_id)
+        if languages is None:
+            return None
+        for score, room_id, language in await self._candidates(languages):
+            # 선점 실패 = 다른 인스턴스/요청이 먼저 가져감
+            if not await self.discard(room_id, language):
+                continue
+            try:
+                room = await asyncio.to_thread(self._assign_in_db, room_id, agent_id)
+            except AssignmentError as e:
+                if e.reason in ('capacity', 'language', 'no_agent'):
+                    # 방은 그대로 대기 → 대기열 복구
+                    await self._push(room_id, language, score)
+                    if e.reason == 'capacity':
+                        self.stats['capacity_rejects'] += 1
+                    return None
+                self.stats['stale_entries'] += 1
+                continue
+            self.stats['assigned'] += 1
+            await room_state.upsert(room)
+            return room
+        return None
+
+    async def fill(self, agent_id: str) -> List[ChatRoom]:
+        """상담사 여유만큼 대기 방 배정 (자동 배정 시 상담 종료/접속 후)"""
+        rooms = []
+        if not settings.DISPATCH_AUTO_ASSIGN:
+            return rooms
+        try:
+            while True:
+                room = await self.claim_next(agent_id)
+                if room is None:
+                    break
+                rooms.append(room)
+                self.stats['auto_assigned'] += 1
+        except Exception as e:
+            logger.error(f"Dispatch fill error ({agent_id}): {str(e)}")
+        return rooms
+
+    async def auto_assign(self, room: ChatRoom) -> Optional[ChatRoom]:
+        """새 대기 방을 접속 중인 상담사 중 여유가 가장 많은 상담사에게 배정 (DISPATCH_AUTO_ASSIGN)"""
+        if not settings.DISPATCH_AUTO_ASSIGN or not self._online:
+            return None
+        try:
+            candidates = await asyncio.to_thread(
+                self._rank_agents, list(self._online), room.customer_language
+            )
+            for agent_id in candidates:
+                try:
+                    assigned = await self.assign(room.id, agent_id)
+                except AssignmentError as e:
+                    if e.reason in ('not_waiting', 'taken', 'not_found'):
+                        return None
+                    continue
+                self.stats['auto_assigned'] += 1
+                return assigned
+        except Exception as e:
+            logger.error(f"Auto assign error ({room.id}): {str(e)}")
+        return None
+
+    def _agent_languages(self, agent_id: str) -> Optional[List[str]]:
+        """상담 가능 언어 (여유가 없으면 None, 빈 목록이면 모든 언어)"""
+        db = SessionLocal()
+        try:
+            agent = db.query(Agent).filter(Agent.id == agent_id).first()
+            if agent is None:
+                return None
+            active = db.query(func.count(ChatRoom.id))\
+                .filter(ChatRoom.agent_id == agent_id, ChatRoom.status == 'active')\
+                .scalar()
+            if active >= (agent.max_concurrent_chats or 0):
+                return None
+            return list(agent.languages or [])
+        finally:
+            db.close()
+
+    def _rank_agents(self, agent_ids: List[str], language: str) -> List[str]:
+        """언어가 맞고 여유가 있는 상담사 (진행 중인 방 비율이 낮은 순)"""
+        db = SessionLocal()
+        try:
+            agents = db.query(Agent).filter(Agent.id.in_(agent_ids)).all()
+            counts = dict(
+                db.query(ChatRoom.agent_id, func.count(ChatRoom.id))
+                .filter(ChatRoom.agent_id.in_(agent_ids), ChatRoom.status == 'active')
+                .group_by(ChatRoom.agent_id)
+                .all()
+            )
+        finally:
+            db.close()
+        ranked = []
+        for agent in agents:
+            capacity = agent.max_concurrent_chats or 0
+            active = counts.get(agent.id, 0)
+            if active >= capacity or (agent.languages and language not in agent.languages):
+                continue
+            ranked.append((active / capacity, active, agent.id))
+        return [agent_id for _, _, agent_id in sorted(ranked)]
+
+    # ----- 접속 상담사 -----
+
+    def agent_connected(self, agent_id: str, sid: str):
+        self._online.setdefault(agent_id, set()).add(sid)
+
+    def agent_disconnected(self, sid: str):
+        for agent_id in [agent_id for agent_id, sids in self._online.items() if sid in sids]:
+            self._online[agent_id].discard(sid)
+            if not self._online[agent_id]:
+                del self._online[agent_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'auto_assign': settings.DISPATCH_AUTO_ASSIGN,
+            'online_agents': len(self._online),
+            'local_waiting': sum(len(queue) for queue in self._local.values()),
+        }
+
+    async def queue_lengths(self) -> Dict[str, int]:
+        """언어별 대기 방 수"""
+        client = cache_service.redis_client
+        if not client:
+            return {language: len(queue) for language, queue in self._local.items()}
+        languages = sorted(await client.smembers(LANGUAGES_KEY))
+        async with client.pipeline(transaction=False) as pipe:
+            for language in languages:
+                pipe.zcard(self._key(language))
+            counts = await pipe.execute()
+        return dict(zip(languages, counts))
+
+
+# 싱글톤 인스턴스
+dispatcher = RoomDispatcher()
@@ -0,0 +1,337 @@
+"""
+장문 문서 번역 작업 큐
+
+의뢰서/검사 결과처럼 긴 문서는 프로바이더 max_tokens에 걸리고 소켓 핸들러를
+수십 초간 붙잡습니다. 문서를 청크로 나눠 백그라운드 워커가 병렬 번역하고,
+순서대로 다시 합쳐 DB에 저장합니다.
+
+- 큐: Redis 리스트 (docjob:queue), Redis 미연결 시 프로세스 로컬 asyncio.Queue
+- 처리 중인 작업은 BLMOVE로 docjob:processing:{워커 ID}로 옮기고 완료 후 제거,
+  프로세스가 죽어 남은 작업은 같은 워커 ID를 임대한 프로세스가 기동 시 큐 앞으로 되돌림
+  (워커 ID 임대 - app/services/worker_lease.py 이후에 start 호출)
+- 진행 상황: Socket.IO 'document_job_progress' (docjob:{job_id} 룸 + 채팅방)
+- 상태/결과: document_jobs 테이블 (REST 조회)
+"""
+
+from datetime import datetime
+from typing import Optional, List, Tuple, Callable, Awaitable, Dict, Any
+import asyncio
+import logging
+import re
+import time
+import uuid
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.database import DocumentJob
+from app.services.cache import cache_service
+from app.services.message_ids import message_ids
+from app.services.translation import translation_service
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "docjob:queue"
+PROCESSING_PREFIX = "docjob:processing"
+
+
+def processing_key(worker_id: int) -> str:
+    return f"{PROCESSING_PREFIX}:{worker_id}"
+
+# 문장 경계 (마침표/물음표/느낌표, CJK 구두점 뒤 공백)
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?。！？])\s+')
+
+
+def chunk_document(text: str, max_chars: int) -> List[Tuple[str, str]]:
+    """
+    문서를 번역 청크로 분할
+
+    문단(빈 줄) 단위로 나누고, max_chars를 넘는 문단은 문장 단위로 다시 나눕니다.
+    원문 구분자를 함께 반환해 번역 후 같은 형식으로 재조립할 수 있습니다.
+
+    Returns:
+        (청크, 뒤따르는 구분자) 목록
+    """
+    chunks: List[Tuple[str, str]] = []
+    parts = re.split(r'(\n\s*\n)', text)
+    for i in range(0, len(parts), 2):
+        paragraph = parts[i]
+        separator = parts[i + 1] if i + 1 < len(parts) else ""
+        if not paragraph.strip():
+            if chunks:
+                chunks[-1] = (chunks[-1][0], chunks[-1][1] + paragraph + separator)
+            continue
+
+        if len(paragraph) <= max_chars:
+            chunks.append((paragraph, separator))
+            continue
+
+        # 긴 문단: 문장을 max_chars 이내로 묶음
+        current = ""
+        for sentence in _SENTENCE_BOUNDARY.split(paragraph):
+            if current and len(current) + len(sentence) + 1 > max_chars:
+                chunks.append((current, " "))
+                current = ""
+            current = f"{current} {sentence}" if current else sentence
+            # 문장 하나가 한도를 넘으면 강제로 자름
+            while len(current) > max_chars:
+                chunks.append((current[:max_chars], ""))
+                current = current[max_chars:]
+        if current:
+            chunks.append((current, separator))
+
+    return chunks
+
+
+class DocumentJobQueue:
+    """문서 번역 작업 큐 + 워커"""
+
+    def __init__(self):
+        self._local_queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._running = False
+        self._notifier: Optional[Callable[..., Awaitable[Any]]] = None
+
+    def set_notifier(self, emit: Callable[..., Awaitable[Any]]):
+        """진행 상황 전송 함수 등록 (sio.emit)"""
+        self._notifier = emit
+
+    async def start(self, workers: int = None):
+        """워커 시작"""
+        if self._running:
+            return
+        self._running = True
+        await self._recover()
+        for i in range(workers or settings.DOCUMENT_JOB_WORKERS):
+            self._workers.append(asyncio.create_task(self._worker(i)))
+        logger.info(f"Document job workers started: {len(self._workers)}")
+
+    async def stop(self):
+        """워커 종료"""
+        self._running = False
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        room_id: Optional[str] = None,
+        context: str = 'medical'
+    ) -> DocumentJob:
+        """작업 등록 (DB 저장 후 큐에 추가)"""
+        job = DocumentJob(
+            id=f"doc_{uuid.uuid4().hex[:12]}",
+            room_id=room_id,
+            status='queued',
+            source_lang=source_lang,
+            target_lang=target_lang,
+            context=context,
+            original_text=text,
+            total_chunks=len(chunk_document(text, settings.DOCUMENT_CHUNK_CHARS)),
+            completed_chunks=0,
+            created_at=datetime.utcnow()
+        )
+
+        await asyncio.to_thread(self._insert, job)
+        await self._enqueue(job.id)
+        logger.info(f"Document job queued: {job.id} ({job.total_chunks} chunks)")
+        return job
+
+    async def get(self, job_id: str) -> Optional[DocumentJob]:
+        """작업 조회"""
+        return await asyncio.to_thread(self._load, job_id)
+
+    def _insert(self, job: DocumentJob):
+        db = SessionLocal()
+        try:
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            db.expunge(job)
+        finally:
+            db.close()
+
+    def _load(self, job_id: str) -> Optional[DocumentJob]:
+        db = SessionLocal()
+        try:
+            job = db.query(DocumentJob).filter(DocumentJob.id == job_id).first()
+            if job:
+                db.expunge(job)
+            return job
+        finally:
+            db.close()
+
+    async def _enqueue(self, job_id: str):
+        if cache_service.redis_client:
+            try:
+                await cache_service.redis_client.rpush(QUEUE_KEY, job_id)
+                return
+            except Exception as e:
+                logger.error(f"Document job enqueue error, using local queue: {str(e)}")
+        await self._local_queue.put(job_id)
+
+    async def _recover(self):
+        """이전 실행이 처리하다 남긴 작업(같은 워커 ID의 처리 목록)을 큐 앞으로 되돌림"""
+        client = cache_service.redis_client
+        if not client:
+            return
+        key = processing_key(message_ids.worker_id)
+        recovered = 0
+        try:
+            while await client.lmove(key, QUEUE_KEY, 'RIGHT', 'LEFT'):
+                recovered += 1
+        except Exception as e:
+            logger.error(f"Document job recovery error: {str(e)}")
+        if recovered:
+            logger.warning(f"Document jobs requeued from previous run: {recovered}")
+
+    async def _dequeue(self) -> Tuple[Optional[str], Optional[str]]:
+        """
+        다음 작업 ID (로컬 큐 우선, 없으면 Redis BLMOVE 1초 대기)
+
+        Returns:
+            (작업 ID, Redis 처리 목록 키 - 로컬 큐에서 꺼냈으면 None)
+        """
+        try:
+            return self._local_queue.get_nowait(), None
+        except asyncio.QueueEmpty:
+            pass
+
+        if cache_service.redis_client:
+            key = processing_key(message_ids.worker_id)
+            try:
+                job_id = await cache_service.redis_client.blmove(QUEUE_KEY, key, 1, 'LEFT', 'RIGHT')
+                return job_id, key
+            except Exception as e:
+                logger.error(f"Document job dequeue error: {str(e)}")
+
+        try:
+            return await asyncio.wait_for(self._local_queue.get(), timeout=1.0), None
+        except asyncio.TimeoutError:
+            return None, None
+
+    async def _ack(self, key: Optional[str], job_id: str):
+        """처리 목록에서 제거 (실패하면 다음 기동 시 다시 처리되지만 완료된 작업은 건너뜀)"""
+        if not key or not cache_service.redis_client:
+            return
+        try:
+            await cache_service.redis_client.lrem(key, 1, job_id)
+        except Exception as e:
+            logger.error(f"Document job ack error: {str(e)}")
+
+    async def _worker(self, worker_id: int):
+        while self._running:
+            try:
+                job_id, key = await self._dequeue()
+                if job_id:
+                    # 예외/취소 시에는 처리 목록에 남겨 다음 기동 때 다시 처리
+                    await self._process(job_id)
+                    await self._ack(key, job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Document worker {worker_id} error: {str(e)}")
+                await asyncio.sleep(1.0)
+
+    async def _update(self, job_id: str, **fields):
+        await asyncio.to_thread(self._update_sync, job_id, **fields)
+
+    def _update_sync(self, job_id: str, **fields):
+        db = SessionLocal()
+        try:
+            db.query(DocumentJob).filter(DocumentJob.id == job_id).update(fields)
+            db.commit()
+        finally:
+            db.close()
+
+    async def _process(self, job_id: str):
+        """청크 분할 → 병렬 번역(동시성 제한) → 순서대로 재조립"""
+        job = await self.get(job_id)
+        if not job or job.status not in ('queued', 'running'):
+            return
+
+        chunks = chunk_document(job.original_text, settings.DOCUMENT_CHUNK_CHARS)
+        total = len(chunks)
+        await self._update(job_id, status='running', started_at=datetime.utcnow(),
+                     total_chunks=total, completed_chunks=0)
+        await self._notify(job, 'running', 0, total)
+
+        # 동일 청크(반복 문구)는 캐시에서 바로 해결, 번역할 내용이 없는 청크(숫자/URL만)는 원문 유지
+        items = [(chunk, job.source_lang, job.target_lang) for chunk, _ in chunks]
+        lookups = await translation_service.lookup_cache(items)
+        translated: List[Optional[str]] = [
+            chunk if translation_service.is_untranslatable(chunk, track_stats=False) else cached
+            for (chunk, _), (_, cached) in zip(chunks, lookups)
+        ]
+        completed = sum(1 for value in translated if value)
+        last_flush = time.monotonic()
+
+        semaphore = asyncio.Semaphore(settings.DOCUMENT_CHUNK_CONCURRENCY)
+
+        async def translate_chunk(index: int):
+            async with semaphore:
+                result, cache_value = await translation_service.translate_for_cache(
+                    chunks[index][0], job.source_lang, job.target_lang, job.context
+                )
+                if cache_value is not None:
+                    await translation_service.store_cache([
+                        (lookups[index][0], chunks[index][0], job.source_lang, job.target_lang, cache_value)
+                    ])
+                return index, result
+
+        tasks = [
+            asyncio.create_task(translate_chunk(i))
+            for i, value in enumerate(translated) if not value
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                index, result = await finished
+                translated[index] = result
+                completed += 1
+                await self._notify(job, 'running', completed, total)
+                # DB 진행률은 1초에 한 번만 갱신
+                if time.monotonic() - last_flush >= 1.0:
+                    await self._update(job_id, completed_chunks=completed)
+                    last_flush = time.monotonic()
+        except Exception as e:
+            for task in tasks:
+                task.cancel()
+            logger.error(f"Document job failed: {job_id} - {str(e)}")
+            await self._update(job_id, status='failed', error=str(e),
+                         completed_chunks=completed, finished_at=datetime.utcnow())
+            await self._notify(job, 'failed', completed, total, error=str(e))
+            return
+
+        result_text = "".join(
+            text + separator for text, (_, separator) in zip(translated, chunks)
+        )
+        await self._update(job_id, status='completed', translated_text=result_text,
+                     completed_chunks=total, finished_at=datetime.utcnow())
+        await self._notify(job, 'completed', total, total)
+        logger.info(f"Document job completed: {job_id} ({total} chunks)")
+
+    async def _notify(self, job: DocumentJob, status: str, completed: int, total: int,
+                      error: Optional[str] = None):
+        if not self._notifier:
+            return
+        payload: Dict[str, Any] = {
+            'job_id': job.id,
+            'status': status,
+            'completed_chunks': completed,
+            'total_chunks': total,
+        }
+        if error:
+            payload['error'] = error
+        rooms = [f"docjob:{job.id}"] + ([job.room_id] if job.room_id else [])
+        try:
+            for room in rooms:
+                await self._notifier('document_job_progress', payload, room=room)
+        except Exception as e:
+            logger.error(f"Document job notify error: {str(e)}")
+
+
+# 싱글톤 인스턴스
+document_job_queue = DocumentJobQueue()
@@ -0,0 +1,170 @@
+"""
+경량 언어 감지 (문자 체계 기반)
+
+클라이언트가 보낸 language 값이나 입장 시 정한 customer_language를 그대로 믿으면
+대화 중 언어를 바꾼 고객의 메시지가 잘못된 언어쌍으로 번역됩니다.
+지원 언어(ko, en, ja, zh, vi, th)는 문자 체계만으로 대부분 구분되므로
+메시지마다 유니코드 범위를 세어 원문 언어를 검증합니다 (외부 의존성 없음, 1ms 미만).
+
+- 한글 → ko / 가나(+한자) → ja / 한자만 → zh (ja와 구분 불확실) / 태국 문자 → th
+- 라틴 문자 + 베트남어 고유 문자(ă đ ơ ư, 성조 붙은 모음 ạ ả ế ...)가 VI_MIN_SPECIFIC개 이상이면 → vi,
+  2개 이상이 여러 단어에 걸쳐 있고 비율이 높으면 → vi (en과 구분 불확실),
+  그 외 라틴 문자 → en (vi와 구분 불확실)
+  (é, à 같은 일반 악센트는 영어 문장 속 이름/외래어(José, résumé)에도 나오므로 근거로 쓰지 않음)
+"""
+
+from typing import Optional, Dict, Any
+import unicodedata
+
+from app.config import settings
+
+# 감지에 사용할 최대 글자 수 (긴 메시지도 앞부분으로 충분)
+MAX_SCAN_CHARS = 200
+
+# 문자 체계만으로 구분할 수 없는 언어 묶음 (감지 언어 -> 같은 묶음)
+AMBIGUOUS_GROUPS = {
+    'en': ('en', 'vi'),  # 기호 없는 라틴 문자
+    'vi': ('en', 'vi'),  # 베트남어 고유 문자가 적은 라틴 문자 (영어 문장 속 베트남 이름일 수 있음)
+    'zh': ('zh', 'ja'),  # 가나 없는 한자
+}
+
+# 베트남어 고유 문자 (Latin Extended Additional의 성조 모음 외)
+VI_SPECIFIC_CHARS = frozenset('ĂăĐđƠơƯư')
+# vi로 확정하는 베트남어 고유 문자 수
+# (영어 문장 속 베트남 이름(Nguyễn, Nguyễn Văn)으로는 확정되지 않도록)
+VI_MIN_SPECIFIC = 3
+# 확정 수보다 적을 때 불확실한 vi로 보는 조건: 고유 문자가 든 단어 수 + 라틴 문자 대비 비율
+VI_MIN_SPECIFIC_WORDS = 2
+VI_MIN_SPECIFIC_RATIO = 0.05
+
+
+class Detection:
+    """언어 감지 결과"""
+
+    def __init__(self, lang: Optional[str], confidence: float, letters: int, certain: bool):
+        self.lang = lang
+        self.confidence = confidence  # 감지 언어 문자 비율 (0~1)
+        self.letters = letters  # 문자(숫자/기호/이모지 제외) 수
+        self.certain = certain  # False: 문자 체계만으로 en/vi 또는 zh/ja를 구분할 수 없음
+
+
+def detect(text: str) -> Detection:
+    """문자 체계별 글자 수로 언어 감지"""
+    hangul = kana = han = thai = latin = vi_specific = vi_words = 0
+    in_vi_word = False
+    # 분해형(NFD) 입력의 결합 성조 기호는 조합해서 한 글자로 셈
+    for char in unicodedata.normalize('NFC', text[:MAX_SCAN_CHARS]):
+        code = ord(char)
+        if code < 0x80:
+            if ('a' <= char <= 'z') or ('A' <= char <= 'Z'):
+                latin += 1
+            else:
+                in_vi_word = False
+        elif 0xAC00 <= code <= 0xD7A3 or 0x1100 <= code <= 0x11FF or 0x3130 <= code <= 0x318F:
+            hangul += 1
+        elif 0x3040 <= code <= 0x30FF or 0x31F0 <= code <= 0x31FF or 0xFF66 <= code <= 0xFF9F:
+            kana += 1
+        elif 0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF:
+            han += 1
+        elif 0x0E00 <= code <= 0x0E7F:
+            thai += 1
+        elif 0x1EA0 <= code <= 0x1EF9 or char in VI_SPECIFIC_CHARS:
+            # ạ ả ấ ầ ẩ ẫ ậ ... ỹ, ă đ ơ ư
+            latin += 1
+            vi_specific += 1
+            if not in_vi_word:
+                vi_words += 1
+                in_vi_word = True
+        elif 0x00C0 <= code <= 0x024F or 0x1E00 <= code <= 0x1EFF:
+            # é à ü ñ ... (다른 언어와 공통인 라틴 확장 문자)
+            latin += 1
+
+    letters = hangul + kana + han + thai + latin
+    if not letters:
+        return Detection(None, 0.0, 0, False)
+
+    vietnamese = _vietnamese(latin, vi_specific, vi_words)
+    scores = {
+        'ko': hangul,
+        'ja': kana + han if kana else 0,
+        'zh': han if not kana else 0,
+        'th': thai,
+        'vi' if vietnamese is not None else 'en': latin,
+    }
+    lang = max(scores, key=scores.get)
+    certain = vietnamese if lang == 'vi' else lang not in AMBIGUOUS_GROUPS
+    return Detection(lang, scores[lang] / letters, letters, certain)
+
+
+def _vietnamese(latin: int, vi_specific: int, vi_words: int) -> Optional[bool]:
+    """
+    라틴 문자가 베트남어인지
+
+    Returns:
+        True: 확정 (고유 문자 VI_MIN_SPECIFIC개 이상)
+        False: 불확실 (고유 문자 2개 이상이 여러 단어에 걸쳐 있고 비율이 높음)
+        None: 베트남어로 볼 근거 부족
+    """
+    if vi_specific >= VI_MIN_SPECIFIC:
+        return True
+    if (vi_specific >= 2 and vi_words >= VI_MIN_SPECIFIC_WORDS
+            and vi_specific / latin >= VI_MIN_SPECIFIC_RATIO):
+        return False
+    return None
+
+
+class LanguageDetector:
+    """원문 언어 검증/보정 및 감지 통계"""
+
+    def __init__(self):
+        self.stats: Dict[str, Any] = {
+            'detections': 0,
+            'agreed': 0,
+            'undetermined': 0,
+            'ambiguous': 0,
+            'corrected': 0,
+            'same_language_skips': 0,
+            'corrections': {},  # "claimed->detected" -> 횟수
+        }
+
+    def resolve(self, text: str, claimed: str) -> str:
+        """
+        원문 언어 결정
+
+        감지 결과가 충분히 확실할 때만 claimed를 보정합니다.
+        (글자 수/비율이 낮거나, en/vi 또는 zh/ja처럼 구분이 불확실하면 claimed 유지)
+        """
+        if not settings.LANGDETECT_ENABLED:
+            return claimed
+
+        detection = detect(text)
+        self.stats['detections'] += 1
+        if detection.lang is None:
+            self.stats['undetermined'] += 1
+            return claimed
+        if detection.lang == claimed:
+            self.stats['agreed'] += 1
+            return claimed
+        if (detection.letters < settings.LANGDETECT_MIN_LETTERS
+                or detection.confidence < settings.LANGDETECT_MIN_CONFIDENCE):
+            self.stats['undetermined'] += 1
+            return claimed
+        if not detection.certain and claimed in AMBIGUOUS_GROUPS[detection.lang]:
+            self.stats['ambiguous'] += 1
+            return claimed
+
+        self.stats['corrected'] += 1
+        pair = f"{claimed}->{detection.lang}"
+        self.stats['corrections'][pair] = self.stats['corrections'].get(pair, 0) + 1
+        return detection.lang
+
+    def record_same_language_skip(self):
+        """원문이 이미 대상 언어라 번역을 건너뜀"""
+        self.stats['same_language_skips'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'enabled': settings.LANGDETECT_ENABLED, **self.stats}
+
+
+# 싱글톤 인스턴스
+language_detector = LanguageDetector()
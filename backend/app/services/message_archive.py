@@ -0,0 +1,401 @@
+"""
+메시지 파티션 관리 및 보관(archival)
+
+messages는 seq(시간순 메시지 ID) 범위로 월별 파티션되어 있습니다 (alembic d2a8c5f17e43).
+오래된 메시지를 보관 파일로 옮기고 비워진 파티션을 제거해 핫 테이블과 인덱스 크기를 일정하게 유지합니다.
+
+- 파티션: 기동 시와 MESSAGE_PARTITION_CHECK_INTERVAL마다 messages_pYYYY_MM을
+  MESSAGE_PARTITION_MONTHS_AHEAD개월 앞까지 미리 생성 (보관 설정과 무관하게 항상 실행)
+  파티션이 없던 기간의 메시지가 messages_default에 쌓여 있으면 새 파티션으로 옮김
+- 보관: 종료 후 MESSAGE_ARCHIVE_AFTER_DAYS일 지난 방의 메시지를
+  {MESSAGE_ARCHIVE_DIR}/{종료 연}/{종료 월}/{room_id}.jsonl.gz (seq 순 JSON 한 줄씩)로 쓴 뒤
+  DB에서 삭제하고 chat_rooms.archived_at 기록 (파일을 먼저 쓰고 rename하므로 중단되어도 유실 없음)
+- 조회: archived_at이 있는 방은 히스토리 API/이어받기가 보관 파일에서 읽음
+- 정리: 보관 기간이 지났고 비어 있는 파티션은 DETACH 후 DROP
+- 보관/정리는 MESSAGE_ARCHIVE_ENABLED일 때 MESSAGE_ARCHIVE_INTERVAL마다 실행
+- 여러 인스턴스 중 한 곳에서만 실행 (보관: Redis 락, 파티션 생성: Postgres advisory lock)
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any
+import asyncio
+import calendar
+import gzip
+import json
+import logging
+import os
+import re
+import time
+import uuid
+
+from redis.exceptions import WatchError
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models.database import ChatRoom, Message
+from app.services.cache import cache_service
+from app.services.message_ids import MessageIdGenerator
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = "lock:message_archive"
+PARTITION_PATTERN = re.compile(r"^messages_p(\d{4})_(\d{2})$")
+LEGACY_PARTITION = "messages_legacy"  # 파티션 전환 이전 메시지 (마이그레이션 시점 월 이전)
+DEFAULT_PARTITION = "messages_default"  # 파티션이 없는 범위 (정상 운영 시 비어 있음)
+PARTITION_LOCK_ID = 0x6D736770  # 파티션 생성 advisory lock ('msgp')
+
+
+def _month_floor(year: int, month: int) -> int:
+    """해당 월 1일 0시(UTC) 이후 발급되는 seq의 하한"""
+    return MessageIdGenerator.floor_id(calendar.timegm((year, month, 1, 0, 0, 0)) * 1000)
+
+
+def _next_month(year: int, month: int):
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _seq_month(seq: int):
+    """seq가 발급된 연/월 (UTC)"""
+    issued = datetime.utcfromtimestamp(MessageIdGenerator.timestamp_ms(seq) / 1000)
+    return issued.year, issued.month
+
+
+def archive_path(room: ChatRoom) -> str:
+    ended = room.ended_at or room.created_at
+    return os.path.join(
+        settings.MESSAGE_ARCHIVE_DIR, f"{ended.year:04d}", f"{ended.month:02d}", f"{room.id}.jsonl.gz"
+    )
+
+
+def page_records(
+    records: List[Dict[str, Any]],
+    limit: int,
+    after: Optional[int] = None,
+    before: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """보관 메시지(오래된 순)에 get_messages와 같은 커서 조건 적용"""
+    if before is not None:
+        return [record for record in records if record['seq'] < before][-limit:]
+    if after is not None:
+        return [record for record in records if record['seq'] > after][:limit]
+    return records[-limit:]
+
+
+class MessageArchiver:
+    """파티션 생성/정리 + 종료된 방 메시지 보관 워커"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self._archived_at: Optional[float] = None  # 마지막 보관 실행 (monotonic)
+        self.stats = {
+            'partition_checks': 0,
+            'rows_moved_from_default': 0,
+            'runs': 0,
+            'rooms_archived': 0,
+            'messages_archived': 0,
+            'partitions_created': 0,
+            'partitions_dropped': 0,
+            'archive_reads': 0,
+            'errors': 0,
+            'last_run': None,
+        }
+
+    async def start(self):
+        """
+        기동 시 파티션 확인 후 워커 시작
+
+        파티션 생성에 실패하면 예외를 그대로 올려 기동을 중단합니다.
+        (파티션 없이 받은 메시지는 default에 쌓이고 이후 파티션 생성/보관이 계속 실패)
+        """
+        if self._running:
+            return
+        try:
+            await asyncio.to_thread(self.ensure_partitions)
+        except Exception as e:
+            logger.critical(f"Message partition maintenance failed on startup: {str(e)}")
+            raise
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Message archiver started (archive={'on' if settings.MESSAGE_ARCHIVE_ENABLED else 'off'}, "
+            f"dir={settings.MESSAGE_ARCHIVE_DIR})"
+        )
+
+    async def stop(self):
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while self._running:
+            await asyncio.sleep(settings.MESSAGE_PARTITION_CHECK_INTERVAL)
+            try:
+                await asyncio.to_thread(self.ensure_partitions)
+                if settings.MESSAGE_ARCHIVE_ENABLED and (
+                        self._archived_at is None
+                        or time.monotonic() - self._archived_at >= settings.MESSAGE_ARCHIVE_INTERVAL):
+                    await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Message archive error: {str(e)}")
+
+    async def run_once(self) -> Dict[str, int]:
+        """파티션 생성 → 보관 → 빈 파티션 정리 (다른 인스턴스가 실행 중이면 건너뜀)"""
+        client = cache_service.redis_client
+        lock_ttl = max(int(settings.MESSAGE_ARCHIVE_INTERVAL), 60)
+        token = uuid.uuid4().hex
+        if client and not await client.set(LOCK_KEY, token, nx=True, ex=lock_ttl):
+            return {}
+        try:
+            result = {
+                'partitions_created': await asyncio.to_thread(self.ensure_partitions),
+                'rooms_archived': 0,
+                'messages_archived': 0,
+            }
+            while True:
+                rooms, messages = await asyncio.to_thread(self.archive_batch)
+                result['rooms_archived'] += rooms
+                result['messages_archived'] += messages
+                if rooms < settings.MESSAGE_ARCHIVE_BATCH_ROOMS:
+                    break
+            result['partitions_dropped'] = await asyncio.to_thread(self.drop_empty_partitions)
+        finally:
+            if client:
+                await self._release_lock(client, token)
+        self._archived_at = time.monotonic()
+        self.stats['runs'] += 1
+        self.stats['last_run'] = datetime.utcnow().isoformat()
+        if result['rooms_archived'] or result['partitions_created'] or result['partitions_dropped']:
+            logger.info(f"Message archive run: {result}")
+        return result
+
+    async def _release_lock(self, client, token: str):
+        """잠금 해제 (실행이 TTL을 넘겨 다른 인스턴스가 잡은 잠금은 지우지 않음)"""
+        try:
+            async with client.pipeline(transaction=True) as pipe:
+                await pipe.watch(LOCK_KEY)
+                if await pipe.get(LOCK_KEY) != token:
+                    await pipe.unwatch()
+                    logger.warning("Message archive lock expired during run, not releasing")
+                    return
+                pipe.multi()
+                pipe.delete(LOCK_KEY)
+                await pipe.execute()
+        except WatchError:
+            pass
+        except Exception as e:
+            logger.error(f"Message archive lock release error: {str(e)}")
+
+    # ----- 파티션 -----
+
+    def _partitioned(self) -> bool:
+        return engine.dialect.name == 'postgresql'
+
+    def _partitions(self, conn) -> List[str]:
+        rows = conn.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = 'messages'"
+        ))
+        return [row[0] for row in rows]
+
+    def ensure_partitions(self) -> int:
+        """
+        이번 달부터 MESSAGE_PARTITION_MONTHS_AHEAD개월 앞까지 월별 파티션 생성
+
+        파티션이 없던 기간(워커 미실행 등)의 메시지가 messages_default에 들어가 있으면
+        같은 범위로 CREATE ... PARTITION OF가 실패하므로, default를 분리한 뒤 파티션을 만들고
+        해당 범위 행을 옮겨 다시 붙입니다. default에 남은 지난 달 메시지의 파티션도 함께 만듭니다.
+        """
+        if not self._partitioned():
+            return 0
+        created = moved = 0
+        with engine.begin() as conn:
+            # 여러 인스턴스가 동시에 기동해도 한 곳에서만 생성 (트랜잭션 종료 시 해제)
+            conn.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {'lock_id': PARTITION_LOCK_ID})
+            existing = set(self._partitions(conn))
+            missing = [
+                (name, lower, upper)
+                for name, lower, upper in self._wanted_partitions(conn, existing)
+                if name not in existing
+            ]
+            self.stats['partition_checks'] += 1
+            if not missing:
+                return 0
+
+            has_default_rows = DEFAULT_PARTITION in existing and \
+                conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION})")).scalar()
+            if has_default_rows:
+                conn.execute(text(f"ALTER TABLE messages DETACH PARTITION {DEFAULT_PARTITION}"))
+            columns = ", ".join(column.name for column in Message.__table__.columns)
+            for name, lower, upper in missing:
+                conn.execute(text(
+                    f"CREATE TABLE {name} PARTITION OF messages FOR VALUES FROM ({lower}) TO ({upper})"
+                ))
+                created += 1
+                if has_default_rows:
+                    result = conn.execute(text(
+                        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                        f"WHERE seq >= :lower AND seq < :upper RETURNING {columns}) "
+                        f"INSERT INTO messages ({columns}) SELECT {columns} FROM moved"
+                    ), {'lower': lower, 'upper': upper})
+                    moved += result.rowcount
+            if has_default_rows:
+                conn.execute(text(f"ALTER TABLE messages ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+        self.stats['partitions_created'] += created
+        self.stats['rows_moved_from_default'] += moved
+        logger.info(f"Created {created} message partitions")
+        if moved:
+            logger.warning(f"Moved {moved} messages from {DEFAULT_PARTITION} into new partitions")
+        return created
+
+    def _wanted_partitions(self, conn, existing) -> List[tuple]:
+        """
+        있어야 할 월별 파티션 (이름, 하한 seq, 상한 seq)
+
+        이번 달 ~ MESSAGE_PARTITION_MONTHS_AHEAD개월 뒤 + default에 메시지가 있는 지난 달
+        (가장 이른 월별 파티션보다 앞선 달은 legacy 범위와 겹치므로 제외)
+        """
+        now = datetime.utcnow()
+        months = []
+        year, month = now.year, now.month
+        for _ in range(settings.MESSAGE_PARTITION_MONTHS_AHEAD + 1):
+            months.append((year, month))
+            year, month = _next_month(year, month)
+
+        monthly = sorted(
+            (int(match.group(1)), int(match.group(2)))
+            for match in map(PARTITION_PATTERN.match, existing) if match
+        )
+        oldest = None
+        if DEFAULT_PARTITION in existing:
+            oldest = conn.execute(text(f"SELECT min(seq) FROM {DEFAULT_PARTITION}")).scalar()
+        if oldest is not None and monthly:
+            current = months[0]
+            year, month = max(_seq_month(oldest), monthly[0])
+            while (year, month) < current:
+                lower, upper = _month_floor(year, month), _month_floor(*_next_month(year, month))
+                if conn.execute(text(
+                    f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE seq >= :lower AND seq < :upper)"
+                ), {'lower': lower, 'upper': upper}).scalar():
+                    months.append((year, month))
+                year, month = _next_month(year, month)
+
+        return [
+            (
+                f"messages_p{year:04d}_{month:02d}",
+                _month_floor(year, month),
+                _month_floor(*_next_month(year, month)),
+            )
+            for year, month in sorted(months)
+        ]
+
+    def drop_empty_partitions(self) -> int:
+        """보관 기간이 지난 빈 월별 파티션(및 비워진 legacy 파티션) 제거"""
+        if not self._partitioned():
+            return 0
+        cutoff = MessageIdGenerator.floor_id(
+            int((time.time() - settings.MESSAGE_ARCHIVE_AFTER_DAYS * 86400) * 1000)
+        )
+        dropped = 0
+        with engine.begin() as conn:
+            for name in self._partitions(conn):
+                match = PARTITION_PATTERN.match(name)
+                if match:
+                    year, month = int(match.group(1)), int(match.group(2))
+                    if _month_floor(*_next_month(year, month)) > cutoff:
+                        continue
+                elif name != LEGACY_PARTITION:
+                    continue
+                if conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name})")).scalar():
+                    continue
+                conn.execute(text(f"ALTER TABLE messages DETACH PARTITION {name}"))
+                conn.execute(text(f"DROP TABLE {name}"))
+                dropped += 1
+                logger.info(f"Dropped empty message partition: {name}")
+        self.stats['partitions_dropped'] += dropped
+        return dropped
+
+    # ----- 보관 -----
+
+    def archive_batch(self):
+        """
+        보관 대상 방을 최대 MESSAGE_ARCHIVE_BATCH_ROOMS개 처리
+
+        Returns:
+            (보관한 방 수, 보관한 메시지 수)
+        """
+        cutoff = datetime.utcnow() - timedelta(days=settings.MESSAGE_ARCHIVE_AFTER_DAYS)
+        rooms = messages = 0
+        db = SessionLocal()
+        try:
+            candidates = db.query(ChatRoom)\
+                .filter(
+                    ChatRoom.status == 'ended',
+                    ChatRoom.archived_at.is_(None),
+                    ChatRoom.ended_at < cutoff
+                )\
+                .order_by(ChatRoom.ended_at.asc())\
+                .limit(settings.MESSAGE_ARCHIVE_BATCH_ROOMS)\
+                .all()
+            for room in candidates:
+                messages += self._archive_room(db, room)
+                rooms += 1
+        finally:
+            db.close()
+        self.stats['rooms_archived'] += rooms
+        self.stats['messages_archived'] += messages
+        return rooms, messages
+
+    def _archive_room(self, db, room: ChatRoom) -> int:
+        """방 메시지를 보관 파일로 쓰고 DB에서 삭제 (이미 보관 파일이 있으면 기존 내용과 합침)"""
+        from app.services.recent_messages import message_to_record
+
+        rows = db.query(Message).filter(Message.room_id == room.id).order_by(Message.seq.asc()).all()
+        if rows:
+            path = archive_path(room)
+            records = {record['seq']: record for record in self._read_file(path)}
+            records.update((message.seq, message_to_record(message)) for message in rows)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                for seq in sorted(records):
+                    f.write(json.dumps(records[seq], ensure_ascii=False) + "\n")
+            os.replace(tmp_path, path)
+
+            db.query(Message)\
+                .filter(Message.room_id == room.id, Message.seq <= rows[-1].seq)\
+                .delete(synchronize_session=False)
+        room.archived_at = datetime.utcnow()
+        db.commit()
+        return len(rows)
+
+    def _read_file(self, path: str) -> List[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return []
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def read_room(self, room: ChatRoom) -> List[Dict[str, Any]]:
+        """보관된 방의 메시지 (오래된 순)"""
+        self.stats['archive_reads'] += 1
+        return self._read_file(archive_path(room))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'enabled': settings.MESSAGE_ARCHIVE_ENABLED,
+            'archive_after_days': settings.MESSAGE_ARCHIVE_AFTER_DAYS,
+        }
+
+
+# 싱글톤 인스턴스
+message_archiver = MessageArchiver()
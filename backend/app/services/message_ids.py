@@ -0,0 +1,70 @@
+"""
+서버 메시지 ID 생성 (Snowflake 방식)
+
+클라이언트 타임스탬프(msg_{timestamp})는 같은 밀리초에 보낸 메시지끼리 충돌하고
+기기 시계에 따라 순서가 뒤바뀝니다. 서버에서 시간순으로 증가하는 정수 ID를 발급해
+메시지 순서(seq)와 재접속 시 이어받기 기준으로 사용합니다.
+
+비트 구성 (53비트 - JavaScript Number로 정밀도 손실 없이 전달 가능):
+- 41비트: EPOCH 이후 밀리초 (약 69년)
+- 5비트: 워커 ID (0~31, 기동 시 Redis에서 프로세스마다 고유하게 임대 - app/services/worker_lease.py)
+- 7비트: 같은 밀리초 내 순번 (워커당 밀리초당 128개)
+"""
+
+import threading
+import time
+
+from app.config import settings
+
+# 2025-01-01T00:00:00Z (밀리초)
+EPOCH_MS = 1735689600000
+
+WORKER_BITS = 5
+SEQUENCE_BITS = 7
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+
+class MessageIdGenerator:
+    """워커별 단조 증가 메시지 ID 생성기"""
+
+    def __init__(self, worker_id: int):
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self.set_worker_id(worker_id)
+
+    def set_worker_id(self, worker_id: int):
+        """임대받은 워커 ID 적용 (이후 발급 ID부터)"""
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"MESSAGE_WORKER_ID must be between 0 and {MAX_WORKER_ID}")
+        with self._lock:
+            self.worker_id = worker_id
+
+    def next_id(self) -> int:
+        """다음 메시지 ID (시계가 뒤로 가도 이전 ID보다 작아지지 않음)"""
+        with self._lock:
+            now = max(int(time.time() * 1000) - EPOCH_MS, self._last_ms)
+            if now == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # 밀리초당 순번 소진 → 다음 밀리초 ID를 미리 사용
+                    now += 1
+            else:
+                self._sequence = 0
+            self._last_ms = now
+            return (now << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker_id << SEQUENCE_BITS) | self._sequence
+
+    @staticmethod
+    def timestamp_ms(message_id: int) -> int:
+        """ID에 포함된 생성 시각 (Unix 밀리초)"""
+        return (message_id >> (WORKER_BITS + SEQUENCE_BITS)) + EPOCH_MS
+
+    @staticmethod
+    def floor_id(timestamp_ms: int) -> int:
+        """해당 시각(Unix 밀리초) 이후 발급되는 ID의 하한 (seq 범위 파티션 경계)"""
+        return max(timestamp_ms - EPOCH_MS, 0) << (WORKER_BITS + SEQUENCE_BITS)
+
+
+# 싱글톤 인스턴스 (기동 시 worker_lease가 임대한 ID로 교체, 스크립트 등 임대 없이 쓰면 설정값/0)
+message_ids = MessageIdGenerator(max(settings.MESSAGE_WORKER_ID, 0))
@@ -0,0 +1,361 @@
+"""
+메시지 저장 outbox
+
+소켓 핸들러가 메시지마다 동기 INSERT + commit을 수행하면 이벤트 루프가 DB 왕복 동안
+멈추고, 동시 메시지가 많을수록 커넥션/커밋 비용이 메시지 수만큼 늘어납니다.
+
+- enqueue: 메시지를 Redis 리스트(outbox:messages:{worker_id})에 추가 (RPUSH 1회)
+  → 이 시점에 클라이언트에 ack (Redis 미연결 시 프로세스 로컬 버퍼)
+- 백그라운드 flush: 주기마다 최대 BATCH_SIZE개를 한 번의 INSERT로 저장한 뒤 리스트에서 제거
+  seq 충돌은 ON CONFLICT DO NOTHING으로 건너뛰므로 재시도해도 중복 저장되지 않음
+  (저장되지 않은 행은 기존 행과 비교해 재시도로 인한 중복이 아니면 seq 충돌로 오류 기록)
+- 중복 전송: client_msg_id를 SET NX로 선점(처리 중 표시)하고 outbox가 메시지를 받은 뒤 최종 seq로
+  갱신, 같은 메시지의 재전송은 기존 seq로 다시 ack (원본이 아직 처리 중이면 ack 없이 재전송 요청)
+
+outbox 리스트는 워커 ID별로 분리되어 있고 워커 ID는 프로세스마다 임대하므로
+(app/services/worker_lease.py) 소비자가 하나뿐이며, 같은 번호를 임대한 프로세스가
+이전 실행에서 남은 메시지를 이어서 저장합니다.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Union
+import asyncio
+import json
+import logging
+
+from redis.exceptions import WatchError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.database import Message
+from app.services.cache import cache_service
+from app.services.message_ids import message_ids
+from app.services.recent_messages import recent_messages
+
+logger = logging.getLogger(__name__)
+
+DEDUP_PREFIX = "msgdedup"
+# 선점 후 outbox에 들어가기 전(번역 중) 상태의 dedup 값
+DEDUP_PENDING = "pending"
+# Redis 미연결 시 프로세스 로컬 중복 판별 최대 항목 수
+LOCAL_DEDUP_MAX = 10000
+
+
+def message_record(
+    seq: int,
+    room_id: str,
+    sender_type: str,
+    original_text: str,
+    translated_text: Optional[str],
+    source_lang: str,
+    target_lang: Optional[str],
+    sender_id: Optional[str] = None,
+    client_msg_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """outbox에 넣을 메시지 레코드 (messages 테이블 컬럼)"""
+    return {
+        'seq': seq,
+        'client_msg_id': client_msg_id,
+        'room_id': room_id,
+        'sender_type': sender_type,
+        'sender_id': sender_id,
+        'original_text': original_text,
+        'translated_text': translated_text,
+        'source_lang': source_lang,
+        'target_lang': target_lang,
+        'created_at': datetime.utcnow().isoformat(),
+    }
+
+
+def dedup_key(room_id: str, client_msg_id: str) -> str:
+    return f"{DEDUP_PREFIX}:{room_id}:{client_msg_id}"
+
+
+class MessageOutbox:
+    """메시지 outbox + 일괄 저장 워커"""
+
+    def __init__(self):
+        self._local: List[Dict[str, Any]] = []
+        self._local_dedup: "OrderedDict[str, Union[int, str]]" = OrderedDict()
+        self._pending = 0  # Redis outbox에 남은 메시지 수 (추정)
+        self._pending_key: Optional[str] = None  # _pending을 센 리스트 (워커 ID가 바뀌면 다시 셈)
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self.stats = {
+            'enqueued': 0,
+            'local_fallbacks': 0,
+            'duplicates': 0,
+            'pending_duplicates': 0,
+            'batches': 0,
+            'saved': 0,
+            'already_saved': 0,
+            'seq_conflicts': 0,
+            'dropped': 0,
+            'errors': 0,
+        }
+
+    @property
+    def key(self) -> str:
+        """임대한 워커 ID의 outbox 리스트"""
+        return f"outbox:messages:{message_ids.worker_id}"
+
+    async def start(self):
+        """flush 워커 시작 (이전 실행에서 남은 outbox 포함)"""
+        if self._running:
+            return
+        self._running = True
+        if cache_service.redis_client:
+            try:
+                self._pending = await cache_service.redis_client.llen(self.key)
+                self._pending_key = self.key
+            except Exception as e:
+                logger.error(f"Message outbox length error: {str(e)}")
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Message outbox started: {self.key} ({self._pending} pending)")
+
+    async def stop(self):
+        """워커 종료 (남은 메시지 저장 시도)"""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def claim(self, room_id: str, client_msg_id: Optional[str]) -> Union[int, str, None]:
+        """
+        client_msg_id 선점 (처리 중 표시, outbox에 들어가면 enqueue에서 최종 seq로 갱신)
+
+        Returns:
+            처음이면 None, 이미 저장된 메시지면 기존 seq,
+            원본이 아직 처리 중이면 DEDUP_PENDING (원본이 실패할 수 있으므로 ack하지 않음)
+        """
+        if not client_msg_id:
+            return None
+        key = dedup_key(room_id, client_msg_id)
+        if cache_service.redis_client:
+            try:
+                client = cache_service.redis_client
+                if await client.set(key, DEDUP_PENDING, nx=True, ex=settings.MESSAGE_DEDUP_PENDING_TTL):
+                    return None
+                return self._duplicate(await client.get(key))
+            except Exception as e:
+                logger.error(f"Message dedup error: {str(e)}")
+
+        if key in self._local_dedup:
+            return self._duplicate(self._local_dedup[key])
+        self._local_dedup[key] = DEDUP_PENDING
+        if len(self._local_dedup) > LOCAL_DEDUP_MAX:
+            self._local_dedup.popitem(last=False)
+        return None
+
+    def _duplicate(self, existing) -> Union[int, str]:
+        # 조회 사이에 만료된 선점도 처리 중으로 보고 재전송 요청
+        if existing is None or existing == DEDUP_PENDING:
+            self.stats['pending_duplicates'] += 1
+            return DEDUP_PENDING
+        self.stats['duplicates'] += 1
+        return int(existing)
+
+    async def release(self, room_id: str, client_msg_id: Optional[str]):
+        """처리 실패 시 선점 해제 (클라이언트 재전송 허용, 이미 outbox에 들어간 메시지는 유지)"""
+        if not client_msg_id:
+            return
+        key = dedup_key(room_id, client_msg_id)
+        if self._local_dedup.get(key) == DEDUP_PENDING:
+            del self._local_dedup[key]
+        client = cache_service.redis_client
+        if not client:
+            return
+        try:
+            async with client.pipeline(transaction=True) as pipe:
+                await pipe.watch(key)
+                if await pipe.get(key) != DEDUP_PENDING:
+                    await pipe.unwatch()
+                    return
+                pipe.multi()
+                pipe.delete(key)
+                await pipe.execute()
+        except WatchError:
+            pass
+        except Exception as e:
+            logger.error(f"Message dedup release error: {str(e)}")
+
+    async def _complete(self, records):
+        """outbox가 받은 메시지의 선점을 최종 seq로 갱신 (이후 재전송은 이 seq로 ack)"""
+        claimed = [record for record in records if record.get('client_msg_id')]
+        if not claimed:
+            return
+        for record in claimed:
+            key = dedup_key(record['room_id'], record['client_msg_id'])
+            if key in self._local_dedup:
+                self._local_dedup[key] = record['seq']
+        if cache_service.redis_client:
+            try:
+                async with cache_service.redis_client.pipeline(transaction=False) as pipe:
+                    for record in claimed:
+                        pipe.set(dedup_key(record['room_id'], record['client_msg_id']),
+                                 record['seq'], ex=settings.MESSAGE_DEDUP_TTL)
+                    await pipe.execute()
+            except Exception as e:
+                logger.error(f"Message dedup complete error: {str(e)}")
+
+    async def enqueue(self, *records: Dict[str, Any]):
+        """메시지를 outbox에 추가 (반환 후 ack 가능), 방별 최근 메시지 버퍼에도 반영"""
+        if not records:
+            return
+        self.stats['enqueued'] += len(records)
+        await recent_messages.append(*records)
+        if cache_service.redis_client:
+            try:
+                await cache_service.redis_client.rpush(
+                    self.key, *[json.dumps(record, ensure_ascii=False) for record in records]
+                )
+                self._pending += len(records)
+                await self._complete(records)
+                return
+            except Exception as e:
+                logger.error(f"Message outbox enqueue error, using local buffer: {str(e)}")
+        self.stats['local_fallbacks'] += len(records)
+        self._local.extend(records)
+        await self._complete(records)
+
+    async def _run(self):
+        while self._running:
+            try:
+                await asyncio.sleep(settings.MESSAGE_OUTBOX_FLUSH_INTERVAL)
+                while await self.flush() >= settings.MESSAGE_OUTBOX_BATCH_SIZE:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Message outbox flush error: {str(e)}")
+                await asyncio.sleep(1.0)
+
+    async def flush(self) -> int:
+        """
+        outbox 메시지를 한 번의 INSERT로 저장
+
+        저장에 성공한 뒤에만 outbox에서 제거하므로 DB 오류 시 다음 주기에 다시 시도합니다.
+
+        Returns:
+            저장한(또는 이미 저장되어 있던) 메시지 수
+        """
+        batch_size = settings.MESSAGE_OUTBOX_BATCH_SIZE
+        flushed = 0
+
+        if self._local:
+            batch = self._local[:batch_size]
+            await asyncio.to_thread(self._insert, batch)
+            del self._local[:len(batch)]
+            flushed += len(batch)
+
+        client = cache_service.redis_client
+        key = self.key
+        if client and key != self._pending_key:
+            # 임대를 잃고 다른 워커 ID로 바뀜 → 새 리스트에 남은 메시지부터 저장
+            self._pending = await client.llen(key)
+            self._pending_key = key
+        if self._pending > 0 and client:
+            items = await client.lrange(key, 0, batch_size - 1)
+            if items:
+                await asyncio.to_thread(self._insert, [json.loads(item) for item in items])
+                await client.ltrim(key, len(items), -1)
+                flushed += len(items)
+            self._pending = max(self._pending - len(items), 0) if items else 0
+
+        return flushed
+
+    def _insert(self, records: List[Dict[str, Any]]):
+        """
+        일괄 INSERT (seq 충돌 행은 건너뛰고 확인), 무결성 오류 시 행 단위로 저장하고 실패 행은 버림
+        """
+        rows = [
+            {**record, 'created_at': datetime.fromisoformat(record['created_at'])}
+            if isinstance(record['created_at'], str) else record
+            for record in records
+        ]
+        inserted = set()
+        dropped = 0
+        db = SessionLocal()
+        try:
+            try:
+                seqs = self._execute_insert(db, rows)
+                db.commit()
+                inserted.update(seqs)
+            except IntegrityError:
+                # 삭제된 채팅방 등 한 행 때문에 배치 전체가 막히지 않도록
+                db.rollback()
+                for row in rows:
+                    try:
+                        seqs = self._execute_insert(db, [row])
+                        db.commit()
+                        inserted.update(seqs)
+                    except IntegrityError as e:
+                        db.rollback()
+                        dropped += 1
+                        inserted.add(row['seq'])  # 충돌 확인 대상에서 제외
+                        logger.error(f"Message {row['seq']} dropped ({row['room_id']}): {e.orig}")
+            skipped = [row for row in rows if row['seq'] not in inserted]
+            conflicts = self._check_conflicts(db, skipped)
+        finally:
+            db.close()
+        self.stats['batches'] += 1
+        self.stats['saved'] += len(rows) - len(skipped) - dropped
+        self.stats['already_saved'] += len(skipped) - conflicts
+        self.stats['seq_conflicts'] += conflicts
+        self.stats['dropped'] += dropped
+
+    def _execute_insert(self, db, rows: List[Dict[str, Any]]) -> List[int]:
+        """INSERT ... ON CONFLICT (seq) DO NOTHING, 실제로 저장된 seq 목록 반환"""
+        statement = insert(Message).values(rows)\
+            .on_conflict_do_nothing(index_elements=['seq'])\
+            .returning(Message.seq)
+        return [seq for (seq,) in db.execute(statement)]
+
+    def _check_conflicts(self, db, rows: List[Dict[str, Any]]) -> int:
+        """
+        ON CONFLICT로 저장되지 않은 행 확인
+
+        INSERT 후 LTRIM 전에 중단되어 재시도한 경우 같은 메시지가 이미 저장되어 있으므로 정상입니다.
+        다른 메시지가 같은 seq를 쓰고 있으면 (워커 ID 중복 등) 메시지가 유실되므로 원본과 함께 오류 기록합니다.
+
+        Returns:
+            seq 충돌로 저장하지 못한 메시지 수
+        """
+        if not rows:
+            return 0
+        existing = {
+            message.seq: message
+            for message in db.query(Message).filter(Message.seq.in_([row['seq'] for row in rows]))
+        }
+        conflicts = 0
+        for row in rows:
+            message = existing.get(row['seq'])
+            if message is not None and \
+                    (message.room_id, message.client_msg_id, message.original_text) == \
+                    (row['room_id'], row['client_msg_id'], row['original_text']):
+                continue
+            conflicts += 1
+            logger.error(
+                f"Message seq conflict, not saved: seq={row['seq']} room={row['room_id']} "
+                f"existing_room={message.room_id if message is not None else None} "
+                f"record={json.dumps(row, ensure_ascii=False, default=str)}"
+            )
+        return conflicts
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'pending_redis': self._pending,
+            'pending_local': len(self._local),
+            'avg_batch_size': round(self.stats['saved'] / self.stats['batches'], 2) if self.stats['batches'] else None,
+        }
+
+
+# 싱글톤 인스턴스
+message_outbox = MessageOutbox()
@@ -0,0 +1,152 @@
+"""
+메시지 복잡도 기반 모델 라우팅
+
+"네 감사합니다" 같은 짧은 인사와 여러 문단의 증상 설명을 같은 모델로 보내지 않도록
+메시지를 분류해 경로를 정합니다.
+
+- glossary: 메시지 전체가 용어집 용어 하나 → 프로바이더 호출 없이 용어집 번역 사용
+- fast: 짧고 단순한 메시지 (토큰 길이, 문장 수, 용어 밀도, 숫자/줄바꿈 여부, 언어쌍) → 빠르고 저렴한 모델
+- strong: 그 외 → 기본(고성능) 모델
+
+분류는 텍스트만으로 결정되므로 같은 메시지는 항상 같은 경로(같은 캐시 키)를 사용합니다.
+"""
+
+from collections import deque
+from typing import Optional, Dict, Any, Tuple, List
+import re
+
+from app.config import settings
+from app.services.providers.token_budget import token_budget
+
+ROUTE_GLOSSARY = 'glossary'
+ROUTE_FAST = 'fast'
+ROUTE_STRONG = 'strong'
+ROUTES = (ROUTE_GLOSSARY, ROUTE_FAST, ROUTE_STRONG)
+
+# 지연 시간 백분위 계산용 최근 표본 수
+LATENCY_SAMPLES = 500
+
+_TRAILING_PUNCTUATION = " \t.,!?~。、！？"
+_DIGITS = re.compile(r'\d')
+_SENTENCE_END = re.compile(r'[.!?。！？]+(?=\s|$)')
+
+
+def _normalize(text: str) -> str:
+    return text.strip().strip(_TRAILING_PUNCTUATION).lower()
+
+
+class ModelRouter:
+    """메시지 분류 및 경로별 프로바이더 선택"""
+
+    def __init__(self, strong_provider, fast_provider=None, medical_glossary: Dict = None):
+        """
+        Args:
+            strong_provider: 기본 프로바이더
+            fast_provider: 빠른 모델 프로바이더 (없으면 fast 경로 비활성)
+            medical_glossary: 의료 용어집 (glossary 경로 및 용어 밀도 계산)
+        """
+        self.strong_provider = strong_provider
+        self.fast_provider = fast_provider
+        self.enabled = settings.ROUTING_ENABLED
+        # (source_lang, target_lang) -> {정규화된 원문 용어: 번역 용어}
+        self.terms: Dict[Tuple[str, str], Dict[str, str]] = self._build_term_index(medical_glossary or {})
+        self.stats = {
+            route: {'decisions': 0, 'calls': 0, 'errors': 0, 'total_ms': 0.0}
+            for route in ROUTES
+        }
+        self._latencies = {route: deque(maxlen=LATENCY_SAMPLES) for route in ROUTES}
+
+    def _build_term_index(self, glossary: Dict) -> Dict[Tuple[str, str], Dict[str, str]]:
+        """한국어 기준 용어집을 양방향 언어쌍 인덱스로 변환"""
+        index: Dict[Tuple[str, str], Dict[str, str]] = {}
+        for ko_term, translations in glossary.get('ko', {}).items():
+            for lang, term in translations.items():
+                index.setdefault(('ko', lang), {})[_normalize(ko_term)] = term
+                index.setdefault((lang, 'ko'), {})[_normalize(term)] = ko_term
+        return index
+
+    def lookup_glossary(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        """메시지 전체가 용어집 용어이면 번역 용어 반환"""
+        return self.terms.get((source_lang, target_lang), {}).get(_normalize(text))
+
+    def classify(self, text: str, source_lang: str, target_lang: str) -> str:
+        """메시지 경로 분류"""
+        if not self.enabled:
+            return ROUTE_STRONG
+        if self.lookup_glossary(text, source_lang, target_lang) is not None:
+            return ROUTE_GLOSSARY
+        if self.fast_provider is None:
+            return ROUTE_STRONG
+
+        stripped = text.strip()
+        # 글자 수 대신 토큰 추정치 (기본 20토큰 ≈ 한국어 22자, 영어 80자)
+        if token_budget.estimate_tokens(stripped, source_lang) > settings.ROUTER_FAST_MAX_TOKENS:
+            return ROUTE_STRONG
+        if len(_SENTENCE_END.findall(stripped)) > 1:
+            return ROUTE_STRONG
+        if f"{source_lang}-{target_lang}" in settings.ROUTER_STRONG_PAIRS:
+            return ROUTE_STRONG
+        # 용량/날짜/시간 같은 숫자, 여러 줄 메시지는 정확도가 중요 → 기본 모델
+        if '\n' in stripped or _DIGITS.search(stripped):
+            return ROUTE_STRONG
+
+        terms = self.terms.get((source_lang, target_lang), {})
+        words = max(len(stripped.split()), 1)
+        hits = sum(1 for term in terms if term and term in stripped.lower())
+        if hits / words > settings.ROUTER_FAST_MAX_TERM_DENSITY:
+            return ROUTE_STRONG
+
+        return ROUTE_FAST
+
+    def select(self, text: str, source_lang: str, target_lang: str):
+        """
+        경로와 프로바이더 선택
+
+        glossary 경로의 프로바이더는 캐시 키 계산용으로 기본 프로바이더를 반환합니다.
+
+        Returns:
+            (경로, 프로바이더)
+        """
+        route = self.classify(text, source_lang, target_lang)
+        if route == ROUTE_FAST:
+            return route, self.fast_provider
+        return route, self.strong_provider
+
+    def select_multi(self, text: str, source_lang: str, target_langs: List[str]):
+        """다국어 번역 경로 (모든 타겟이 fast일 때만 fast)"""
+        routes = {self.classify(text, source_lang, target_lang) for target_lang in target_langs}
+        if routes == {ROUTE_FAST}:
+            return ROUTE_FAST, self.fast_provider
+        return ROUTE_STRONG, self.strong_provider
+
+    def record_decision(self, route: str):
+        """경로 결정 기록 (캐시 적중 포함)"""
+        self.stats[route]['decisions'] += 1
+
+    def record_call(self, route: str, elapsed_ms: float, error: bool = False):
+        """경로별 번역 호출 지연 시간 기록"""
+        entry = self.stats[route]
+        entry['calls'] += 1
+        entry['errors'] += int(error)
+        entry['total_ms'] += elapsed_ms
+        self._latencies[route].append(elapsed_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """경로별 결정 수, 호출 수, 지연 시간 (평균/p50/p95)"""
+        routes = {}
+        for route, entry in self.stats.items():
+            samples = sorted(self._latencies[route])
+            routes[route] = {
+                'decisions': entry['decisions'],
+                'calls': entry['calls'],
+                'errors': entry['errors'],
+                'avg_ms': round(entry['total_ms'] / entry['calls'], 2) if entry['calls'] else None,
+                'p50_ms': round(samples[len(samples) // 2], 2) if samples else None,
+                'p95_ms': round(samples[min(int(len(samples) * 0.95), len(samples) - 1)], 2) if samples else None,
+            }
+        return {
+            'enabled': self.enabled,
+            'strong_provider': self.strong_provider.name if self.strong_provider else None,
+            'fast_provider': self.fast_provider.name if self.fast_provider else None,
+            'routes': routes,
+        }
@@ -0,0 +1,139 @@
+"""
+번역 생략(passthrough) 판정 및 자리표시자 마스킹
+
+채팅 메시지 상당수는 번역할 내용이 없습니다 ("👍", "ok", 전화번호, 날짜, 예약 코드 등).
+프로바이더 호출 전에 메시지를 분류해 번역이 필요 없으면 원문을 그대로 반환하고,
+번역이 필요한 메시지도 URL/이메일/숫자/코드/이모지를 자리표시자(⟦0⟧)로 바꿔 보낸 뒤
+번역 결과에 원래 값을 복원합니다.
+
+- 모델이 전화번호/예약 코드/URL을 바꾸거나 이모지를 빠뜨리는 문제 방지
+- 숫자만 다른 메시지("3번 창구로 오세요" / "5번 창구로 오세요")가 같은 캐시 키를 사용
+- 글자에 붙은 숫자("3월", "10mg")는 번역에 필요하므로 마스킹하지 않음
+"""
+
+from typing import List, Optional, Dict, Any
+import re
+
+from app.config import settings
+
+PLACEHOLDER_OPEN = '⟦'
+PLACEHOLDER_CLOSE = '⟧'
+_PLACEHOLDER = re.compile(r'⟦(\d+)⟧')
+
+_URL = r'(?:https?://|www\.)[^\s<>"]+[^\s<>".,!?)\]]'
+_EMAIL = r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+'
+# 대문자+숫자 혼합 코드 (예약 번호, 진료 코드 등): A1023, KR-2024-0012
+_CODE = r'\b(?=[A-Z-]*\d)(?=[\d-]*[A-Z])[A-Z0-9]{2,}(?:-[A-Z0-9]+)*\b'
+# 숫자/전화번호/날짜/시간: 010-1234-5678, +82 10 1234 5678, 2024-03-05, 10:30, 3.5
+_NUMBER = r'\+?\d(?:[\d.:/,-]|\s(?=\d))*'
+_EMOJI_CHARS = '\U0001F000-\U0001FAFF\u2600-\u27BF\u2B00-\u2BFF'
+_EMOJI = rf'[{_EMOJI_CHARS}][{_EMOJI_CHARS}\u200D\uFE0F\U000E0020-\U000E007F]*'
+
+_MASKABLE = re.compile(
+    rf'(?P<url>{_URL})|(?P<email>{_EMAIL})|(?P<code>{_CODE})|(?P<number>{_NUMBER})|(?P<emoji>{_EMOJI})'
+)
+_TRAILING_PUNCTUATION = " \t.,!?~"
+
+
+class MaskedText:
+    """자리표시자로 마스킹된 텍스트와 원래 값"""
+
+    def __init__(self, text: str, spans: List[str]):
+        self.text = text
+        self.spans = spans
+
+    def restore(self, translated: str) -> Optional[str]:
+        """
+        번역 결과의 자리표시자를 원래 값으로 복원
+
+        Returns:
+            복원된 번역문 (자리표시자가 빠지거나 중복/변형되었으면 None)
+        """
+        if not self.spans:
+            return translated
+        found = sorted(int(index) for index in _PLACEHOLDER.findall(translated))
+        if found != list(range(len(self.spans))):
+            return None
+        return _PLACEHOLDER.sub(lambda match: self.spans[int(match.group(1))], translated)
+
+
+class PassthroughFilter:
+    """번역 생략 판정, 마스킹 및 생략 통계"""
+
+    def __init__(self):
+        self.stats: Dict[str, Any] = {
+            'checked': 0,
+            'masked_messages': 0,
+            'masked_spans': 0,
+            'restore_failures': 0,
+            'avoided': {'same_language': 0, 'no_text': 0, 'universal': 0},
+        }
+
+    def mask(self, text: str, track_stats: bool = True) -> MaskedText:
+        """번역하지 않을 부분을 자리표시자로 치환 (track_stats=False: 이미 집계한 텍스트를 다시 마스킹)"""
+        if track_stats:
+            self.stats['checked'] += 1
+        if not settings.PASSTHROUGH_ENABLED or PLACEHOLDER_OPEN in text:
+            return MaskedText(text, [])
+
+        spans: List[str] = []
+        parts: List[str] = []
+        position = 0
+        for match in _MASKABLE.finditer(text):
+            start, end = match.span()
+            if match.lastgroup == 'number':
+                # 쉼표/마침표 등으로 끝나면 제외하고, 글자에 붙은 숫자("3월", "x2")는 원문 유지
+                value = match.group().rstrip('.:/,-')
+                end = start + len(value)
+                if (start > 0 and text[start - 1].isalpha()) or (end < len(text) and text[end].isalpha()):
+                    continue
+            parts.append(text[position:start])
+            parts.append(f"{PLACEHOLDER_OPEN}{len(spans)}{PLACEHOLDER_CLOSE}")
+            spans.append(text[start:end])
+            position = end
+
+        if not spans:
+            return MaskedText(text, [])
+        parts.append(text[position:])
+        if track_stats:
+            self.stats['masked_messages'] += 1
+            self.stats['masked_spans'] += len(spans)
+        return MaskedText("".join(parts), spans)
+
+    def skip_reason(self, masked: MaskedText) -> Optional[str]:
+        """
+        번역이 필요 없는 메시지의 생략 사유
+
+        Returns:
+            'no_text': 마스킹 후 글자가 남지 않음 (이모지, 숫자, URL, 기호만)
+            'universal': 언어와 무관하게 통용되는 짧은 표현 ("ok" 등)
+            None: 번역 필요
+        """
+        if not settings.PASSTHROUGH_ENABLED:
+            return None
+        remaining = _PLACEHOLDER.sub(' ', masked.text)
+        if not any(char.isalpha() for char in remaining):
+            return 'no_text'
+        if remaining.strip().strip(_TRAILING_PUNCTUATION).lower() in settings.PASSTHROUGH_UNIVERSAL_TERMS:
+            return 'universal'
+        return None
+
+    def record_skip(self, reason: str):
+        """프로바이더 호출 생략 기록"""
+        self.stats['avoided'][reason] += 1
+
+    def record_restore_failure(self):
+        """번역 결과에서 자리표시자가 보존되지 않아 원문으로 재번역"""
+        self.stats['restore_failures'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        avoided = sum(self.stats['avoided'].values())
+        return {
+            'enabled': settings.PASSTHROUGH_ENABLED,
+            **self.stats,
+            'avoided_calls': avoided,
+        }
+
+
+# 싱글톤 인스턴스
+passthrough_filter = PassthroughFilter()
@@ -4,10 +4,14 @@ from .base import BaseTranslationProvider
 from .openai_provider import OpenAIProvider
 from .claude_provider import ClaudeProvider
 from .mock_provider import MockProvider
+from .provider_pool import ProviderPool
+from .local_provider import LocalProvider
 
 __all__ = [
     'BaseTranslationProvider',
     'OpenAIProvider',
     'ClaudeProvider',
     'MockProvider',
+    'ProviderPool',
+    'LocalProvider',
 ]
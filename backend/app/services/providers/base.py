@@ -1,9 +1,16 @@
 """Base Translation Provider Interface"""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, Optional, List, Tuple, Callable, Any
+import asyncio
+import hashlib
+import json
 import logging
 
+from app.config import settings
+from .token_budget import token_budget
+from .rate_limit import RateLimitState
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,12 +20,29 @@ class BaseTranslationProvider(ABC):
     모든 번역 프로바이더는 이 클래스를 상속받아 구현해야 합니다.
     """
 
+    # 사용 모델 (캐시 네임스페이스에 포함, 하위 클래스에서 설정)
+    model: str = "default"
+
     def __init__(self, medical_glossary: Dict = None):
         """
         Args:
             medical_glossary: 의료 용어집 딕셔너리
         """
         self.medical_glossary = medical_glossary or {}
+        self.glossary_version = compute_glossary_version(self.medical_glossary)
+        # 고정 프롬프트(지시문 + 용어집) 메모이제이션: (종류, 컨텍스트, 언어쌍, 용어집 버전) -> 문자열
+        self._prompt_cache: Dict[Tuple, str] = {}
+        # 응답 헤더 기반 rate limit 잔여량 (키 풀 로드밸런싱용)
+        self.rate_limit = RateLimitState()
+        # 분할 번역 세그먼트 동시 호출 제한 (서비스의 프로바이더 슬롯을 이미 잡은 채 호출되므로 별도 세마포어)
+        self._split_slots = asyncio.Semaphore(settings.TRANSLATION_MAX_CONCURRENCY)
+        # 프로바이더 측 프롬프트 캐시 사용량 (입력 토큰 기준)
+        self.prompt_cache_stats = {
+            'requests': 0,
+            'input_tokens': 0,
+            'cache_read_tokens': 0,
+            'cache_write_tokens': 0
+        }
         self.lang_names = {
             'ko': '한국어',
             'en': 'English',
@@ -50,6 +74,55 @@ class BaseTranslationProvider(ABC):
         """
         pass
 
+    async def _translate_split(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        context: str = 'medical'
+    ) -> str:
+        """
+        출력 예산 한도를 넘는 긴 텍스트를 줄/문장 단위로 나눠 번역 후 재조립
+        """
+        segments = token_budget.split_text(text, source_lang, target_lang)
+        logger.info(f"{self.name}: splitting long input into {len(segments)} segments")
+
+        async def translate_segment(segment: str) -> str:
+            if not segment.strip():
+                return segment
+            async with self._split_slots:
+                return await self.translate(segment, source_lang, target_lang, context)
+
+        translations = await asyncio.gather(*[
+            translate_segment(segment) for segment, _ in segments
+        ])
+        return "".join(
+            translated + separator
+            for translated, (_, separator) in zip(translations, segments)
+        )
+
+    async def translate_multi(
+        self,
+        text: str,
+        source_lang: str,
+        target_langs: List[str],
+        context: str = 'medical'
+    ) -> Dict[str, str]:
+        """
+        하나의 텍스트를 여러 언어로 번역합니다.
+
+        기본 구현은 타겟별 translate를 병렬 호출합니다.
+        한 번의 요청으로 여러 언어를 받을 수 있는 프로바이더는 재정의합니다.
+
+        Returns:
+            {타겟 언어 코드: 번역문}
+        """
+        results = await asyncio.gather(*[
+            self.translate(text, source_lang, target_lang, context)
+            for target_lang in target_langs
+        ])
+        return dict(zip(target_langs, results))
+
     @abstractmethod
     def is_available(self) -> bool:
         """
@@ -97,6 +170,86 @@ class BaseTranslationProvider(ABC):
 
         return "\n".join(context_lines)
 
+    def _parse_multi_response(self, content: str, target_langs: List[str]) -> Dict[str, str]:
+        """
+        다국어 JSON 응답 파싱 ({"en": "...", "vi": "..."})
+
+        요청한 언어 중 응답에 없는 항목은 제외하고 반환합니다.
+        """
+        start, end = content.find('{'), content.rfind('}')
+        if start < 0 or end <= start:
+            return {}
+        try:
+            data = json.loads(content[start:end + 1])
+        except ValueError:
+            return {}
+        return {
+            lang: str(data[lang]).strip()
+            for lang in target_langs
+            if isinstance(data.get(lang), str) and data[lang].strip()
+        }
+
+    async def _fill_missing_targets(
+        self,
+        results: Dict[str, str],
+        text: str,
+        source_lang: str,
+        target_langs: List[str],
+        context: str
+    ) -> Dict[str, str]:
+        """다국어 응답에서 빠진 언어만 개별 번역으로 보충"""
+        missing = [lang for lang in target_langs if lang not in results]
+        if missing:
+            logger.warning(f"{self.name} multi-target response missing {missing}, translating individually")
+            results.update(await BaseTranslationProvider.translate_multi(
+                self, text, source_lang, missing, context
+            ))
+        return results
+
+    def _memoized_prompt(self, key: Tuple, build: Callable[[], str]) -> str:
+        """
+        고정 프롬프트 메모이제이션
+
+        사용자 텍스트를 포함하지 않는 지시문/용어집 부분만 대상으로 합니다.
+        용어집 버전을 키에 포함해 용어가 바뀌면 새로 생성됩니다.
+        """
+        cache_key = key + (self.glossary_version,)
+        prompt = self._prompt_cache.get(cache_key)
+        if prompt is None:
+            prompt = build()
+            self._prompt_cache[cache_key] = prompt
+        return prompt
+
+    def _record_prompt_usage(self, input_tokens: int, cache_read_tokens: int = 0, cache_write_tokens: int = 0):
+        """프롬프트 캐시 사용량 기록"""
+        stats = self.prompt_cache_stats
+        stats['requests'] += 1
+        stats['input_tokens'] += input_tokens or 0
+        stats['cache_read_tokens'] += cache_read_tokens or 0
+        stats['cache_write_tokens'] += cache_write_tokens or 0
+
+    def get_prompt_cache_stats(self) -> Dict[str, Any]:
+        """프롬프트 캐시 통계 (cache_read_ratio: 전체 입력 중 캐시에서 읽은 비율 %)"""
+        stats = self.prompt_cache_stats
+        total = stats['input_tokens'] + stats['cache_read_tokens'] + stats['cache_write_tokens']
+        return {
+            **stats,
+            'memoized_prompts': len(self._prompt_cache),
+            'cache_read_ratio': round(stats['cache_read_tokens'] / total * 100, 2) if total else 0.0
+        }
+
     def _get_lang_name(self, lang_code: str) -> str:
         """언어 코드를 언어명으로 변환"""
         return self.lang_names.get(lang_code, lang_code)
+
+
+def compute_glossary_version(glossary: Dict) -> str:
+    """
+    용어집 버전 (내용 해시)
+
+    용어가 수정되면 버전이 바뀌어 이전 버전으로 번역된 캐시와 구분됩니다.
+    """
+    if not glossary:
+        return "none"
+    content = json.dumps(glossary, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(content.encode()).hexdigest()[:8]
@@ -1,12 +1,22 @@
 """Anthropic Claude Translation Provider"""
 
 from .base import BaseTranslationProvider
-from typing import Optional
+from typing import Optional, Dict, List
 import logging
 from anthropic import AsyncAnthropic
 
+from app.config import settings
+from .token_budget import token_budget
+from .http_pool import http_pool
+
 logger = logging.getLogger(__name__)
 
+# 모델별 prompt caching 최소 prefix 길이 (토큰, 이보다 짧으면 API가 cache_control을 무시)
+PROMPT_CACHE_MIN_TOKENS = {
+    'haiku': 2048,
+}
+DEFAULT_PROMPT_CACHE_MIN_TOKENS = 1024
+
 
 class ClaudeProvider(BaseTranslationProvider):
     """
@@ -18,13 +28,15 @@ class ClaudeProvider(BaseTranslationProvider):
         self,
         api_key: str,
         medical_glossary: dict = None,
-        model: str = "claude-sonnet-4-5-20250929"
+        model: str = "claude-sonnet-4-5-20250929",
+        max_retries: int = 2
     ):
         """
         Args:
             api_key: Anthropic API 키
             medical_glossary: 의료 용어집
             model: 사용할 Claude 모델
+            max_retries: SDK 자체 재시도 횟수 (키 풀에서는 0 - 다른 키로 재시도)
         """
         super().__init__(medical_glossary)
         self.api_key = api_key
@@ -34,7 +46,11 @@ class ClaudeProvider(BaseTranslationProvider):
         # API 키 유효성 확인
         if self.api_key and self.api_key != "your-api-key-here":
             try:
-                self.client = AsyncAnthropic(api_key=self.api_key)
+                self.client = AsyncAnthropic(
+                    api_key=self.api_key,
+                    http_client=http_pool.get_client('claude'),
+                    max_retries=max_retries
+                )
                 logger.info(f"Claude provider initialized with model: {self.model}")
             except Exception as e:
                 logger.error(f"Failed to initialize Claude client: {e}")
@@ -70,25 +86,51 @@ class ClaudeProvider(BaseTranslationProvider):
         if not self.is_available():
             raise ValueError("Claude provider is not available (missing API key)")
 
-        # 용어집 컨텍스트
-        glossary_context = self._create_glossary_context(source_lang, target_lang)
+        # 출력 예산 한도를 넘으면 문장 단위로 분할 번역
+        if token_budget.exceeds_limit(text, source_lang, target_lang):
+            return await self._translate_split(text, source_lang, target_lang, context)
 
-        # 프롬프트 생성
-        prompt = self._create_prompt(
-            text, source_lang, target_lang, context, glossary_context
-        )
+        # 고정 지시문 + 용어집 (캐시 가능한 prefix)
+        system = self._system_blocks(self._create_system_prompt(source_lang, target_lang, context))
+        prompt = self._create_user_prompt(text)
+
+        estimated, max_tokens = token_budget.plan(text, source_lang, [target_lang])
 
         try:
-            message = await self.client.messages.create(
-                model=self.model,
-                max_tokens=1024,
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
+            translated_text = ""
+            actual_tokens = 0
+            continuations = 0
+            while True:
+                messages = [{"role": "user", "content": prompt}]
+                if translated_text:
+                    # 잘린 출력을 assistant prefill로 넘겨 이어서 생성 (끝 공백 불가)
+                    messages.append({"role": "assistant", "content": translated_text.rstrip()})
+                    translated_text = translated_text.rstrip()
+
+                message = await self._create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    system=system,
+                    messages=messages
+                )
+
+                translated_text += message.content[0].text if message.content else ""
+                actual_tokens += message.usage.output_tokens
+                self._record_usage(message.usage)
+
+                # stop_reason == 'max_tokens': 예산에서 잘림 → 이어쓰기
+                truncated = message.stop_reason == 'max_tokens'
+                if not truncated or continuations >= settings.TOKEN_BUDGET_MAX_CONTINUATIONS:
+                    break
+                continuations += 1
+                logger.warning(f"Claude output truncated at {max_tokens} tokens, continuing ({continuations})")
+
+            token_budget.record(
+                source_lang, target_lang, estimated, actual_tokens,
+                truncated=truncated or continuations > 0, continuations=continuations
             )
 
-            translated_text = message.content[0].text.strip()
+            translated_text = translated_text.strip()
             logger.info(f"Claude translation completed: {text[:30]}... -> {translated_text[:30]}...")
             return translated_text
 
@@ -96,25 +138,105 @@ class ClaudeProvider(BaseTranslationProvider):
             logger.error(f"Claude translation error: {e}")
             raise
 
-    def _create_prompt(
+    async def translate_multi(
         self,
         text: str,
         source_lang: str,
-        target_lang: str,
-        context: str,
-        glossary_context: str
-    ) -> str:
-        """Claude용 프롬프트 생성"""
+        target_langs: List[str],
+        context: str = 'medical'
+    ) -> Dict[str, str]:
+        """
+        한 번의 요청으로 여러 언어 번역 (JSON 응답)
+
+        Returns:
+            {타겟 언어 코드: 번역문}
+        """
+        if not self.is_available():
+            raise ValueError("Claude provider is not available (missing API key)")
+        if len(target_langs) == 1:
+            return {target_langs[0]: await self.translate(text, source_lang, target_langs[0], context)}
+
+        system = self._system_blocks(self._create_multi_system_prompt(source_lang, target_langs, context))
+        prompt = self._create_user_prompt(text)
+        estimated, max_tokens = token_budget.plan(text, source_lang, target_langs)
+
+        try:
+            message = await self._create(
+                model=self.model,
+                max_tokens=max_tokens,
+                system=system,
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }]
+            )
+            self._record_usage(message.usage)
+
+            # 잘린 JSON은 파싱되는 언어만 사용하고 나머지는 개별 번역으로 보충
+            token_budget.record(
+                source_lang, '*', estimated, message.usage.output_tokens,
+                truncated=message.stop_reason == 'max_tokens'
+            )
+
+            results = self._parse_multi_response(message.content[0].text, target_langs)
+            logger.info(f"Claude multi-target translation completed: {text[:30]}... -> {list(results)}")
+            return await self._fill_missing_targets(results, text, source_lang, target_langs, context)
+
+        except Exception as e:
+            logger.error(f"Claude multi-target translation error: {e}")
+            raise
+
+    def _system_blocks(self, system_prompt: str) -> List[Dict]:
+        """
+        시스템 프롬프트 블록 (prompt caching)
+
+        지시문과 용어집은 언어쌍별로 고정이므로 cache_control로 prefix 캐싱합니다.
+        캐시 적중 시 해당 입력 토큰은 할인되고 첫 토큰까지의 지연이 줄어듭니다.
+        모델별 최소 길이 미만의 prefix는 API가 캐싱하지 않으므로 표시하지 않습니다.
+        (현재 기본 용어집 크기에서는 지시문 + 용어집이 최소 길이에 못 미침)
+        """
+        block = {"type": "text", "text": system_prompt}
+        if token_budget.estimate_tokens(system_prompt, 'ko') >= self._prompt_cache_min_tokens():
+            block["cache_control"] = {"type": "ephemeral"}
+        return [block]
+
+    def _prompt_cache_min_tokens(self) -> int:
+        for family, min_tokens in PROMPT_CACHE_MIN_TOKENS.items():
+            if family in self.model:
+                return min_tokens
+        return DEFAULT_PROMPT_CACHE_MIN_TOKENS
+
+    async def _create(self, **kwargs):
+        """messages 호출 (응답 헤더의 rate limit 잔여량 기록)"""
+        self.rate_limit.reserve()
+        raw = await self.client.messages.with_raw_response.create(**kwargs)
+        self.rate_limit.update(raw.headers)
+        return raw.parse()
+
+    def _record_usage(self, usage):
+        """입력/캐시 토큰 사용량 기록"""
+        self._record_prompt_usage(
+            usage.input_tokens,
+            getattr(usage, 'cache_read_input_tokens', 0),
+            getattr(usage, 'cache_creation_input_tokens', 0)
+        )
+
+    def _create_system_prompt(self, source_lang: str, target_lang: str, context: str) -> str:
+        """Claude용 시스템 프롬프트 (언어쌍/컨텍스트/용어집 버전별 메모이제이션)"""
+        return self._memoized_prompt(
+            ('single', context, source_lang, target_lang),
+            lambda: self._build_system_prompt(source_lang, target_lang, context)
+        )
+
+    def _build_system_prompt(self, source_lang: str, target_lang: str, context: str) -> str:
         source_name = self._get_lang_name(source_lang)
         target_name = self._get_lang_name(target_lang)
 
         if context == 'medical':
             prompt = f"""당신은 의료 전문 통역사입니다.
-다음 의료 상담 메시지를 {target_name}로 정확하게 번역해주세요.
-
-원문 언어: {source_name}
-원문: {text}
+사용자가 보내는 의료 상담 메시지를 {source_name}에서 {target_name}로 정확하게 번역해주세요.
 """
+            glossary_context = self._create_glossary_context(source_lang, target_lang)
             if glossary_context:
                 prompt += f"""
 의료 용어 참고:
@@ -127,13 +249,52 @@ class ClaudeProvider(BaseTranslationProvider):
 3. 격식있고 공손한 표현 사용
 4. 증상이나 통증 표현은 명확하게 번역
 5. 문화적 차이를 고려한 자연스러운 표현
+6. ⟦0⟧ 형태의 자리표시자는 번역하지 말고 그대로 유지
 
 번역문만 출력하세요. 설명이나 주석 없이 번역 결과만 제공하세요."""
         else:
-            prompt = f"""다음 텍스트를 {source_name}에서 {target_name}로 번역해주세요.
-
-원문: {text}
+            prompt = f"""사용자가 보내는 텍스트를 {source_name}에서 {target_name}로 번역해주세요.
+⟦0⟧ 형태의 자리표시자는 그대로 유지하세요.
 
 번역문만 출력하세요."""
 
         return prompt
+
+    def _create_multi_system_prompt(self, source_lang: str, target_langs: List[str], context: str) -> str:
+        """Claude용 다국어 시스템 프롬프트 (JSON 출력, 메모이제이션)"""
+        return self._memoized_prompt(
+            ('multi', context, source_lang, tuple(target_langs)),
+            lambda: self._build_multi_system_prompt(source_lang, target_langs, context)
+        )
+
+    def _build_multi_system_prompt(self, source_lang: str, target_langs: List[str], context: str) -> str:
+        source_name = self._get_lang_name(source_lang)
+        targets = ", ".join(f"{lang} ({self._get_lang_name(lang)})" for lang in target_langs)
+
+        prompt = f"""당신은 의료 전문 통역사입니다.
+사용자가 보내는 {'의료 상담 ' if context == 'medical' else ''}메시지를 아래 언어들로 각각 정확하게 번역해주세요.
+
+대상 언어: {targets}
+원문 언어: {source_name}
+"""
+        # 한국어 기준 용어집이므로 ko 원문일 때 모든 타겟 용어를 함께 제공
+        glossary_context = "\n".join(filter(None, [
+            self._create_glossary_context(source_lang, target_lang)
+            for target_lang in target_langs
+        ]))
+        if glossary_context:
+            prompt += f"""
+의료 용어 참고:
+{glossary_context}
+"""
+        prompt += f"""
+⟦0⟧ 형태의 자리표시자는 번역하지 말고 그대로 유지하세요.
+언어 코드를 키로, 번역문을 값으로 하는 JSON 객체만 출력하세요.
+예: {{"{target_langs[0]}": "..."}}
+설명이나 주석 없이 JSON만 제공하세요."""
+
+        return prompt
+
+    def _create_user_prompt(self, text: str) -> str:
+        """사용자 메시지 (가변 부분 - 고정 prefix 뒤에 위치)"""
+        return f"원문: {text}"
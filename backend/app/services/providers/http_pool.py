@@ -0,0 +1,196 @@
+"""
+프로바이더 SDK 공용 HTTP 커넥션 풀
+
+OpenAI/Anthropic SDK는 기본값으로 각자 httpx 클라이언트를 만들기 때문에
+풀 크기, keep-alive, HTTP/2, 타임아웃을 조정할 수 없고 버스트 시
+TCP/TLS 연결 비용과 풀 고갈이 발생합니다.
+
+- 엔드포인트(프로바이더)별 공유 httpx.AsyncClient
+- 최대 연결 수 / keep-alive 만료 / HTTP/2 (h2 설치 시)
+- 단계별 타임아웃 (connect, read, write, pool)
+- 풀 메트릭 (진행 중 요청, 연결 대기, 열린 연결)
+- 시작 시 사전 연결(warm-up)로 첫 요청의 연결 지연 제거
+"""
+
+from typing import Dict, Any, Optional
+import asyncio
+import importlib.util
+import logging
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 프로바이더별 API 엔드포인트 (warm-up 대상)
+PROVIDER_ENDPOINTS = {
+    'openai': 'https://api.openai.com',
+    'claude': 'https://api.anthropic.com',
+}
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """응답 본문 스트림 - 닫힐 때(연결이 풀로 반환될 때) 진행 중 요청 수 감소"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, transport: "PoolMetricsTransport"):
+        self._stream = stream
+        self._transport = transport
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self._stream.aclose()
+        finally:
+            self._transport.in_flight -= 1
+
+
+class PoolMetricsTransport(httpx.AsyncBaseTransport):
+    """요청 수/진행 중 요청을 집계하는 AsyncHTTPTransport 래퍼"""
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport):
+        self._transport = transport
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            self.in_flight -= 1
+            self.errors += 1
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_TrackedStream(response.stream, self),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        pool = getattr(self._transport, '_pool', None)
+        connections = list(getattr(pool, 'connections', []))
+        # httpcore는 연결을 배정받지 못한 요청을 대기열(_requests)에 둠
+        queued = [
+            status for status in getattr(pool, '_requests', [])
+            if getattr(status, 'connection', None) is None
+        ]
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'peak_in_flight': self.peak_in_flight,
+            'waiting': len(queued),
+            'connections': len(connections),
+            'idle_connections': sum(1 for conn in connections if conn.is_idle()),
+            'http2_connections': sum(
+                1 for conn in connections if 'HTTP/2' in repr(conn)
+            ),
+        }
+
+
+class ProviderHTTPPool:
+    """프로바이더별 공유 httpx.AsyncClient 관리"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._transports: Dict[str, PoolMetricsTransport] = {}
+        self.http2 = settings.PROVIDER_HTTP2 and importlib.util.find_spec('h2') is not None
+        if settings.PROVIDER_HTTP2 and not self.http2:
+            logger.warning("HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+
+    def get_client(self, name: str) -> httpx.AsyncClient:
+        """프로바이더 공유 클라이언트 (없으면 생성)"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            transport = PoolMetricsTransport(httpx.AsyncHTTPTransport(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=settings.PROVIDER_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.PROVIDER_HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.PROVIDER_HTTP_KEEPALIVE_EXPIRY,
+                ),
+                retries=1,  # 연결 수립 실패만 재시도 (요청 재시도는 SDK 담당)
+            ))
+            client = httpx.AsyncClient(
+                transport=transport,
+                timeout=httpx.Timeout(
+                    connect=settings.PROVIDER_CONNECT_TIMEOUT,
+                    read=settings.PROVIDER_READ_TIMEOUT,
+                    write=settings.PROVIDER_WRITE_TIMEOUT,
+                    pool=settings.PROVIDER_POOL_TIMEOUT,
+                ),
+                follow_redirects=True,
+            )
+            self._clients[name] = client
+            self._transports[name] = transport
+        return client
+
+    async def warmup(self, connections: Optional[int] = None):
+        """
+        사전 연결 (TCP + TLS 핸드셰이크)
+
+        생성된 클라이언트마다 엔드포인트로 가벼운 HEAD 요청을 보내 keep-alive 연결을
+        풀에 만들어 둡니다. 응답 코드는 무시하며 실패해도 기동을 막지 않습니다.
+        """
+        count = connections or settings.PROVIDER_HTTP_WARMUP_CONNECTIONS
+        # HTTP/2는 한 연결에 다중화되므로 1개면 충분
+        if self.http2:
+            count = 1
+
+        async def ping(name: str, client: httpx.AsyncClient):
+            url = PROVIDER_ENDPOINTS.get(name)
+            if not url:
+                return
+            results = await asyncio.gather(
+                *[client.head(url) for _ in range(count)], return_exceptions=True
+            )
+            failed = [r for r in results if isinstance(r, Exception)]
+            if failed:
+                logger.warning(f"HTTP pool warm-up for {name} failed: {failed[0]!r}")
+            else:
+                logger.info(f"HTTP pool warmed up: {name} ({count} connections)")
+
+        await asyncio.gather(*[
+            ping(name, client) for name, client in self._clients.items()
+        ])
+
+    async def close(self):
+        """모든 클라이언트 종료"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients = {}
+        self._transports = {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """풀 설정 및 프로바이더별 메트릭"""
+        return {
+            'http2': self.http2,
+            'max_connections': settings.PROVIDER_HTTP_MAX_CONNECTIONS,
+            'max_keepalive_connections': settings.PROVIDER_HTTP_MAX_KEEPALIVE,
+            'keepalive_expiry': settings.PROVIDER_HTTP_KEEPALIVE_EXPIRY,
+            'pools': {
+                name: transport.get_stats()
+                for name, transport in self._transports.items()
+            },
+        }
+
+
+# 싱글톤 인스턴스
+http_pool = ProviderHTTPPool()
@@ -0,0 +1,308 @@
+"""Local Offline Translation Provider (CTranslate2)"""
+
+from .base import BaseTranslationProvider
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, List, Tuple, Set, Any
+import asyncio
+import importlib.util
+import logging
+import multiprocessing
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# 줄바꿈 또는 문장 종결 부호 뒤 공백 (구분자 보존) - Marian 계열은 문장 단위 입력에 최적화
+_SEGMENT_BOUNDARY = re.compile(r'(\n+|(?<=[.!?。！？])\s+)')
+
+# 워커 프로세스별 로드된 모델: model_dir -> (Translator, source SentencePiece, target SentencePiece)
+_worker_models: Dict[str, Tuple[Any, Any, Any]] = {}
+
+
+def _load_model(model_dir: str, compute_type: str, threads: int):
+    """워커 프로세스에서 모델 로드 (프로세스당 1회)"""
+    model = _worker_models.get(model_dir)
+    if model is None:
+        import ctranslate2
+        import sentencepiece
+
+        translator = ctranslate2.Translator(
+            model_dir,
+            device='cpu',
+            compute_type=compute_type,
+            inter_threads=1,
+            intra_threads=threads
+        )
+        source_sp = sentencepiece.SentencePieceProcessor(model_file=os.path.join(model_dir, 'source.spm'))
+        target_sp = sentencepiece.SentencePieceProcessor(model_file=os.path.join(model_dir, 'target.spm'))
+        model = (translator, source_sp, target_sp)
+        _worker_models[model_dir] = model
+    return model
+
+
+def translate_batch_worker(
+    model_dir: str,
+    texts: List[str],
+    compute_type: str,
+    threads: int,
+    beam_size: int
+) -> List[str]:
+    """워커 프로세스에서 실행: 문장 배치 번역"""
+    translator, source_sp, target_sp = _load_model(model_dir, compute_type, threads)
+    tokens = [source_sp.encode(text, out_type=str) + ['</s>'] for text in texts]
+    results = translator.translate_batch(
+        tokens,
+        beam_size=beam_size,
+        max_batch_size=len(tokens),
+        max_decoding_length=256
+    )
+    return [
+        target_sp.decode([token for token in result.hypotheses[0] if token != '</s>'])
+        for result in results
+    ]
+
+
+class LocalProvider(BaseTranslationProvider):
+    """
+    로컬 오프라인 번역 프로바이더
+
+    CTranslate2로 변환한 Marian(Opus-MT) 계열 모델을 CPU에서 실행합니다.
+    네트워크 없이 동작하므로 외부 API 장애/회선 단절 시 fallback으로 사용할 수 있습니다.
+
+    - 모델 디렉터리: {model_dir}/{src}-{tgt}/ (model.bin, source.spm, target.spm)
+      변환 예: ct2-transformers-converter --model Helsinki-NLP/opus-mt-ko-en
+               --output_dir models/local/ko-en --quantization int8
+               (source.spm/target.spm은 원본 모델에서 복사)
+    - 직접 모델이 없는 언어쌍은 pivot 언어(기본 en)를 거쳐 번역
+    - 전용 프로세스 풀에서 실행 (이벤트 루프/GIL과 분리)
+    - 동시 요청을 언어쌍별로 모아 한 번에 배치 번역 (dynamic batching)
+    - 용어집 프롬프트는 적용되지 않음
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        medical_glossary: dict = None,
+        compute_type: str = "int8",
+        workers: int = 1,
+        threads_per_worker: int = 4,
+        max_batch: int = 32,
+        batch_wait_ms: float = 10.0,
+        beam_size: int = 2,
+        pivot_lang: str = "en"
+    ):
+        """
+        Args:
+            model_dir: 언어쌍별 모델 디렉터리의 상위 경로
+            medical_glossary: 의료 용어집 (캐시 네임스페이스용)
+            compute_type: CTranslate2 연산 타입 (int8 양자화 권장)
+            workers: 워커 프로세스 수
+            threads_per_worker: 프로세스당 연산 스레드 수
+            max_batch: 배치당 최대 문장 수
+            batch_wait_ms: 배치를 모으기 위해 기다리는 최대 시간 (ms)
+            beam_size: 빔 크기 (1이면 greedy, 가장 빠름)
+            pivot_lang: 직접 모델이 없을 때 거쳐갈 언어
+        """
+        super().__init__(medical_glossary)
+        self.model_dir = model_dir
+        self.compute_type = compute_type
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait_ms / 1000
+        self.beam_size = beam_size
+        self.pivot_lang = pivot_lang
+        self.model = f"ct2-{compute_type}"
+        self.pairs = self._discover_pairs()
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # 언어쌍 모델별 대기 중인 (문장, future)
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        # 실행 중인 배치 태스크 (GC로 사라지지 않도록 참조 유지)
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {
+            'batches': 0,
+            'sentences': 0,
+            'errors': 0,
+            'pool_restarts': 0,
+            'total_batch_ms': 0.0
+        }
+
+        if self.is_available():
+            logger.info(f"Local provider initialized: {sorted(self.pairs)} ({compute_type})")
+
+    @property
+    def name(self) -> str:
+        return "Local"
+
+    def _discover_pairs(self) -> Dict[str, str]:
+        """{src}-{tgt} 하위 디렉터리 중 model.bin이 있는 언어쌍"""
+        if not os.path.isdir(self.model_dir):
+            return {}
+        return {
+            entry: os.path.join(self.model_dir, entry)
+            for entry in os.listdir(self.model_dir)
+            if os.path.isfile(os.path.join(self.model_dir, entry, 'model.bin'))
+        }
+
+    def is_available(self) -> bool:
+        """ctranslate2/sentencepiece 설치 및 모델 존재 여부"""
+        return (
+            bool(self.pairs)
+            and importlib.util.find_spec('ctranslate2') is not None
+            and importlib.util.find_spec('sentencepiece') is not None
+        )
+
+    def supports(self, source_lang: str, target_lang: str) -> bool:
+        return bool(self._route(source_lang, target_lang))
+
+    def _route(self, source_lang: str, target_lang: str) -> List[str]:
+        """번역 경로 (직접 모델 또는 pivot 경유)"""
+        direct = f"{source_lang}-{target_lang}"
+        if direct in self.pairs:
+            return [self.pairs[direct]]
+        first = f"{source_lang}-{self.pivot_lang}"
+        second = f"{self.pivot_lang}-{target_lang}"
+        if first in self.pairs and second in self.pairs:
+            return [self.pairs[first], self.pairs[second]]
+        return []
+
+    async def translate(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        context: str = 'medical'
+    ) -> str:
+        """
+        로컬 모델로 번역
+
+        문장 단위로 나눠 배치 큐에 넣고, 다른 요청의 문장과 함께 번역된 결과를 재조립합니다.
+        """
+        route = self._route(source_lang, target_lang)
+        if not route:
+            raise ValueError(f"Local provider has no model for {source_lang}->{target_lang}")
+
+        parts = _SEGMENT_BOUNDARY.split(text)
+        sentences = parts[0::2]
+        separators = parts[1::2] + [""]
+        indexes = [i for i, sentence in enumerate(sentences) if sentence.strip()]
+
+        texts = [sentences[i] for i in indexes]
+        for model_dir in route:
+            texts = await self._submit(model_dir, texts)
+
+        translated = list(sentences)
+        for i, result in zip(indexes, texts):
+            translated[i] = result
+        result_text = "".join(
+            sentence + separator for sentence, separator in zip(translated, separators)
+        ).strip()
+        logger.info(f"Local translation completed: {text[:30]}... -> {result_text[:30]}...")
+        return result_text
+
+    async def _submit(self, model_dir: str, texts: List[str]) -> List[str]:
+        """배치 큐에 문장 추가 후 결과 대기"""
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        queue = self._pending.setdefault(model_dir, [])
+        queue.extend(zip(texts, futures))
+
+        if len(queue) >= self.max_batch:
+            self._dispatch(model_dir)
+        elif model_dir not in self._timers:
+            self._timers[model_dir] = loop.call_later(self.batch_wait, self._dispatch, model_dir)
+
+        return list(await asyncio.gather(*futures))
+
+    def _dispatch(self, model_dir: str):
+        """대기 중인 문장을 max_batch 단위로 워커에 전달"""
+        timer = self._timers.pop(model_dir, None)
+        if timer:
+            timer.cancel()
+        queue = self._pending.pop(model_dir, [])
+        for start in range(0, len(queue), self.max_batch):
+            task = asyncio.create_task(self._execute(model_dir, queue[start:start + self.max_batch]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, model_dir: str, batch: List[Tuple[str, asyncio.Future]]):
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        executor = self._get_executor()
+        try:
+            results = await loop.run_in_executor(
+                executor,
+                translate_batch_worker,
+                model_dir,
+                [text for text, _ in batch],
+                self.compute_type,
+                self.threads_per_worker,
+                self.beam_size
+            )
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            self.stats['errors'] += 1
+            if isinstance(e, BrokenProcessPool):
+                self._reset_executor(executor)
+            logger.error(f"Local translation batch failed ({os.path.basename(model_dir)}): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self.stats['batches'] += 1
+            self.stats['sentences'] += len(batch)
+            self.stats['total_batch_ms'] += (time.monotonic() - started) * 1000
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # fork 시 이벤트 루프/소켓 상태가 복제되지 않도록 spawn 사용
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    def _reset_executor(self, executor: ProcessPoolExecutor):
+        """워커 프로세스가 비정상 종료된 풀 폐기 (다음 배치에서 새 풀 생성)"""
+        if self._executor is executor:
+            self.stats['pool_restarts'] += 1
+            logger.warning("Local translation worker pool broken, recreating on next batch")
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def warmup(self):
+        """워커 프로세스 기동 및 모델 로드 (첫 요청 지연 제거)"""
+        for pair in self.pairs:
+            source_lang, target_lang = pair.split('-', 1)
+            try:
+                await self.translate("ok", source_lang, target_lang)
+            except Exception as e:
+                logger.warning(f"Local model warm-up failed ({pair}): {e}")
+
+    def shutdown(self):
+        """워커 프로세스 종료"""
+        for task in self._tasks:
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """배치 통계 (평균 배치 크기/소요 시간)"""
+        batches = self.stats['batches']
+        return {
+            **self.stats,
+            'pairs': sorted(self.pairs),
+            'compute_type': self.compute_type,
+            'workers': self.workers,
+            'avg_batch_size': round(self.stats['sentences'] / batches, 2) if batches else None,
+            'avg_batch_ms': round(self.stats['total_batch_ms'] / batches, 2) if batches else None,
+        }
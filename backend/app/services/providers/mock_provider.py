@@ -12,6 +12,8 @@ class MockProvider(BaseTranslationProvider):
     실제 번역 대신 포맷된 문자열을 반환합니다.
     """
 
+    model = "mock"
+
     def __init__(self, medical_glossary: dict = None):
         """
         Args:
@@ -1,12 +1,19 @@
 """OpenAI Translation Provider"""
 
 from .base import BaseTranslationProvider
-from typing import Optional
+from typing import Optional, Dict, List
 import logging
 from openai import AsyncOpenAI
 
+from app.config import settings
+from .token_budget import token_budget
+from .http_pool import http_pool
+
 logger = logging.getLogger(__name__)
 
+# 출력이 잘렸을 때 이어쓰기 요청
+CONTINUE_PROMPT = "Continue the translation exactly where you stopped. Output only the remaining part, without repeating anything."
+
 
 class OpenAIProvider(BaseTranslationProvider):
     """
@@ -19,7 +26,8 @@ class OpenAIProvider(BaseTranslationProvider):
         api_key: str,
         medical_glossary: dict = None,
         model: str = "gpt-3.5-turbo",
-        temperature: float = 0.3
+        temperature: float = 0.3,
+        max_retries: int = 2
     ):
         """
         Args:
@@ -27,6 +35,7 @@ class OpenAIProvider(BaseTranslationProvider):
             medical_glossary: 의료 용어집
             model: 사용할 모델 (gpt-4, gpt-3.5-turbo 등)
             temperature: 온도 (0.0-1.0, 낮을수록 일관된 번역)
+            max_retries: SDK 자체 재시도 횟수 (키 풀에서는 0 - 다른 키로 재시도)
         """
         super().__init__(medical_glossary)
         self.api_key = api_key
@@ -37,7 +46,11 @@ class OpenAIProvider(BaseTranslationProvider):
         # API 키 유효성 확인
         if self.api_key and self.api_key != "your-api-key-here":
             try:
-                self.client = AsyncOpenAI(api_key=self.api_key)
+                self.client = AsyncOpenAI(
+                    api_key=self.api_key,
+                    http_client=http_pool.get_client('openai'),
+                    max_retries=max_retries
+                )
                 logger.info(f"OpenAI provider initialized with model: {self.model}")
             except Exception as e:
                 logger.error(f"Failed to initialize OpenAI client: {e}")
@@ -73,36 +86,149 @@ class OpenAIProvider(BaseTranslationProvider):
         if not self.is_available():
             raise ValueError("OpenAI provider is not available (missing API key)")
 
-        # 용어집 컨텍스트
-        glossary_context = self._create_glossary_context(source_lang, target_lang)
+        # 출력 예산 한도를 넘으면 문장 단위로 분할 번역
+        if token_budget.exceeds_limit(text, source_lang, target_lang):
+            return await self._translate_split(text, source_lang, target_lang, context)
 
-        # 시스템 프롬프트
-        system_prompt = self._create_system_prompt(context, glossary_context)
+        # 시스템 프롬프트 (지시문 + 용어집, 언어쌍별 고정 prefix)
+        system_prompt = self._memoized_prompt(
+            ('single', context, source_lang, target_lang),
+            lambda: self._create_system_prompt(
+                context, self._create_glossary_context(source_lang, target_lang)
+            )
+        )
 
         # 사용자 프롬프트
         user_prompt = self._create_user_prompt(
             text, source_lang, target_lang
         )
 
+        estimated, max_tokens = token_budget.plan(text, source_lang, [target_lang])
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+        try:
+            parts = []
+            actual_tokens = 0
+            continuations = 0
+            while True:
+                response = await self._create(
+                    model=self.model,
+                    temperature=self.temperature,
+                    messages=messages,
+                    max_tokens=max_tokens
+                )
+
+                choice = response.choices[0]
+                parts.append(choice.message.content or "")
+                if response.usage:
+                    actual_tokens += response.usage.completion_tokens
+                    self._record_usage(response.usage)
+
+                # finish_reason == 'length': max_tokens에서 잘림 → 이어쓰기 요청
+                truncated = choice.finish_reason == 'length'
+                if not truncated or continuations >= settings.TOKEN_BUDGET_MAX_CONTINUATIONS:
+                    break
+                continuations += 1
+                logger.warning(f"OpenAI output truncated at {max_tokens} tokens, continuing ({continuations})")
+                messages = messages + [
+                    {"role": "assistant", "content": parts[-1]},
+                    {"role": "user", "content": CONTINUE_PROMPT}
+                ]
+
+            token_budget.record(
+                source_lang, target_lang, estimated, actual_tokens,
+                truncated=truncated or continuations > 0, continuations=continuations
+            )
+
+            translated_text = "".join(parts).strip()
+            logger.info(f"OpenAI translation completed: {text[:30]}... -> {translated_text[:30]}...")
+            return translated_text
+
+        except Exception as e:
+            logger.error(f"OpenAI translation error: {e}")
+            raise
+
+    async def translate_multi(
+        self,
+        text: str,
+        source_lang: str,
+        target_langs: List[str],
+        context: str = 'medical'
+    ) -> Dict[str, str]:
+        """
+        한 번의 요청으로 여러 언어 번역 (JSON 응답)
+
+        Returns:
+            {타겟 언어 코드: 번역문}
+        """
+        if not self.is_available():
+            raise ValueError("OpenAI provider is not available (missing API key)")
+        if len(target_langs) == 1:
+            return {target_langs[0]: await self.translate(text, source_lang, target_langs[0], context)}
+
+        # 한국어 기준 용어집이므로 ko 원문일 때 모든 타겟 용어를 함께 제공
+        system_prompt = self._memoized_prompt(
+            ('multi', context, source_lang, tuple(target_langs)),
+            lambda: self._create_system_prompt(context, "\n".join(filter(None, [
+                self._create_glossary_context(source_lang, target_lang)
+                for target_lang in target_langs
+            ])))
+        )
+        user_prompt = self._create_multi_user_prompt(text, source_lang, target_langs)
+        estimated, max_tokens = token_budget.plan(text, source_lang, target_langs)
+
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._create(
                 model=self.model,
                 temperature=self.temperature,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
-                max_tokens=1024
+                response_format={"type": "json_object"},
+                max_tokens=max_tokens
             )
 
-            translated_text = response.choices[0].message.content.strip()
-            logger.info(f"OpenAI translation completed: {text[:30]}... -> {translated_text[:30]}...")
-            return translated_text
+            if response.usage:
+                self._record_usage(response.usage)
+
+            # 잘린 JSON은 파싱되는 언어만 사용하고 나머지는 개별 번역으로 보충
+            choice = response.choices[0]
+            token_budget.record(
+                source_lang, '*', estimated,
+                response.usage.completion_tokens if response.usage else 0,
+                truncated=choice.finish_reason == 'length'
+            )
+            content = choice.message.content or ""
+            results = self._parse_multi_response(content, target_langs)
+            logger.info(f"OpenAI multi-target translation completed: {text[:30]}... -> {list(results)}")
+            return await self._fill_missing_targets(results, text, source_lang, target_langs, context)
 
         except Exception as e:
-            logger.error(f"OpenAI translation error: {e}")
+            logger.error(f"OpenAI multi-target translation error: {e}")
             raise
 
+    async def _create(self, **kwargs):
+        """chat.completions 호출 (응답 헤더의 rate limit 잔여량 기록)"""
+        self.rate_limit.reserve()
+        raw = await self.client.chat.completions.with_raw_response.create(**kwargs)
+        self.rate_limit.update(raw.headers)
+        return raw.parse()
+
+    def _record_usage(self, usage):
+        """
+        입력/캐시 토큰 사용량 기록
+
+        OpenAI는 1024 토큰 이상의 동일 prefix를 자동 캐싱하므로
+        시스템 프롬프트를 바이트 단위로 동일하게 유지하는 것이 중요합니다.
+        """
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached = (getattr(details, 'cached_tokens', 0) or 0) if details else 0
+        self._record_prompt_usage(usage.prompt_tokens - cached, cached)
+
     def _create_system_prompt(self, context: str, glossary_context: str) -> str:
         """시스템 프롬프트 생성"""
         if context == 'medical':
@@ -120,14 +246,18 @@ Important guidelines:
 - Translate ONLY the given text, without adding explanations or commentary
 - Preserve the emotional tone and urgency when relevant
 - Use standardized medical terminology when available
-- Be sensitive to patient concerns and cultural nuances"""
+- Be sensitive to patient concerns and cultural nuances
+- Keep placeholders such as ⟦0⟧ exactly as they are"""
 
             if glossary_context:
                 prompt += f"\n\nMedical Terminology Reference:\n{glossary_context}"
 
             return prompt
         else:
-            return "You are a professional translator. Translate the text accurately while maintaining the original tone and intent."
+            return (
+                "You are a professional translator. Translate the text accurately while maintaining the original tone and intent. "
+                "Keep placeholders such as ⟦0⟧ exactly as they are."
+            )
 
     def _create_user_prompt(
         self,
@@ -145,3 +275,21 @@ Source text ({source_name}):
 {text}
 
 Provide ONLY the translation in {target_name}, without any explanations or additional text."""
+
+
+    def _create_multi_user_prompt(
+        self,
+        text: str,
+        source_lang: str,
+        target_langs: List[str]
+    ) -> str:
+        """다국어 사용자 프롬프트 생성 (JSON 출력)"""
+        source_name = self._get_lang_name(source_lang)
+        targets = ", ".join(f"{lang} ({self._get_lang_name(lang)})" for lang in target_langs)
+
+        return f"""Translate the following text from {source_name} into each of these languages: {targets}.
+
+Source text ({source_name}):
+{text}
+
+Respond with ONLY a JSON object whose keys are the language codes and whose values are the translations, e.g. {{"{target_langs[0]}": "..."}}."""
@@ -0,0 +1,164 @@
+"""
+멀티 키/계정 프로바이더 풀
+
+같은 종류의 프로바이더 여러 개(API 키 × 모델)를 하나의 프로바이더로 묶어
+응답 헤더의 rate limit 여유분(headroom)이 큰 멤버로 요청을 분산합니다.
+- 429: 해당 멤버를 쿨다운 동안 로테이션에서 제외하고 다음 멤버로 재시도
+- 5xx/연결 오류: 쿨다운 없이 다음 멤버로 재시도
+키 수만큼 처리량 상한이 늘어납니다.
+"""
+
+from typing import List, Dict, Any
+import logging
+
+import anthropic
+import openai
+
+from app.config import settings
+from .base import BaseTranslationProvider
+from .rate_limit import parse_reset_seconds
+
+logger = logging.getLogger(__name__)
+
+_STATUS_ERRORS = (openai.APIStatusError, anthropic.APIStatusError)
+_CONNECTION_ERRORS = (openai.APIConnectionError, anthropic.APIConnectionError)
+
+
+class ProviderPool(BaseTranslationProvider):
+    """
+    프로바이더 풀
+
+    첫 번째 멤버(기본 키 + 기본 모델)의 name/model을 그대로 사용하므로
+    캐시 키와 인덱스는 단일 키 구성과 동일합니다.
+    """
+
+    def __init__(self, members: List[BaseTranslationProvider], cooldown: float = None):
+        """
+        Args:
+            members: 같은 종류의 프로바이더 목록 (첫 번째가 기본)
+            cooldown: 429 수신 시 retry-after가 없을 때의 쿨다운 (초)
+        """
+        super().__init__(members[0].medical_glossary)
+        self.members = members
+        self.primary = members[0]
+        self.model = self.primary.model
+        self.cooldown = cooldown if cooldown is not None else settings.PROVIDER_KEY_COOLDOWN_SECONDS
+        self._next = 0
+        self._in_flight = [0] * len(members)
+        self.stats = {
+            'requests': 0,
+            'failovers': 0,
+            'throttled': 0,
+            'exhausted': 0
+        }
+
+    @property
+    def name(self) -> str:
+        return self.primary.name
+
+    def is_available(self) -> bool:
+        return any(member.is_available() for member in self.members)
+
+    async def translate(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        context: str = 'medical'
+    ) -> str:
+        return await self._call('translate', text, source_lang, target_lang, context)
+
+    async def translate_multi(
+        self,
+        text: str,
+        source_lang: str,
+        target_langs: List[str],
+        context: str = 'medical'
+    ) -> Dict[str, str]:
+        return await self._call('translate_multi', text, source_lang, target_langs, context)
+
+    def _order(self) -> List[int]:
+        """
+        시도 순서
+
+        쿨다운이 아닌 멤버를 headroom 높은 순으로 (동률이면 진행 중 요청이 적은 순,
+        그다음 라운드로빈). 모두 쿨다운 중이면 가장 먼저 풀리는 멤버 하나만 시도합니다.
+        """
+        count = len(self.members)
+        start = self._next
+        self._next = (self._next + 1) % count
+        rotation = [(start + i) % count for i in range(count)]
+        available = [i for i in rotation if self.members[i].is_available()]
+
+        ready = [i for i in available if not self.members[i].rate_limit.is_cooling_down()]
+        ready.sort(key=lambda i: (-round(self.members[i].rate_limit.headroom(), 2), self._in_flight[i]))
+        if ready:
+            return ready
+        return sorted(available, key=lambda i: self.members[i].rate_limit.cooldown_until)[:1]
+
+    async def _call(self, method: str, *args):
+        """헤드룸 순으로 멤버를 시도하고 429/5xx/연결 오류 시 다음 멤버로 재시도"""
+        self.stats['requests'] += 1
+        last_error: Exception = ValueError("No provider in pool is available")
+
+        for attempt, index in enumerate(self._order()):
+            member = self.members[index]
+            if attempt:
+                self.stats['failovers'] += 1
+            self._in_flight[index] += 1
+            try:
+                return await getattr(member, method)(*args)
+            except _STATUS_ERRORS as e:
+                member.rate_limit.update(e.response.headers)
+                if e.status_code == 429:
+                    retry_after = parse_reset_seconds(e.response.headers.get('retry-after'))
+                    member.rate_limit.cool_down(retry_after or self.cooldown)
+                    self.stats['throttled'] += 1
+                    logger.warning(
+                        f"{member.name} key ...{self._key_suffix(member)} rate limited, "
+                        f"cooling down {retry_after or self.cooldown}s"
+                    )
+                elif e.status_code < 500:
+                    raise
+                last_error = e
+            except _CONNECTION_ERRORS as e:
+                logger.warning(f"{member.name} key ...{self._key_suffix(member)} connection error: {e}")
+                last_error = e
+            finally:
+                self._in_flight[index] -= 1
+
+        self.stats['exhausted'] += 1
+        raise last_error
+
+    def _key_suffix(self, member: BaseTranslationProvider) -> str:
+        return (getattr(member, 'api_key', '') or '')[-4:]
+
+    def get_prompt_cache_stats(self) -> Dict[str, Any]:
+        """멤버 프롬프트 캐시 통계 합계"""
+        totals = {key: 0 for key in self.prompt_cache_stats}
+        memoized = 0
+        for member in self.members:
+            for key in totals:
+                totals[key] += member.prompt_cache_stats[key]
+            memoized += len(member._prompt_cache)
+        total = totals['input_tokens'] + totals['cache_read_tokens'] + totals['cache_write_tokens']
+        return {
+            **totals,
+            'memoized_prompts': memoized,
+            'cache_read_ratio': round(totals['cache_read_tokens'] / total * 100, 2) if total else 0.0
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """풀 통계 및 멤버별 rate limit 상태"""
+        return {
+            **self.stats,
+            'members': [
+                {
+                    'key': f"...{self._key_suffix(member)}",
+                    'model': member.model,
+                    'in_flight': self._in_flight[index],
+                    **member.rate_limit.get_stats()
+                }
+                for index, member in enumerate(self.members)
+            ]
+        }
@@ -0,0 +1,121 @@
+"""
+프로바이더 rate limit 상태
+
+응답 헤더의 잔여 요청/토큰 수를 기록해 키(계정)별 여유분(headroom)을 계산합니다.
+- OpenAI: x-ratelimit-{limit,remaining,reset}-{requests,tokens}
+- Anthropic: anthropic-ratelimit-{requests,tokens}-{limit,remaining,reset}
+"""
+
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Mapping
+import re
+import time
+
+# OpenAI reset 형식: "1s", "6m0s", "20ms", "1h2m3.5s"
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+
+def parse_reset_seconds(value: Optional[str]) -> Optional[float]:
+    """reset 헤더를 남은 초로 변환 (기간 문자열, 초, RFC 3339 시각 지원)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+    try:
+        reset_at = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return max((reset_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except ValueError:
+        return None
+
+
+def _to_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class _Window:
+    """한 차원(요청 수 또는 토큰 수)의 한도/잔여량"""
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0  # time.monotonic() 기준
+
+    def update(self, limit: Optional[str], remaining: Optional[str], reset: Optional[str]):
+        if remaining is None:
+            return
+        self.limit = _to_int(limit) or self.limit
+        self.remaining = _to_int(remaining)
+        seconds = parse_reset_seconds(reset)
+        self.reset_at = time.monotonic() + (seconds if seconds is not None else 60.0)
+
+    def headroom(self) -> Optional[float]:
+        """잔여 비율 (0~1), 정보가 없거나 reset 시각이 지났으면 None"""
+        if self.remaining is None or not self.limit or time.monotonic() >= self.reset_at:
+            return None
+        return max(min(self.remaining / self.limit, 1.0), 0.0)
+
+
+class RateLimitState:
+    """키(계정)별 rate limit 상태"""
+
+    def __init__(self):
+        self.requests = _Window()
+        self.tokens = _Window()
+        self.cooldown_until = 0.0
+        self.throttled = 0  # 429 횟수
+
+    def update(self, headers: Mapping[str, str]):
+        """응답 헤더로 잔여량 갱신"""
+        if 'x-ratelimit-remaining-requests' in headers or 'x-ratelimit-remaining-tokens' in headers:
+            for name, window in (('requests', self.requests), ('tokens', self.tokens)):
+                window.update(
+                    headers.get(f'x-ratelimit-limit-{name}'),
+                    headers.get(f'x-ratelimit-remaining-{name}'),
+                    headers.get(f'x-ratelimit-reset-{name}')
+                )
+        else:
+            for name, window in (('requests', self.requests), ('tokens', self.tokens)):
+                window.update(
+                    headers.get(f'anthropic-ratelimit-{name}-limit'),
+                    headers.get(f'anthropic-ratelimit-{name}-remaining'),
+                    headers.get(f'anthropic-ratelimit-{name}-reset')
+                )
+
+    def reserve(self):
+        """요청 전송 시 잔여 요청 수를 미리 차감 (다음 헤더 도착 전 동시 요청 분산)"""
+        if self.requests.remaining:
+            self.requests.remaining -= 1
+
+    def cool_down(self, seconds: float):
+        """429 수신 - 일정 시간 로테이션에서 제외"""
+        self.throttled += 1
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + seconds)
+
+    def is_cooling_down(self) -> bool:
+        return time.monotonic() < self.cooldown_until
+
+    def headroom(self) -> float:
+        """요청/토큰 중 더 부족한 쪽의 잔여 비율 (정보 없으면 1.0)"""
+        known = [h for h in (self.requests.headroom(), self.tokens.headroom()) if h is not None]
+        return min(known) if known else 1.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'headroom': round(self.headroom(), 3),
+            'remaining_requests': self.requests.remaining,
+            'remaining_tokens': self.tokens.remaining,
+            'cooldown_seconds': round(max(self.cooldown_until - time.monotonic(), 0.0), 1),
+            'throttled': self.throttled,
+        }
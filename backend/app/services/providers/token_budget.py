@@ -0,0 +1,189 @@
+"""
+출력 토큰 예산 (max_tokens) 산정
+
+원문 길이와 언어쌍 팽창 비율로 번역문 토큰 수를 추정해 max_tokens를 정합니다.
+- 짧은 메시지는 작은 예산 → rate limit(TPM) 계산/스케줄링 여유 확보
+- 긴 메시지는 충분한 예산 → 잘림 방지, 한도를 넘으면 문장 단위 분할
+- 추정치 vs 실제 출력 토큰을 언어쌍별로 기록해 보정 계수로 사용
+"""
+
+from typing import Dict, List, Tuple, Any
+import math
+import re
+
+from app.config import settings
+
+# 글자당 토큰 수 (cl100k / Claude 토크나이저 기준 대략값)
+TOKENS_PER_CHAR = {
+    'ko': 0.9,
+    'ja': 1.0,
+    'zh': 0.9,
+    'th': 0.6,
+    'vi': 0.45,
+    'en': 0.25,
+}
+DEFAULT_TOKENS_PER_CHAR = 0.5
+
+# 같은 의미를 표현하는 데 필요한 글자 수 (한국어 = 1.0 기준)
+CHAR_EXPANSION = {
+    'ko': 1.0,
+    'ja': 1.1,
+    'zh': 0.8,
+    'th': 2.4,
+    'vi': 2.9,
+    'en': 2.6,
+}
+
+# 응답 앞뒤 여분 (공백, 따옴표 등)
+OUTPUT_OVERHEAD_TOKENS = 16
+# 다국어 JSON 응답의 키/구두점 여분 (언어당)
+JSON_OVERHEAD_TOKENS = 8
+
+# 분할 경계: 줄바꿈 또는 문장 종결 부호 뒤 공백 (구분자 보존)
+_SPLIT_BOUNDARY = re.compile(r'(\n+|(?<=[.!?。！？])\s+)')
+
+# 보정 계수 적용 최소 표본 수
+MIN_SAMPLES_FOR_CORRECTION = 20
+
+
+class TokenBudget:
+    """언어쌍별 출력 토큰 예산 산정 및 추정 정확도 기록"""
+
+    def __init__(self):
+        # "src-tgt" -> 통계
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+    def estimate_tokens(self, text: str, lang: str) -> int:
+        """텍스트 토큰 수 추정"""
+        return math.ceil(len(text) * TOKENS_PER_CHAR.get(lang, DEFAULT_TOKENS_PER_CHAR))
+
+    def _raw_tokens_per_char(self, source_lang: str, target_lang: str) -> float:
+        """원문 한 글자당 번역문 토큰 수 (보정 전)"""
+        ratio = CHAR_EXPANSION.get(target_lang, 1.0) / CHAR_EXPANSION.get(source_lang, 1.0)
+        return ratio * TOKENS_PER_CHAR.get(target_lang, DEFAULT_TOKENS_PER_CHAR)
+
+    def estimate_output_tokens(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        corrected: bool = True
+    ) -> int:
+        """번역문 토큰 수 추정 (corrected=True면 기록된 실제값으로 보정)"""
+        tokens = len(text) * self._raw_tokens_per_char(source_lang, target_lang)
+        if corrected:
+            tokens *= self._correction(source_lang, target_lang)
+        return math.ceil(tokens)
+
+    def plan(self, text: str, source_lang: str, target_langs: List[str]) -> Tuple[int, int]:
+        """
+        출력 예산 계획
+
+        Returns:
+            (보정 전 추정 출력 토큰 - record()에 전달, max_tokens)
+        """
+        raw = sum(
+            self.estimate_output_tokens(text, source_lang, target_lang, corrected=False)
+            for target_lang in target_langs
+        )
+        corrected = sum(
+            self.estimate_output_tokens(text, source_lang, target_lang)
+            for target_lang in target_langs
+        )
+        if len(target_langs) > 1:
+            raw += JSON_OVERHEAD_TOKENS * len(target_langs)
+            corrected += JSON_OVERHEAD_TOKENS * len(target_langs)
+
+        max_tokens = math.ceil(corrected * settings.TOKEN_BUDGET_SAFETY) + OUTPUT_OVERHEAD_TOKENS
+        max_tokens = max(settings.TOKEN_BUDGET_MIN, min(max_tokens, settings.TOKEN_BUDGET_MAX))
+        return raw, max_tokens
+
+    def exceeds_limit(self, text: str, source_lang: str, target_lang: str) -> bool:
+        """한 번의 요청으로 번역하기에 너무 긴지 (분할 필요)"""
+        estimated = self.estimate_output_tokens(text, source_lang, target_lang)
+        return estimated * settings.TOKEN_BUDGET_SAFETY + OUTPUT_OVERHEAD_TOKENS > settings.TOKEN_BUDGET_MAX
+
+    def split_text(self, text: str, source_lang: str, target_lang: str) -> List[Tuple[str, str]]:
+        """
+        예산 한도 안에 들어가도록 줄/문장 경계에서 분할
+
+        Returns:
+            (세그먼트, 뒤따르는 구분자) 목록
+        """
+        # 한도에 해당하는 원문 글자 수
+        per_char = max(
+            self._raw_tokens_per_char(source_lang, target_lang) * self._correction(source_lang, target_lang),
+            0.01
+        )
+        usable = (settings.TOKEN_BUDGET_MAX - OUTPUT_OVERHEAD_TOKENS) / settings.TOKEN_BUDGET_SAFETY
+        max_chars = max(1, int(usable / per_char))
+
+        parts = _SPLIT_BOUNDARY.split(text)
+        segments: List[Tuple[str, str]] = []
+        current, current_sep = "", ""
+        for i in range(0, len(parts), 2):
+            piece = parts[i]
+            separator = parts[i + 1] if i + 1 < len(parts) else ""
+            if current and len(current) + len(current_sep) + len(piece) > max_chars:
+                segments.append((current, current_sep))
+                current, current_sep = "", ""
+            current = current + current_sep + piece if current else piece
+            current_sep = separator
+            # 문장 하나가 한도를 넘으면 강제로 자름
+            while len(current) > max_chars:
+                segments.append((current[:max_chars], ""))
+                current = current[max_chars:]
+        if current or current_sep:
+            segments.append((current, current_sep))
+        return [(segment, sep) for segment, sep in segments if segment.strip() or sep]
+
+    def record(
+        self,
+        source_lang: str,
+        target_lang: str,
+        estimated: int,
+        actual: int,
+        truncated: bool = False,
+        continuations: int = 0
+    ):
+        """추정(보정 전) vs 실제 출력 토큰 기록"""
+        pair = f"{source_lang}-{target_lang}"
+        entry = self.stats.setdefault(pair, {
+            'samples': 0,
+            'estimated_tokens': 0,
+            'actual_tokens': 0,
+            'truncations': 0,
+            'continuations': 0,
+        })
+        entry['samples'] += 1
+        entry['estimated_tokens'] += estimated
+        entry['actual_tokens'] += actual
+        entry['truncations'] += int(truncated)
+        entry['continuations'] += continuations
+
+    def _correction(self, source_lang: str, target_lang: str) -> float:
+        """실제/추정 비율 보정 계수 (표본이 충분할 때만, 0.5~3.0)"""
+        entry = self.stats.get(f"{source_lang}-{target_lang}")
+        if not entry or entry['samples'] < MIN_SAMPLES_FOR_CORRECTION or not entry['estimated_tokens']:
+            return 1.0
+        return min(max(entry['actual_tokens'] / entry['estimated_tokens'], 0.5), 3.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """언어쌍별 추정 정확도 통계"""
+        result = {}
+        for pair, entry in self.stats.items():
+            estimated = entry['estimated_tokens']
+            result[pair] = {
+                **entry,
+                'actual_to_estimated': round(entry['actual_tokens'] / estimated, 3) if estimated else None,
+                'truncation_rate': round(entry['truncations'] / entry['samples'] * 100, 2),
+            }
+        return result
+
+    def reset_stats(self):
+        """통계 초기화"""
+        self.stats = {}
+
+
+# 싱글톤 인스턴스
+token_budget = TokenBudget()
@@ -0,0 +1,295 @@
+"""
+채팅방별 최근 메시지 버퍼 (Redis ZSET) 및 재접속 이어받기
+
+상담사 브라우저가 재접속할 때마다 열린 방 전체의 히스토리(limit=100)를 다시 조회하면
+여러 상담사가 동시에 재접속하는 순간 DB에 전체 히스토리 쿼리가 몰립니다.
+방마다 최근 N개 메시지를 seq 점수로 ZSET에 유지하고, 마지막으로 받은 메시지 ID 이후만
+여러 방을 한 번의 파이프라인으로 돌려줍니다.
+
+- room:recent:{room_id}: 메시지 레코드 JSON (score = seq), 최근 N개로 유지
+- room:recent:{room_id}:floor: 버퍼가 빠짐없이 담고 있는 범위의 하한
+  (seq > floor인 메시지는 모두 버퍼에 있음, 0이면 방 전체 히스토리)
+  floor 키가 없으면(만료/미적재) 버퍼를 신뢰하지 않고 DB를 조회한 뒤 다시 적재
+- 버퍼로 판단할 수 없는 요청(floor 이전 커서, 미적재 방)은 (room_id, seq) 인덱스 범위 조회
+"""
+
+from typing import Optional, List, Dict, Any, Tuple
+import asyncio
+import json
+import logging
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.database import ChatRoom, Message, get_messages
+from app.services.cache import cache_service
+from app.services.message_archive import message_archiver, page_records
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "room:recent"
+
+
+def message_to_record(message: Message) -> Dict[str, Any]:
+    """DB 메시지를 outbox/버퍼와 같은 레코드 형식으로 변환"""
+    return {
+        'seq': message.seq,
+        'client_msg_id': message.client_msg_id,
+        'room_id': message.room_id,
+        'sender_type': message.sender_type,
+        'sender_id': message.sender_id,
+        'original_text': message.original_text,
+        'translated_text': message.translated_text,
+        'source_lang': message.source_lang,
+        'target_lang': message.target_lang,
+        'created_at': message.created_at.isoformat() if message.created_at else None,
+    }
+
+
+class RecentMessageBuffer:
+    """채팅방별 최근 메시지 링 버퍼"""
+
+    def __init__(self):
+        self.stats = {
+            'appends': 0,
+            'fills': 0,
+            'hits': 0,
+            'misses': 0,
+            'errors': 0,
+            # 히스토리 API 응답 출처 (older_pages: before 커서로 요청한 이전 페이지)
+            'history': {'cache': 0, 'db': 0, 'older_pages': 0, 'archive': 0},
+        }
+
+    def _key(self, room_id: str) -> str:
+        return f"{KEY_PREFIX}:{room_id}"
+
+    async def append(self, *records: Dict[str, Any]):
+        """새 메시지 추가 (최근 N개만 유지, TTL 갱신)"""
+        client = cache_service.redis_client
+        if not client or not records:
+            return
+        size = settings.RECENT_MESSAGES_PER_ROOM
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for record in records:
+                    key = self._key(record['room_id'])
+                    pipe.zadd(key, {json.dumps(record, ensure_ascii=False): record['seq']})
+                    pipe.zremrangebyrank(key, 0, -(size + 1))
+                    pipe.expire(key, settings.RECENT_MESSAGES_TTL)
+                    pipe.expire(f"{key}:floor", settings.RECENT_MESSAGES_TTL)
+                await pipe.execute()
+            self.stats['appends'] += len(records)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Recent message append error: {str(e)}")
+
+    async def fill(self, room_id: str, records: List[Dict[str, Any]], complete: bool):
+        """
+        DB에서 읽은 최근 메시지로 버퍼 적재
+
+        Args:
+            records: 최근 메시지 (오래된 순)
+            complete: 방 전체 히스토리이면 True (floor = 0)
+        """
+        client = cache_service.redis_client
+        if not client:
+            return
+        key = self._key(room_id)
+        floor = 0 if complete or not records else records[0]['seq'] - 1
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                if records:
+                    pipe.zadd(key, {
+                        json.dumps(record, ensure_ascii=False): record['seq'] for record in records
+                    })
+                    pipe.zremrangebyrank(key, 0, -(settings.RECENT_MESSAGES_PER_ROOM + 1))
+                    pipe.expire(key, settings.RECENT_MESSAGES_TTL)
+                pipe.set(f"{key}:floor", floor, ex=settings.RECENT_MESSAGES_TTL)
+                await pipe.execute()
+            self.stats['fills'] += 1
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Recent message fill error ({room_id}): {str(e)}")
+
+    async def since(
+        self,
+        cursors: Dict[str, Optional[int]],
+        limit: int
+    ) -> Dict[str, Optional[Tuple[List[Dict[str, Any]], bool]]]:
+        """
+        여러 방의 커서 이후 메시지를 파이프라인 한 번으로 조회
+
+        Args:
+            cursors: {room_id: 마지막으로 받은 seq (None이면 최근 limit개)}
+            limit: 방별 최대 메시지 수
+
+        Returns:
+            {room_id: (메시지 목록(오래된 순), 더 있음 여부) 또는 None(버퍼로 판단 불가 → DB)}
+        """
+        client = cache_service.redis_client
+        results: Dict[str, Optional[Tuple[List[Dict[str, Any]], bool]]] = dict.fromkeys(cursors)
+        if not client or not cursors:
+            self.stats['misses'] += len(cursors)
+            return results
+
+        rooms = list(cursors)
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for room_id in rooms:
+                    key = self._key(room_id)
+                    after = cursors[room_id]
+                    pipe.get(f"{key}:floor")
+                    pipe.zcard(key)
+                    pipe.zrange(key, 0, 0, withscores=True)
+                    if after is None:
+                        pipe.zrange(key, -(limit + 1), -1)
+                    else:
+                        pipe.zrangebyscore(key, f"({after}", "+inf", start=0, num=limit + 1)
+                replies = await pipe.execute()
+        except Exception as e:
+            self.stats['errors'] += 1
+            self.stats['misses'] += len(rooms)
+            logger.error(f"Recent message read error: {str(e)}")
+            return results
+
+        for index, room_id in enumerate(rooms):
+            floor, count, oldest, members = replies[index * 4:index * 4 + 4]
+            after = cursors[room_id]
+            if floor is None:
+                self.stats['misses'] += 1
+                continue
+            # 버퍼가 가득 찼으면 잘려나간 메시지가 있을 수 있으므로 가장 오래된 항목 직전까지만 보장
+            floor = int(floor)
+            if count >= settings.RECENT_MESSAGES_PER_ROOM and oldest:
+                floor = max(floor, int(oldest[0][1]) - 1)
+
+            messages = [json.loads(member) for member in members]
+            if after is None:
+                has_more = len(messages) > limit
+                messages = messages[-limit:]
+                # 최근 limit개보다 적게 남았는데 floor 이전 메시지가 있으면 버퍼만으로 부족
+                if not has_more and floor > 0:
+                    self.stats['misses'] += 1
+                    continue
+                has_more = has_more or floor > 0
+            else:
+                if after < floor:
+                    self.stats['misses'] += 1
+                    continue
+                has_more = len(messages) > limit
+                messages = messages[:limit]
+
+            self.stats['hits'] += 1
+            results[room_id] = (messages, has_more)
+        return results
+
+    def record_history(self, source: str):
+        """히스토리 API 응답 출처 기록"""
+        self.stats['history'][source] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'size_per_room': settings.RECENT_MESSAGES_PER_ROOM,
+            'hit_rate': round(self.stats['hits'] / lookups * 100, 2) if lookups else 0.0,
+        }
+
+
+def _load_from_db(
+    cursors: Dict[str, Optional[int]],
+    limit: int
+) -> Dict[str, Tuple[List[Dict[str, Any]], bool, List[Dict[str, Any]], bool]]:
+    """
+    버퍼 미스 방들을 DB에서 조회 (방별 인덱스 범위 조회, 세션 하나)
+
+    Returns:
+        {room_id: (응답 메시지, 더 있음 여부, 버퍼 적재용 최근 메시지, 전체 히스토리 여부)}
+    """
+    size = settings.RECENT_MESSAGES_PER_ROOM
+    loaded = {}
+    db = SessionLocal()
+    try:
+        for room_id, after in cursors.items():
+            recent = db.query(Message)\
+                .filter(Message.room_id == room_id)\
+                .order_by(Message.seq.desc())\
+                .limit(size + 1)\
+                .all()
+            complete = len(recent) <= size
+            recent = [message_to_record(message) for message in reversed(recent[:size])]
+
+            if not recent:
+                # 보관된 방은 보관 파일에서 (버퍼에 적재되므로 이후 요청은 Redis에서 응답)
+                room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
+                if room is not None and room.archived_at:
+                    archived = message_archiver.read_room(room)
+                    recent = archived[-size:]
+                    complete = len(archived) <= size
+                    messages = page_records(archived, limit + 1, after=after)
+                    has_more = len(messages) > limit
+                    messages = messages[:limit] if after is not None else messages[-limit:]
+                    loaded[room_id] = (messages, has_more, recent, complete)
+                    continue
+
+            if after is None:
+                messages = recent[-limit:]
+                has_more = len(recent) > limit or not complete
+            elif complete or after >= recent[0]['seq'] - 1:
+                # 최근 메시지 범위 안의 커서는 추가 조회 없이 처리
+                newer = [record for record in recent if record['seq'] > after]
+                has_more = len(newer) > limit
+                messages = newer[:limit]
+            else:
+                rows = get_messages(db, room_id, limit=limit + 1, after=after)
+                has_more = len(rows) > limit
+                messages = [message_to_record(message) for message in rows[:limit]]
+            loaded[room_id] = (messages, has_more, recent, complete)
+    finally:
+        db.close()
+    return loaded
+
+
+async def sync_rooms(
+    cursors: Dict[str, Optional[int]],
+    limit: int = None,
+    use_buffer: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    여러 방의 커서 이후 메시지 (재접속 이어받기)
+
+    버퍼에서 판단 가능한 방은 Redis만으로 응답하고, 나머지는 DB 조회 후 버퍼를 다시 적재합니다.
+
+    Args:
+        use_buffer: False면 버퍼 조회 없이 DB 조회 + 버퍼 적재 (호출 측에서 이미 미스를 확인한 경우)
+
+    Returns:
+        [{'room_id', 'messages', 'cursor', 'has_more', 'source'}] (요청 순서)
+    """
+    limit = min(limit or settings.SYNC_MAX_MESSAGES_PER_ROOM, settings.SYNC_MAX_MESSAGES_PER_ROOM)
+    buffered = await recent_messages.since(cursors, limit) if use_buffer else dict.fromkeys(cursors)
+
+    missed = {room_id: cursors[room_id] for room_id, result in buffered.items() if result is None}
+    loaded = await asyncio.to_thread(_load_from_db, missed, limit) if missed else {}
+    for room_id, (_, _, recent, complete) in loaded.items():
+        await recent_messages.fill(room_id, recent, complete)
+
+    results = []
+    for room_id, after in cursors.items():
+        if room_id in loaded:
+            messages, has_more = loaded[room_id][:2]
+            source = 'db'
+        else:
+            messages, has_more = buffered[room_id]
+            source = 'cache'
+        results.append({
+            'room_id': room_id,
+            'messages': messages,
+            'cursor': messages[-1]['seq'] if messages else after,
+            'has_more': has_more,
+            'source': source,
+        })
+    return results
+
+
+# 싱글톤 인스턴스
+recent_messages = RecentMessageBuffer()
@@ -0,0 +1,254 @@
+"""
+상담사 대시보드 채팅방 상태 뷰 (메모리, 변경 시 갱신)
+
+상담사 화면은 5초마다 /api/chat/agent/rooms를 호출하고, 호출마다 배정된 방 + 대기 방
+두 쿼리가 실행됩니다. 진행 중인(waiting/active) 방 상태를 메모리에 유지하고
+채팅방 생성/배정/종료와 소켓 입장/퇴장 시점에 해당 방만 갱신해 DB 조회 없이 응답합니다.
+
+- 상담사별 방 목록: agent_id → room_id 집합 (조회 비용은 해당 상담사의 방 수에 비례)
+- 대기 방: 생성 순서 유지, 최근 WAITING_LIMIT개만 응답
+- 변경 내역(delta)은 Socket.IO로 전송 ('room_state' 이벤트)
+  - agent:{agent_id}: 해당 상담사에게 배정된 방의 변경
+  - agents:waiting: 미배정 대기 방의 추가/제거 (모든 상담사)
+  상담사는 'subscribe_agent_rooms'로 구독하고 전체 목록(snapshot)을 한 번 받은 뒤 delta만 적용합니다.
+- 첫 조회 시 DB에서 한 번 적재하고, 다른 인스턴스에서 변경된 방을 반영하기 위해
+  ROOM_STATE_RESYNC_SECONDS마다 다시 적재합니다.
+  (DB 조회 중 이 인스턴스에서 변경된 방은 조회 결과 대신 메모리 값을 유지)
+"""
+
+from datetime import datetime
+from itertools import islice
+from typing import Optional, List, Dict, Any, Set, Callable, Awaitable
+import asyncio
+import logging
+import time
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.database import ChatRoom
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = ('waiting', 'active')
+WAITING_LIMIT = 10
+WAITING_CHANNEL = "agents:waiting"
+
+
+def agent_channel(agent_id: str) -> str:
+    """상담사별 delta 수신 Socket.IO 룸"""
+    return f"agent:{agent_id}"
+
+
+def room_to_state(room: ChatRoom) -> Dict[str, Any]:
+    """ChatRoom → 뷰 항목 (ChatRoomResponse 필드 + 접속 상태)"""
+    return {
+        'id': room.id,
+        'customer_language': room.customer_language,
+        'agent_id': room.agent_id,
+        'status': room.status,
+        'created_at': room.created_at,
+        'ended_at': room.ended_at,
+        'customer_online': False,
+        'agent_online': False,
+    }
+
+
+def _channel(state: Dict[str, Any]) -> Optional[str]:
+    """방 상태를 받아볼 Socket.IO 룸 (배정 방 → 상담사, 미배정 대기 방 → 전체 상담사)"""
+    if state['agent_id']:
+        return agent_channel(state['agent_id'])
+    if state['status'] == 'waiting':
+        return WAITING_CHANNEL
+    return None
+
+
+def _serialize(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **state,
+        'created_at': state['created_at'].isoformat() if state['created_at'] else None,
+        'ended_at': state['ended_at'].isoformat() if state['ended_at'] else None,
+    }
+
+
+class RoomStateView:
+    """진행 중인 채팅방 상태 + 상담사별 인덱스"""
+
+    def __init__(self):
+        self._rooms: Dict[str, Dict[str, Any]] = {}
+        self._by_agent: Dict[str, Set[str]] = {}
+        self._waiting: Dict[str, None] = {}  # 미배정 대기 방 (생성 순서)
+        self._loaded_at: Optional[float] = None
+        # DB 적재 중 upsert/set_presence로 바뀐 방 (적재 결과보다 메모리 값 우선)
+        self._touched: Optional[Set[str]] = None
+        self._load_lock = asyncio.Lock()
+        self._notifier: Optional[Callable[..., Awaitable[Any]]] = None
+        self.version = 0
+        self.stats = {
+            'reads': 0,
+            'loads': 0,
+            'updates': 0,
+            'deltas_sent': 0,
+        }
+
+    def set_notifier(self, emit: Callable[..., Awaitable[Any]]):
+        """delta 전송 함수 등록 (sio.emit)"""
+        self._notifier = emit
+
+    async def ensure_loaded(self):
+        """미적재 또는 재동기화 주기가 지났으면 DB에서 다시 적재"""
+        if self._loaded_at is not None and \
+                time.monotonic() - self._loaded_at < settings.ROOM_STATE_RESYNC_SECONDS:
+            return
+        async with self._load_lock:
+            if self._loaded_at is not None and \
+                    time.monotonic() - self._loaded_at < settings.ROOM_STATE_RESYNC_SECONDS:
+                return
+            self._touched = set()
+            try:
+                rooms = await asyncio.to_thread(self._load_from_db)
+            finally:
+                touched, self._touched = self._touched, None
+            live = dict(self._rooms)
+            self._rooms.clear()
+            self._by_agent.clear()
+            self._waiting.clear()
+            for state in rooms:
+                room_id = state['id']
+                if room_id in touched:
+                    # 조회 중 변경된 방: 조회 시점 값으로 덮어쓰지 않음 (종료된 방은 제외)
+                    state = live.get(room_id)
+                    if state is None:
+                        continue
+                elif room_id in live:
+                    # 접속 상태는 DB에 없으므로 이 인스턴스에서 알고 있던 값 유지
+                    state['customer_online'] = live[room_id]['customer_online']
+                    state['agent_online'] = live[room_id]['agent_online']
+                self._index(state)
+            # 조회 이후 생성/재개된 방 (생성 순서 유지)
+            added = [live[room_id] for room_id in touched if room_id in live and room_id not in self._rooms]
+            for state in sorted(added, key=lambda state: state['created_at'] or datetime.min):
+                self._index(state)
+            self._loaded_at = time.monotonic()
+            self.stats['loads'] += 1
+            logger.info(f"Room state view loaded: {len(self._rooms)} open rooms")
+
+    def _load_from_db(self) -> List[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            rooms = db.query(ChatRoom)\
+                .filter(ChatRoom.status.in_(OPEN_STATUSES))\
+                .order_by(ChatRoom.created_at.asc())\
+                .all()
+            return [room_to_state(room) for room in rooms]
+        finally:
+            db.close()
+
+    def _index(self, state: Dict[str, Any]):
+        room_id = state['id']
+        self._rooms[room_id] = state
+        if state['agent_id']:
+            self._by_agent.setdefault(state['agent_id'], set()).add(room_id)
+        elif state['status'] == 'waiting':
+            self._waiting[room_id] = None
+
+    def _unindex(self, room_id: str) -> Optional[Dict[str, Any]]:
+        state = self._rooms.pop(room_id, None)
+        if state is None:
+            return None
+        self._waiting.pop(room_id, None)
+        agent_id = state['agent_id']
+        if agent_id and agent_id in self._by_agent:
+            self._by_agent[agent_id].discard(room_id)
+            if not self._by_agent[agent_id]:
+                del self._by_agent[agent_id]
+        return state
+
+    def get_agent_rooms(self, agent_id: str, include_waiting: bool = True) -> List[Dict[str, Any]]:
+        """
+        상담사에게 배정된 진행 중인 방(최신순) + 미배정 대기 방(최신 WAITING_LIMIT개)
+
+        ensure_loaded() 이후 호출
+        """
+        self.stats['reads'] += 1
+        assigned = sorted(
+            (self._rooms[room_id] for room_id in self._by_agent.get(agent_id, ())),
+            key=lambda state: state['created_at'] or datetime.min,
+            reverse=True
+        )
+        if not include_waiting:
+            return assigned
+        waiting = [self._rooms[room_id] for room_id in islice(reversed(self._waiting), WAITING_LIMIT)]
+        return assigned + waiting
+
+    async def upsert(self, room: ChatRoom):
+        """채팅방 생성/배정/종료 커밋 후 호출 (종료된 방은 뷰에서 제거)"""
+        previous = self._unindex(room.id)
+        state = room_to_state(room)
+        if previous:
+            state['customer_online'] = previous['customer_online']
+            state['agent_online'] = previous['agent_online']
+        if state['status'] in OPEN_STATUSES:
+            self._index(state)
+        self._touch(room.id)
+        self.stats['updates'] += 1
+        await self._publish(state, previous)
+
+    async def set_presence(self, room_id: str, user_type: str, online: bool):
+        """소켓 입장/퇴장 시 접속 상태 갱신"""
+        state = self._rooms.get(room_id)
+        field = 'customer_online' if user_type == 'customer' else 'agent_online'
+        if state is None or state[field] == online:
+            return
+        state[field] = online
+        self._touch(room_id)
+        self.stats['updates'] += 1
+        await self._publish(state, state)
+
+    def _touch(self, room_id: str):
+        if self._touched is not None:
+            self._touched.add(room_id)
+
+    async def _publish(self, state: Dict[str, Any], previous: Optional[Dict[str, Any]]):
+        """
+        변경된 방을 볼 수 있는 상담사들에게 delta 전송
+
+        채널마다 방이 계속 보이면 'upsert', 더 이상 보이지 않으면(배정/종료) 'remove'
+        """
+        self.version += 1
+        if not self._notifier:
+            return
+        room = _serialize(state)
+        visible = _channel(state) if state['status'] in OPEN_STATUSES else None
+        channels = {_channel(item) for item in (previous, state) if item} - {None}
+        for channel in channels:
+            payload = {
+                'op': 'upsert' if channel == visible else 'remove',
+                'room': room,
+                'version': self.version,
+            }
+            try:
+                await self._notifier('room_state', payload, room=channel)
+                self.stats['deltas_sent'] += 1
+            except Exception as e:
+                logger.error(f"Room state delta error ({channel}): {str(e)}")
+
+    def snapshot(self, agent_id: str) -> Dict[str, Any]:
+        """구독 시 전체 목록 (이후 version보다 큰 delta만 적용)"""
+        return {
+            'rooms': [_serialize(state) for state in self.get_agent_rooms(agent_id)],
+            'version': self.version,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'open_rooms': len(self._rooms),
+            'waiting_unassigned': len(self._waiting),
+            'agents': len(self._by_agent),
+            'version': self.version,
+            'loaded_seconds_ago': round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+        }
+
+
+# 싱글톤 인스턴스
+room_state = RoomStateView()
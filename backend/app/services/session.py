@@ -55,6 +55,11 @@ class SessionManager:
 
             del self.sid_to_room[sid]
 
+    async def update_customer_language(self, room_id: str, language: str):
+        """고객 언어 변경 (대화 중 언어 전환)"""
+        if room_id in self.sessions:
+            self.sessions[room_id]['customer_language'] = language
+
     async def get_session(self, room_id: str) -> Optional[dict]:
         """세션 정보 가져오기"""
         return self.sessions.get(room_id)
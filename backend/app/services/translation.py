@@ -3,19 +3,25 @@ Multi-Provider Translation Service
 Supports OpenAI, Claude, Google, DeepL, and Mock providers
 """
 
-from typing import Optional
-import hashlib
+from typing import Optional, List, Tuple, Dict, Any, AsyncIterator
 import logging
+import time
 import asyncio
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from app.services.cache import cache_service
+from app.services.translation_cache import translation_cache
+from app.services.model_router import ModelRouter, ROUTE_GLOSSARY
+from app.services.langdetect import language_detector
+from app.services.passthrough import passthrough_filter
 from app.config import settings
 from app.services.providers import (
     BaseTranslationProvider,
     OpenAIProvider,
     ClaudeProvider,
     MockProvider,
+    ProviderPool,
+    LocalProvider,
 )
 
 logger = logging.getLogger(__name__)
@@ -26,7 +32,7 @@ class TranslationService:
     멀티 프로바이더 번역 서비스
 
     환경 변수로 번역 프로바이더를 선택할 수 있습니다:
-    - TRANSLATION_PROVIDER: 'openai', 'claude', 'google', 'deepl', 'mock'
+    - TRANSLATION_PROVIDER: 'openai', 'claude', 'local', 'google', 'deepl', 'mock'
     - OPENAI_API_KEY: OpenAI API 키
     - ANTHROPIC_API_KEY: Claude API 키
     - OPENAI_MODEL: OpenAI 모델 (기본: gpt-3.5-turbo)
@@ -35,6 +41,8 @@ class TranslationService:
     def __init__(self):
         self.medical_glossary = self._load_glossary()
         self.provider: Optional[BaseTranslationProvider] = None
+        # 프로바이더 동시 호출 제한 (rate limit 보호)
+        self._provider_slots = asyncio.Semaphore(settings.TRANSLATION_MAX_CONCURRENCY)
         self._init_provider()
 
     def _load_glossary(self):
@@ -62,6 +70,8 @@ class TranslationService:
             self.provider = self._init_openai()
         elif provider_name == 'claude':
             self.provider = self._init_claude()
+        elif provider_name == 'local':
+            self.provider = self._init_local()
         elif provider_name == 'mock':
             self.provider = MockProvider(self.medical_glossary)
         else:
@@ -75,62 +85,145 @@ class TranslationService:
 
         logger.info(f"Translation provider ready: {self.provider.name}")
 
-    def _init_openai(self) -> Optional[OpenAIProvider]:
-        """OpenAI 프로바이더 초기화"""
+        # 복잡도 기반 라우팅 (짧고 단순한 메시지 → 빠른 모델)
+        fast_provider = None
+        if settings.ROUTING_ENABLED:
+            if provider_name == 'openai' and settings.OPENAI_FAST_MODEL:
+                fast_provider = self._init_openai([settings.OPENAI_FAST_MODEL])
+            elif provider_name == 'claude' and settings.CLAUDE_FAST_MODEL:
+                fast_provider = self._init_claude([settings.CLAUDE_FAST_MODEL])
+            if fast_provider:
+                logger.info(f"Fast route provider ready: {fast_provider.name}")
+        self.router = ModelRouter(self.provider, fast_provider, self.medical_glossary)
+
+        # 장애 시 순서대로 시도할 프로바이더 (예: ['local'] - 회선 단절 시 오프라인 번역)
+        self.fallback_providers: List[BaseTranslationProvider] = []
+        for fallback_name in settings.TRANSLATION_FALLBACK_CHAIN:
+            fallback_name = fallback_name.lower()
+            if fallback_name == provider_name:
+                continue
+            init = {
+                'openai': self._init_openai,
+                'claude': self._init_claude,
+                'local': self._init_local,
+            }.get(fallback_name)
+            fallback = init() if init else None
+            if fallback is not None and fallback.is_available():
+                self.fallback_providers.append(fallback)
+                logger.info(f"Fallback provider ready: {fallback.name}")
+            else:
+                logger.warning(f"Fallback provider '{fallback_name}' not available")
+
+    def _init_openai(self, models: Optional[List[str]] = None) -> Optional[BaseTranslationProvider]:
+        """OpenAI 프로바이더 초기화 (키/모델이 여러 개면 풀 구성)"""
         try:
-            api_key = getattr(settings, 'OPENAI_API_KEY', None)
-            if not api_key or api_key == "your-api-key-here":
+            api_keys = self._configured_keys(
+                getattr(settings, 'OPENAI_API_KEY', None), settings.OPENAI_API_KEYS
+            )
+            if not api_keys:
                 logger.warning("OpenAI API key not configured")
                 return None
 
-            model = getattr(settings, 'OPENAI_MODEL', 'gpt-3.5-turbo')
+            models = models or list(dict.fromkeys(
+                [getattr(settings, 'OPENAI_MODEL', 'gpt-3.5-turbo')] + settings.OPENAI_MODELS
+            ))
             temperature = getattr(settings, 'OPENAI_TEMPERATURE', 0.3)
-
-            provider = OpenAIProvider(
-                api_key=api_key,
-                medical_glossary=self.medical_glossary,
-                model=model,
-                temperature=temperature
-            )
-
-            if provider.is_available():
-                return provider
-            return None
+            pooled = len(api_keys) * len(models) > 1
+
+            return self._build_provider([
+                OpenAIProvider(
+                    api_key=api_key,
+                    medical_glossary=self.medical_glossary,
+                    model=model,
+                    temperature=temperature,
+                    max_retries=0 if pooled else 2
+                )
+                for api_key in api_keys
+                for model in models
+            ])
 
         except Exception as e:
             logger.error(f"Failed to initialize OpenAI provider: {e}")
             return None
 
-    def _init_claude(self) -> Optional[ClaudeProvider]:
-        """Claude 프로바이더 초기화"""
+    def _init_claude(self, models: Optional[List[str]] = None) -> Optional[BaseTranslationProvider]:
+        """Claude 프로바이더 초기화 (키/모델이 여러 개면 풀 구성)"""
         try:
-            api_key = getattr(settings, 'ANTHROPIC_API_KEY', None)
-            if not api_key or api_key == "your-api-key-here":
+            api_keys = self._configured_keys(
+                getattr(settings, 'ANTHROPIC_API_KEY', None), settings.ANTHROPIC_API_KEYS
+            )
+            if not api_keys:
                 logger.warning("Anthropic API key not configured")
                 return None
 
-            model = getattr(settings, 'CLAUDE_MODEL', 'claude-sonnet-4-5-20250929')
+            models = models or list(dict.fromkeys(
+                [getattr(settings, 'CLAUDE_MODEL', 'claude-sonnet-4-5-20250929')] + settings.CLAUDE_MODELS
+            ))
+            pooled = len(api_keys) * len(models) > 1
+
+            return self._build_provider([
+                ClaudeProvider(
+                    api_key=api_key,
+                    medical_glossary=self.medical_glossary,
+                    model=model,
+                    max_retries=0 if pooled else 2
+                )
+                for api_key in api_keys
+                for model in models
+            ])
+
+        except Exception as e:
+            logger.error(f"Failed to initialize Claude provider: {e}")
+            return None
 
-            provider = ClaudeProvider(
-                api_key=api_key,
+    def _init_local(self) -> Optional[LocalProvider]:
+        """로컬 오프라인 프로바이더 초기화 (CTranslate2 모델)"""
+        try:
+            provider = LocalProvider(
+                model_dir=settings.LOCAL_MODEL_DIR,
                 medical_glossary=self.medical_glossary,
-                model=model
+                compute_type=settings.LOCAL_COMPUTE_TYPE,
+                workers=settings.LOCAL_WORKERS,
+                threads_per_worker=settings.LOCAL_THREADS_PER_WORKER,
+                max_batch=settings.LOCAL_MAX_BATCH,
+                batch_wait_ms=settings.LOCAL_BATCH_WAIT_MS,
+                beam_size=settings.LOCAL_BEAM_SIZE,
+                pivot_lang=settings.LOCAL_PIVOT_LANG
             )
 
             if provider.is_available():
                 return provider
+            logger.warning(f"Local models not found in {settings.LOCAL_MODEL_DIR} (or ctranslate2 not installed)")
             return None
 
         except Exception as e:
-            logger.error(f"Failed to initialize Claude provider: {e}")
+            logger.error(f"Failed to initialize local provider: {e}")
             return None
 
+    def _configured_keys(self, primary: Optional[str], extra: List[str]) -> List[str]:
+        """기본 키 + 추가 키 (미설정 값 제외, 중복 제거)"""
+        return [
+            key for key in dict.fromkeys([primary] + list(extra))
+            if key and key != "your-api-key-here"
+        ]
+
+    def _build_provider(self, members: List[BaseTranslationProvider]) -> Optional[BaseTranslationProvider]:
+        """사용 가능한 멤버가 하나면 그대로, 여러 개면 ProviderPool로 묶음"""
+        members = [member for member in members if member.is_available()]
+        if not members:
+            return None
+        if len(members) == 1:
+            return members[0]
+        logger.info(f"Provider pool: {members[0].name} x {len(members)} (keys x models)")
+        return ProviderPool(members)
+
     async def translate(
         self,
         text: str,
         source_lang: str,
         target_lang: str,
-        context: str = 'medical'
+        context: str = 'medical',
+        detect_source: bool = True
     ) -> str:
         """
         AI 번역 (캐싱 포함, 에러 핸들링, Retry)
@@ -140,32 +233,66 @@ class TranslationService:
             source_lang: 소스 언어 코드
             target_lang: 타겟 언어 코드
             context: 컨텍스트 ('medical', 'general')
+            detect_source: 원문 언어 감지로 source_lang 보정 (호출 측에서 이미 보정했으면 False)
 
         Returns:
             번역된 텍스트
         """
-        # 1. 캐시 확인
-        cache_key = self._get_cache_key(text, source_lang, target_lang)
+        # 번역할 내용이 없으면 (이모지/숫자/URL만) 원문 그대로, 나머지는 해당 부분 마스킹
+        masked = passthrough_filter.mask(text)
+        skip_reason = passthrough_filter.skip_reason(masked)
+        if skip_reason:
+            passthrough_filter.record_skip(skip_reason)
+            return text
+
+        # 원문 언어 검증 (캐시 키 계산 전), 이미 대상 언어면 번역 불필요
+        if detect_source:
+            source_lang = language_detector.resolve(text, source_lang)
+        if source_lang == target_lang:
+            language_detector.record_same_language_skip()
+            passthrough_filter.record_skip('same_language')
+            return text
+
+        # 0. 경로 선택 (용어집 단어는 프로바이더/캐시 없이 바로 반환)
+        route, provider = self.router.select(masked.text, source_lang, target_lang)
+        self.router.record_decision(route)
+        if route == ROUTE_GLOSSARY:
+            return self.router.lookup_glossary(masked.text, source_lang, target_lang)
+
+        # 1. 캐시 확인 (마스킹된 원문/번역문 기준)
+        cache_key = await self._get_cache_key(masked.text, source_lang, target_lang, provider)
         cached = await cache_service.get(cache_key)
         if cached:
-            logger.info(f"Cache hit for: {text[:30]}...")
-            return cached
+            restored = masked.restore(cached)
+            if restored is not None:
+                logger.info(f"Cache hit for: {text[:30]}...")
+                return restored
 
         # 2. AI 번역 (Retry 포함)
         try:
-            translated = await self._translate_with_retry(
-                text, source_lang, target_lang, context
+            translated = await self._translate_routed(
+                route, provider, masked.text, source_lang, target_lang, context
+            )
+            restored = masked.restore(translated)
+            if restored is None:
+                passthrough_filter.record_restore_failure()
+                logger.warning(f"Placeholders not preserved, retranslating unmasked: {text[:30]}...")
+                return await self.translate_uncached(text, source_lang, target_lang, context)
+
+            # 3. 캐시 저장 (30일, 언어쌍/프로바이더/용어집 인덱스 등록)
+            await cache_service.set_indexed(
+                cache_key,
+                translated,
+                expire=settings.TRANSLATION_CACHE_TTL,
+                indexes=translation_cache.index_keys(provider, source_lang, target_lang)
             )
 
-            # 3. 캐시 저장 (30일)
-            await cache_service.set(cache_key, translated, expire=2592000)
-
-            return translated
+            return restored
 
         except Exception as e:
             logger.error(f"Translation failed after retries: {str(e)}")
-            # Fallback: Mock 번역 반환
-            return self._get_fallback_translation(text, source_lang, target_lang)
+            # Fallback: 대체 프로바이더 → Mock 번역 반환
+            return await self._translate_fallback(text, source_lang, target_lang, context)
 
     @retry(
         stop=stop_after_attempt(3),
@@ -177,21 +304,398 @@ class TranslationService:
         text: str,
         source_lang: str,
         target_lang: str,
-        context: str
+        context: str,
+        provider: Optional[BaseTranslationProvider] = None
     ) -> str:
         """Retry 로직이 포함된 번역"""
-        if self.provider is None:
+        provider = provider or self.provider
+        if provider is None:
+            raise ValueError("Translation provider not initialized")
+
+        async with self._provider_slots:
+            return await provider.translate(text, source_lang, target_lang, context)
+
+    async def _translate_routed(
+        self,
+        route: str,
+        provider: BaseTranslationProvider,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        context: str
+    ) -> str:
+        """선택된 경로의 프로바이더로 번역하고 경로별 지연 시간 기록"""
+        started = time.monotonic()
+        try:
+            translated = await self._translate_with_retry(
+                text, source_lang, target_lang, context, provider
+            )
+        except Exception:
+            self.router.record_call(route, (time.monotonic() - started) * 1000, error=True)
+            raise
+        self.router.record_call(route, (time.monotonic() - started) * 1000)
+        return translated
+
+    async def _get_cache_key(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        provider: Optional[BaseTranslationProvider] = None
+    ) -> str:
+        """캐시 키 생성 (네임스페이스 버전/프로바이더/모델/용어집 버전 포함, 기본: 라우팅된 프로바이더)"""
+        if provider is None:
+            provider = self.router.select(text, source_lang, target_lang)[1]
+        version = await translation_cache.current_version()
+        return translation_cache.build_key(
+            version, provider, text, source_lang, target_lang
+        )
+
+    async def translate_many_targets(
+        self,
+        text: str,
+        source_lang: str,
+        target_langs: List[str],
+        context: str = 'medical'
+    ) -> Dict[str, str]:
+        """
+        하나의 메시지를 여러 언어로 번역 (그룹/공지 브로드캐스트용)
+
+        1. 모든 타겟 언어 캐시를 mget 한 번으로 조회
+        2. 미스 언어만 모아 프로바이더 요청 한 번으로 번역
+        3. 타겟별로 캐시 저장
+
+        Returns:
+            {타겟 언어 코드: 번역문}
+        """
+        targets = list(dict.fromkeys(target_langs))
+        masked = passthrough_filter.mask(text)
+        skip_reason = passthrough_filter.skip_reason(masked)
+        if skip_reason:
+            passthrough_filter.record_skip(skip_reason)
+            return {target_lang: text for target_lang in targets}
+
+        source_lang = language_detector.resolve(text, source_lang)
+        results: Dict[str, str] = {
+            target_lang: text for target_lang in targets if target_lang == source_lang
+        }
+        targets = [target_lang for target_lang in targets if target_lang != source_lang]
+        if not targets:
+            return results
+
+        # 용어집 단어는 바로 해결, 나머지는 한 경로로 묶어 요청 한 번
+        for target_lang in list(targets):
+            term = self.router.lookup_glossary(masked.text, source_lang, target_lang) if self.router.enabled else None
+            if term is not None:
+                results[target_lang] = term
+                targets.remove(target_lang)
+        if not targets:
+            return results
+        route, provider = self.router.select_multi(masked.text, source_lang, targets)
+        self.router.record_decision(route)
+
+        lookups = await self.lookup_cache([(text, source_lang, t) for t in targets], provider)
+        missing: Dict[str, str] = {}
+        for target_lang, (cache_key, cached) in zip(targets, lookups):
+            if cached is not None:
+                results[target_lang] = cached
+            else:
+                missing[target_lang] = cache_key
+
+        if not missing:
+            return results
+
+        started = time.monotonic()
+        try:
+            translated = await self._translate_multi_with_retry(
+                masked.text, source_lang, list(missing), context, provider
+            )
+        except Exception as e:
+            self.router.record_call(route, (time.monotonic() - started) * 1000, error=True)
+            logger.error(f"Multi-target translation failed after retries: {str(e)}")
+            for target_lang in missing:
+                results[target_lang] = await self._translate_fallback(text, source_lang, target_lang, context)
+            return results
+        self.router.record_call(route, (time.monotonic() - started) * 1000)
+
+        to_store = []
+        for target_lang, value in translated.items():
+            if target_lang not in missing:
+                continue
+            restored = masked.restore(value)
+            if restored is None:
+                # 자리표시자가 보존되지 않은 언어만 원문으로 다시 번역 (캐시하지 않음)
+                # 실패해도 다른 언어 결과/캐시 저장에 영향 없도록 해당 언어만 대체 경로로
+                passthrough_filter.record_restore_failure()
+                try:
+                    restored = await self.translate_uncached(text, source_lang, target_lang, context)
+                except Exception as e:
+                    logger.error(f"Unmasked retranslation failed ({source_lang}->{target_lang}): {str(e)}")
+                    restored = await self._translate_fallback(text, source_lang, target_lang, context)
+            else:
+                to_store.append((missing[target_lang], text, source_lang, target_lang, value))
+            results[target_lang] = restored
+        await self.store_cache(to_store, provider)
+
+        return results
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type((asyncio.TimeoutError, ConnectionError))
+    )
+    async def _translate_multi_with_retry(
+        self,
+        text: str,
+        source_lang: str,
+        target_langs: List[str],
+        context: str,
+        provider: Optional[BaseTranslationProvider] = None
+    ) -> Dict[str, str]:
+        """Retry 로직이 포함된 다국어 번역"""
+        provider = provider or self.provider
+        if provider is None:
             raise ValueError("Translation provider not initialized")
 
-        return await self.provider.translate(text, source_lang, target_lang, context)
+        async with self._provider_slots:
+            return await provider.translate_multi(text, source_lang, target_langs, context)
+
+    async def lookup_cache(
+        self,
+        items: List[Tuple[str, str, str]],
+        provider: Optional[BaseTranslationProvider] = None
+    ) -> List[Tuple[str, Optional[str]]]:
+        """
+        여러 번역의 캐시를 한 번의 mget으로 조회
+
+        translate()와 같이 마스킹된 원문으로 키를 만들고 캐시 값의 자리표시자를 복원하므로
+        채팅 메시지 번역과 같은 캐시 항목을 공유합니다.
+
+        Args:
+            items: (text, source_lang, target_lang) 목록 (마스킹 전 원문)
+            provider: 캐시 키 프로바이더 (기본: 항목별 라우팅 결과)
 
-    def _get_cache_key(self, text: str, source_lang: str, target_lang: str) -> str:
-        """캐시 키 생성"""
-        # 프로바이더 이름도 캐시 키에 포함 (프로바이더별로 다른 번역)
-        provider_name = self.provider.name if self.provider else "unknown"
-        content = f"{provider_name}:{text}:{source_lang}:{target_lang}"
-        hash_key = hashlib.md5(content.encode()).hexdigest()
-        return f"trans:{hash_key}"
+        Returns:
+            (cache_key, 복원된 캐시 번역 또는 None) 목록 (입력 순서 유지)
+        """
+        masked_items = [passthrough_filter.mask(text, track_stats=False) for text, _, _ in items]
+        keys = [
+            await self._get_cache_key(masked.text, source_lang, target_lang, provider)
+            for masked, (_, source_lang, target_lang) in zip(masked_items, items)
+        ]
+        values = await cache_service.mget(keys) if keys else []
+        return [
+            (key, masked.restore(value) if value else None)
+            for key, masked, value in zip(keys, masked_items, values)
+        ]
+
+    async def store_cache(
+        self,
+        entries: List[Tuple[str, str, str, str, str]],
+        provider: Optional[BaseTranslationProvider] = None
+    ):
+        """
+        번역 결과 일괄 캐시 저장 (mset + 인덱스 등록)
+
+        Args:
+            entries: (cache_key, text, source_lang, target_lang, translated) 목록
+                (cache_key는 lookup_cache 결과, text는 마스킹 전 원문,
+                translated는 자리표시자가 남아 있는 번역 - translate_for_cache 결과)
+            provider: 인덱스 프로바이더 (기본: 항목별 라우팅 결과)
+        """
+        if not entries:
+            return False
+        mapping = {key: translated for key, _, _, _, translated in entries}
+        indexes = {
+            key: translation_cache.index_keys(
+                provider or self.router.select(
+                    passthrough_filter.mask(text, track_stats=False).text, source_lang, target_lang
+                )[1],
+                source_lang, target_lang
+            )
+            for key, text, source_lang, target_lang, _ in entries
+        }
+        return await cache_service.mset(
+            mapping, expire=settings.TRANSLATION_CACHE_TTL, indexes=indexes
+        )
+
+    async def translate_uncached(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        context: str = 'medical'
+    ) -> str:
+        """
+        캐시/Fallback 없이 프로바이더로 직접 번역 (실패 시 예외)
+
+        캐시 워밍업처럼 실패한 결과를 캐시에 넣으면 안 되는 경우에 사용합니다.
+        """
+        route, provider = self.router.select(text, source_lang, target_lang)
+        self.router.record_decision(route)
+        if route == ROUTE_GLOSSARY:
+            return self.router.lookup_glossary(text, source_lang, target_lang)
+        return await self._translate_routed(
+            route, provider, text, source_lang, target_lang, context
+        )
+
+    async def translate_for_cache(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        context: str = 'medical'
+    ) -> Tuple[str, Optional[str]]:
+        """
+        translate_uncached + translate()와 같은 마스킹 → 복원 흐름 (일괄 번역/워밍업/문서용)
+
+        Returns:
+            (복원된 번역, store_cache에 넘길 번역 또는 None)
+            자리표시자가 보존되지 않아 원문으로 다시 번역한 결과는 캐시하지 않습니다 (None).
+        """
+        masked = passthrough_filter.mask(text, track_stats=False)
+        translated = await self.translate_uncached(masked.text, source_lang, target_lang, context)
+        restored = masked.restore(translated)
+        if restored is not None:
+            return restored, translated
+        passthrough_filter.record_restore_failure()
+        logger.warning(f"Placeholders not preserved, retranslating unmasked: {text[:30]}...")
+        return await self.translate_uncached(text, source_lang, target_lang, context), None
+
+    def is_untranslatable(self, text: str, track_stats: bool = True) -> bool:
+        """
+        번역할 내용이 없는 텍스트 (빈 문자열, 이모지/숫자/URL만 등)
+
+        track_stats=False: 채팅 메시지가 아닌 일괄 번역/워밍업/문서 항목 (통계의 "생략한 호출"에 넣지 않음)
+        """
+        if not text.strip():
+            reason = 'no_text'
+        else:
+            reason = passthrough_filter.skip_reason(passthrough_filter.mask(text, track_stats=track_stats))
+        if reason and track_stats:
+            passthrough_filter.record_skip(reason)
+        return reason is not None
+
+    async def translate_batch(
+        self,
+        texts: List[str],
+        source_lang: str,
+        target_langs: List[str],
+        context: str = 'medical'
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        여러 텍스트 × 여러 타겟 언어 일괄 번역 (완료 순서대로 yield)
+
+        1. 모든 (text, target) 조합을 mget 한 번으로 캐시 조회
+        2. 미스만 중복 제거 후 프로바이더 동시성 제한 하에 병렬 번역
+        3. 항목별 상태(cached / translated / skipped / error) 반환
+
+        Yields:
+            {'index', 'target_lang', 'status', 'translated_text', 'error', 'elapsed_ms'}
+        """
+        started = time.monotonic()
+        pairs = [
+            (index, text, target_lang)
+            for index, text in enumerate(texts)
+            for target_lang in dict.fromkeys(target_langs)
+        ]
+
+        def result(index: int, target_lang: str, status: str,
+                   translated: Optional[str] = None, error: Optional[str] = None):
+            return {
+                'index': index,
+                'target_lang': target_lang,
+                'status': status,
+                'translated_text': translated,
+                'error': error,
+                'elapsed_ms': round((time.monotonic() - started) * 1000, 2),
+            }
+
+        # 같은 언어, 번역할 내용이 없는 텍스트(이모지/숫자/URL만)는 번역 불필요
+        untranslatable = {text for text in set(texts) if self.is_untranslatable(text, track_stats=False)}
+        lookup_items: List[Tuple[str, str, str]] = []
+        for index, text, target_lang in pairs:
+            if target_lang == source_lang or text in untranslatable:
+                yield result(index, target_lang, 'skipped', text)
+            else:
+                lookup_items.append((text, source_lang, target_lang))
+
+        unique_items = list(dict.fromkeys(lookup_items))
+        lookups = dict(zip(unique_items, await self.lookup_cache(unique_items)))
+
+        # 미스 항목 → 해당 항목을 기다리는 (index, target) 목록
+        waiting: Dict[Tuple[str, str, str], List[int]] = {}
+        for index, text, target_lang in pairs:
+            item = (text, source_lang, target_lang)
+            if item not in lookups:
+                continue
+            _, cached = lookups[item]
+            if cached:
+                yield result(index, target_lang, 'cached', cached)
+            else:
+                waiting.setdefault(item, []).append(index)
+
+        async def translate_one(item: Tuple[str, str, str]):
+            try:
+                translated, cache_value = await self.translate_for_cache(*item, context=context)
+                return item, translated, cache_value, None
+            except Exception as e:
+                logger.error(f"Batch translation failed ({item[1]}->{item[2]}): {str(e)}")
+                return item, None, None, str(e)
+
+        tasks = [asyncio.create_task(translate_one(item)) for item in waiting]
+        to_store: List[Tuple[str, str, str, str]] = []
+        try:
+            for finished in asyncio.as_completed(tasks):
+                item, translated, cache_value, error = await finished
+                _, item_source, item_target = item
+                if cache_value is not None:
+                    to_store.append((lookups[item][0], item[0], item_source, item_target, cache_value))
+                for index in waiting[item]:
+                    if error is None:
+                        yield result(index, item_target, 'translated', translated)
+                    else:
+                        yield result(index, item_target, 'error', error=error)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await self.store_cache(to_store)
+
+    async def _translate_fallback(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        context: str = 'medical'
+    ) -> str:
+        """
+        대체 프로바이더 체인으로 번역 (모두 실패하면 Mock)
+
+        대체 번역은 캐시하지 않습니다. 기본 프로바이더가 복구되면 다시 번역됩니다.
+        """
+        for provider in self.fallback_providers:
+            if isinstance(provider, LocalProvider) and not provider.supports(source_lang, target_lang):
+                continue
+            try:
+                async with self._provider_slots:
+                    translated = await provider.translate(text, source_lang, target_lang, context)
+                logger.warning(f"Translated with fallback provider {provider.name}")
+                return translated
+            except Exception as e:
+                logger.error(f"Fallback provider {provider.name} failed: {str(e)}")
+        return self._get_fallback_translation(text, source_lang, target_lang)
+
+    async def warmup(self):
+        """로컬 모델 워커 프로세스 기동 및 모델 로드 (첫 오프라인 번역 지연 제거)"""
+        for provider in [self.provider] + self.fallback_providers:
+            if isinstance(provider, LocalProvider) and provider.is_available():
+                await provider.warmup()
+
+    async def close(self):
+        """프로바이더 리소스 정리 (로컬 모델 워커 프로세스)"""
+        for provider in [self.provider] + self.fallback_providers:
+            if isinstance(provider, LocalProvider):
+                provider.shutdown()
 
     def _get_fallback_translation(self, text: str, source_lang: str, target_lang: str) -> str:
         """Fallback 번역 (에러 발생 시)"""
@@ -215,7 +719,16 @@ class TranslationService:
         return {
             "provider": self.provider.name,
             "available": self.provider.is_available(),
-            "type": type(self.provider).__name__
+            "type": type(self.provider).__name__,
+            "prompt_cache": self.provider.get_prompt_cache_stats(),
+            "pool": self.provider.get_stats() if isinstance(self.provider, ProviderPool) else None,
+            "fast_provider": self.router.fast_provider.name if self.router.fast_provider else None,
+            "fallback_providers": [provider.name for provider in self.fallback_providers],
+            "local": next(
+                (provider.get_stats() for provider in [self.provider] + self.fallback_providers
+                 if isinstance(provider, LocalProvider)),
+                None
+            )
         }
 
 
@@ -0,0 +1,154 @@
+"""
+번역 캐시 키 네임스페이스
+
+키 형식:
+    trans:v{ns}:{provider}:{model}:g{glossary}:{src}-{tgt}:{md5}
+
+- ns: 전역 네임스페이스 버전 (Redis 카운터). 올리면 이전 키 전체가 O(1)로 무효화되고
+  TTL로 자연 소멸합니다.
+- provider/model/glossary/언어쌍: 보조 인덱스 ZSET(transmeta:idx:*, 점수 = 만료 시각)에도 등록되어
+  해당 단위만 SCAN 없이 무효화할 수 있습니다. 만료된 멤버는 쓰기/무효화 시 정리됩니다.
+
+버전 카운터와 인덱스는 trans:* purge에 지워지지 않도록 별도 접두사(transmeta:)를 씁니다.
+(버전 키가 지워지면 워커마다 다른 네임스페이스를 보게 되고 이전 네임스페이스가 다시 보일 수 있음)
+"""
+
+from typing import List, Optional, Dict, Any
+import hashlib
+import logging
+import re
+import time
+
+from app.config import settings
+from app.services.cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "trans"
+META_PREFIX = "transmeta"
+INDEX_PREFIX = f"{META_PREFIX}:idx"
+NAMESPACE_VERSION_KEY = f"{META_PREFIX}:ns:version"
+# 이전 위치의 버전 키 (남아 있으면 새 키 초기값에 반영)
+LEGACY_NAMESPACE_VERSION_KEY = f"{KEY_PREFIX}:ns:version"
+
+# 인덱스 종류 -> 키 구성 요소
+INDEX_KINDS = ('pair', 'provider', 'model', 'glossary')
+
+
+def _slug(value: str) -> str:
+    """키 구분자(:)와 glob 특수문자 제거"""
+    return re.sub(r'[^A-Za-z0-9._-]', '_', value or 'unknown').lower()
+
+
+class TranslationCacheNamespace:
+    """번역 캐시 키/인덱스 관리"""
+
+    def __init__(self):
+        # Redis에 버전 키가 없으면 0 (첫 bump에서 1이 되도록)
+        self.version = 0
+        self._refreshed_at = 0.0
+
+    async def current_version(self) -> int:
+        """
+        네임스페이스 버전 조회
+
+        다른 워커의 bump를 반영하기 위해 CACHE_NAMESPACE_REFRESH_SECONDS 주기로
+        Redis에서 다시 읽습니다.
+        """
+        now = time.monotonic()
+        if now - self._refreshed_at >= settings.CACHE_NAMESPACE_REFRESH_SECONDS:
+            self._refreshed_at = now
+            await self._refresh()
+        return self.version
+
+    async def _refresh(self):
+        """
+        Redis 버전을 읽어 반영 (버전은 줄어들지 않음)
+
+        키가 없으면 (Redis 초기화/수동 삭제) 이 워커가 알던 버전과 이전 위치 키 중 큰 값으로
+        다시 만들어 워커들이 같은 네임스페이스로 수렴하게 합니다.
+        """
+        client = cache_service.redis_client
+        if not client:
+            return
+        try:
+            value = await client.get(NAMESPACE_VERSION_KEY)
+            if value is None:
+                legacy = await client.get(LEGACY_NAMESPACE_VERSION_KEY)
+                seed = max(self.version, int(legacy or 0))
+                if seed:
+                    await client.set(NAMESPACE_VERSION_KEY, seed, nx=True)
+                    logger.warning(f"Translation cache namespace key missing, re-seeded with v{seed}")
+                value = await client.get(NAMESPACE_VERSION_KEY)
+            if value is not None:
+                self.version = max(self.version, int(value))
+        except Exception as e:
+            logger.error(f"Translation cache namespace refresh error: {str(e)}")
+
+    async def bump(self) -> int:
+        """네임스페이스 버전 증가 (전체 번역 캐시 O(1) 무효화)"""
+        # 키가 지워졌으면 먼저 다시 만들어 INCR이 이전 버전으로 돌아가지 않도록
+        await self._refresh()
+        value = await cache_service.incr(NAMESPACE_VERSION_KEY)
+        if value is None:
+            # Redis 미연결 시 이 워커만이라도 새 네임스페이스 사용
+            self.version += 1
+        else:
+            self.version = max(self.version + 1, int(value))
+        self._refreshed_at = time.monotonic()
+        logger.info(f"Translation cache namespace bumped to v{self.version}")
+        return self.version
+
+    def build_key(
+        self,
+        version: int,
+        provider,
+        text: str,
+        source_lang: str,
+        target_lang: str
+    ) -> str:
+        """번역 캐시 키 생성"""
+        provider_name = provider.name if provider else "unknown"
+        model = getattr(provider, 'model', 'default')
+        glossary_version = getattr(provider, 'glossary_version', 'none')
+        content = f"{provider_name}:{text}:{source_lang}:{target_lang}"
+        hash_key = hashlib.md5(content.encode()).hexdigest()
+        return (
+            f"{KEY_PREFIX}:v{version}:{_slug(provider_name)}:{_slug(model)}"
+            f":g{glossary_version}:{_slug(source_lang)}-{_slug(target_lang)}:{hash_key}"
+        )
+
+    def index_key(self, kind: str, value: str) -> str:
+        """보조 인덱스 ZSET 키"""
+        if kind not in INDEX_KINDS:
+            raise ValueError(f"Unknown cache index kind: {kind}")
+        return f"{INDEX_PREFIX}:{kind}:{_slug(value)}"
+
+    def index_keys(self, provider, source_lang: str, target_lang: str) -> List[str]:
+        """번역 결과가 등록될 인덱스 목록"""
+        provider_name = provider.name if provider else "unknown"
+        return [
+            self.index_key('pair', f"{source_lang}-{target_lang}"),
+            self.index_key('provider', provider_name),
+            self.index_key('model', getattr(provider, 'model', 'default')),
+            self.index_key('glossary', getattr(provider, 'glossary_version', 'none')),
+        ]
+
+    def invalidate_iter(self, kind: str, value: str, cancel_event=None):
+        """인덱스 단위 무효화 (async iterator, 진행 상황 yield)"""
+        return cache_service.purge_index_iter(
+            self.index_key(kind, value), cancel_event=cancel_event
+        )
+
+    async def get_info(self, provider=None) -> Dict[str, Any]:
+        """현재 네임스페이스 정보"""
+        return {
+            'version': await self.current_version(),
+            'provider': provider.name if provider else None,
+            'model': getattr(provider, 'model', None),
+            'glossary_version': getattr(provider, 'glossary_version', None),
+        }
+
+
+# 싱글톤 인스턴스
+translation_cache = TranslationCacheNamespace()
@@ -0,0 +1,135 @@
+"""
+타이핑 표시 이벤트 병합/제한
+
+클라이언트는 키 입력마다 'typing'/'stop_typing'을 보내므로 방이 많아지면 소켓 트래픽의
+상당 부분이 타이핑 이벤트가 됩니다. (방, 발신자)별 상태를 서버에서 유지해
+상태가 바뀔 때만 상대방에게 전달합니다.
+
+- typing: 이미 타이핑 중이면 TYPING_THROTTLE_SECONDS마다 한 번만 다시 전달 (상대방 표시 유지용)
+- stop_typing: 타이핑 중일 때만 전달 (중복 stop 무시)
+- TYPING_TIMEOUT_SECONDS 동안 typing이 없으면 자동으로 stop_typing 전달
+  (stop_typing 없이 탭을 닫거나 입력을 멈춘 경우)
+- 억제된 이벤트는 세션 조회/emit 없이 바로 버림
+"""
+
+from typing import Optional, Dict, Tuple, Set, Callable, Awaitable, Any
+import asyncio
+import logging
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _TypingState:
+    def __init__(self):
+        self.typing = False
+        self.last_forwarded = 0.0
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class TypingCoalescer:
+    """(방, 발신자)별 타이핑 상태 및 전달 여부 판단"""
+
+    def __init__(self):
+        self._states: Dict[Tuple[str, str], _TypingState] = {}
+        self._on_timeout: Optional[Callable[[str, str], Awaitable[Any]]] = None
+        # 실행 중인 자동 stop_typing 전송 태스크 (GC로 사라지지 않도록 참조 유지)
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {
+            'received_typing': 0,
+            'received_stop': 0,
+            'forwarded_typing': 0,
+            'forwarded_stop': 0,
+            'auto_stops': 0,
+            'auto_stop_errors': 0,
+        }
+
+    def set_timeout_handler(self, handler: Callable[[str, str], Awaitable[Any]]):
+        """자동 stop_typing 전송 함수 등록 (room_id, sid)"""
+        self._on_timeout = handler
+
+    def typing(self, room_id: str, sid: str) -> bool:
+        """typing 수신 - 상대방에게 전달해야 하면 True"""
+        self.stats['received_typing'] += 1
+        key = (room_id, sid)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _TypingState()
+        self._schedule_timeout(key, state)
+
+        now = time.monotonic()
+        if state.typing and now - state.last_forwarded < settings.TYPING_THROTTLE_SECONDS:
+            return False
+        state.typing = True
+        state.last_forwarded = now
+        self.stats['forwarded_typing'] += 1
+        return True
+
+    def stop(self, room_id: str, sid: str) -> bool:
+        """stop_typing 수신 - 타이핑 중이었을 때만 True"""
+        self.stats['received_stop'] += 1
+        if not self.clear(room_id, sid):
+            return False
+        self.stats['forwarded_stop'] += 1
+        return True
+
+    def clear(self, room_id: str, sid: str) -> bool:
+        """
+        상태 제거 (메시지 전송/퇴장 시)
+
+        Returns:
+            타이핑 중이었는지 여부
+        """
+        state = self._states.pop((room_id, sid), None)
+        if state is None:
+            return False
+        if state.timer:
+            state.timer.cancel()
+        return state.typing
+
+    def clear_sid(self, sid: str):
+        """연결 종료 시 해당 소켓의 모든 방 상태 제거"""
+        for room_id, state_sid in [key for key in self._states if key[1] == sid]:
+            self.clear(room_id, state_sid)
+
+    def _schedule_timeout(self, key: Tuple[str, str], state: _TypingState):
+        if state.timer:
+            state.timer.cancel()
+        loop = asyncio.get_running_loop()
+        state.timer = loop.call_later(settings.TYPING_TIMEOUT_SECONDS, self._expire, key)
+
+    def _expire(self, key: Tuple[str, str]):
+        """typing 이후 입력이 끊김 → 자동 stop_typing"""
+        if not self.clear(*key):
+            return
+        self.stats['auto_stops'] += 1
+        if self._on_timeout:
+            task = asyncio.create_task(self._on_timeout(*key))
+            self._tasks.add(task)
+            task.add_done_callback(self._timeout_done)
+
+    def _timeout_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error:
+            self.stats['auto_stop_errors'] += 1
+            logger.error(f"Typing auto-stop error: {str(error)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        received = self.stats['received_typing'] + self.stats['received_stop']
+        forwarded = self.stats['forwarded_typing'] + self.stats['forwarded_stop']
+        return {
+            **self.stats,
+            'suppressed_typing': self.stats['received_typing'] - self.stats['forwarded_typing'],
+            'suppressed_stop': self.stats['received_stop'] - self.stats['forwarded_stop'],
+            'suppressed_ratio': round((received - forwarded) / received * 100, 2) if received else 0.0,
+            'active': sum(1 for state in self._states.values() if state.typing),
+        }
+
+
+# 싱글톤 인스턴스
+typing_coalescer = TypingCoalescer()
@@ -0,0 +1,180 @@
+"""
+메시지 워커 ID 임대 (Redis)
+
+메시지 ID(seq)와 outbox 리스트(outbox:messages:{worker_id})는 워커 ID로 구분되므로
+동시에 실행 중인 프로세스(uvicorn 워커, 레플리카)가 같은 ID를 쓰면 seq가 겹쳐
+두 번째 메시지가 ON CONFLICT로 버려지고, 같은 outbox 리스트를 두 프로세스가 LTRIM합니다.
+
+- 기동 시 msgworker:{id} 키를 SET NX + TTL로 임대하고 TTL/3 주기로 갱신
+- MESSAGE_WORKER_ID >= 0: 해당 번호만 임대 (다른 프로세스가 쓰고 있으면 기동 실패)
+- MESSAGE_WORKER_ID = -1: 0~31 중 비어 있는 가장 작은 번호를 임대
+- 갱신 시 다른 프로세스가 키를 가져갔으면 (Redis 장애로 TTL이 지난 경우) 빈 번호를 다시 임대
+- Redis 미연결 시 단일 프로세스로 보고 설정값(-1이면 0)을 그대로 사용
+
+임대가 끝난 번호를 다른 프로세스가 이어받으면 남은 outbox 리스트도 그 프로세스가 저장합니다.
+TTL 동안은 번호가 재사용되지 않으므로 호스트 간 시계 오차가 TTL보다 작으면 seq가 겹치지 않습니다.
+"""
+
+from typing import Optional, Dict, Any
+import asyncio
+import logging
+import uuid
+
+from redis.exceptions import WatchError
+
+from app.config import settings
+from app.services.cache import cache_service
+from app.services.message_ids import message_ids, MAX_WORKER_ID
+
+logger = logging.getLogger(__name__)
+
+LEASE_PREFIX = "msgworker"
+
+
+class WorkerIdUnavailable(RuntimeError):
+    """임대할 수 있는 워커 ID가 없음"""
+
+
+def lease_key(worker_id: int) -> str:
+    return f"{LEASE_PREFIX}:{worker_id}"
+
+
+class WorkerLease:
+    """워커 ID 임대/갱신"""
+
+    def __init__(self):
+        self.token = uuid.uuid4().hex
+        self.worker_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            'renewals': 0,
+            'lost': 0,
+            'errors': 0,
+        }
+
+    async def start(self):
+        """워커 ID 임대 후 메시지 ID 생성기에 적용 (outbox 시작 전에 호출)"""
+        client = cache_service.redis_client
+        if not client:
+            worker_id = max(settings.MESSAGE_WORKER_ID, 0)
+            logger.warning(f"Redis unavailable, using unleased message worker id {worker_id}")
+            message_ids.set_worker_id(worker_id)
+            return
+
+        worker_id = await self._acquire()
+        if worker_id is None:
+            if settings.MESSAGE_WORKER_ID >= 0:
+                raise WorkerIdUnavailable(
+                    f"MESSAGE_WORKER_ID {settings.MESSAGE_WORKER_ID} is leased by another process"
+                )
+            raise WorkerIdUnavailable(f"All message worker ids (0~{MAX_WORKER_ID}) are leased")
+        self._use(worker_id)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Message worker id leased: {worker_id}")
+
+    async def stop(self):
+        """갱신 중지 및 임대 반납 (outbox 종료 후 호출)"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        client = cache_service.redis_client
+        if client and self.worker_id is not None:
+            try:
+                await self._release(client, self.worker_id)
+            except Exception as e:
+                logger.error(f"Message worker lease release error: {str(e)}")
+
+    def _candidates(self):
+        if settings.MESSAGE_WORKER_ID >= 0:
+            return [settings.MESSAGE_WORKER_ID]
+        return range(MAX_WORKER_ID + 1)
+
+    async def _acquire(self) -> Optional[int]:
+        client = cache_service.redis_client
+        for worker_id in self._candidates():
+            if await client.set(
+                lease_key(worker_id), self.token, nx=True, ex=settings.MESSAGE_WORKER_LEASE_TTL
+            ):
+                return worker_id
+        return None
+
+    def _use(self, worker_id: int):
+        self.worker_id = worker_id
+        message_ids.set_worker_id(worker_id)
+
+    async def _renew(self, client) -> bool:
+        """임대가 아직 이 프로세스 것이면 TTL 연장"""
+        key = lease_key(self.worker_id)
+        async with client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                if await pipe.get(key) != self.token:
+                    await pipe.unwatch()
+                    return False
+                pipe.multi()
+                pipe.expire(key, settings.MESSAGE_WORKER_LEASE_TTL)
+                await pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    async def _release(self, client, worker_id: int):
+        key = lease_key(worker_id)
+        async with client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                if await pipe.get(key) != self.token:
+                    await pipe.unwatch()
+                    return
+                pipe.multi()
+                pipe.delete(key)
+                await pipe.execute()
+            except WatchError:
+                pass
+
+    async def _run(self):
+        interval = max(settings.MESSAGE_WORKER_LEASE_TTL / 3, 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            client = cache_service.redis_client
+            if not client:
+                continue
+            try:
+                if await self._renew(client):
+                    self.stats['renewals'] += 1
+                    continue
+                # TTL이 지나 키가 사라졌으면 같은 번호를 다시, 다른 프로세스가 가져갔으면 빈 번호 임대
+                self.stats['lost'] += 1
+                previous = self.worker_id
+                if await client.set(
+                    lease_key(previous), self.token, nx=True, ex=settings.MESSAGE_WORKER_LEASE_TTL
+                ):
+                    logger.warning(f"Message worker lease {previous} expired, re-acquired")
+                    continue
+                worker_id = await self._acquire()
+                if worker_id is None:
+                    logger.critical(
+                        f"Message worker id {previous} taken by another process and no free id left; "
+                        f"message ids may collide until one is released"
+                    )
+                    continue
+                self._use(worker_id)
+                logger.critical(f"Message worker id {previous} taken by another process, switched to {worker_id}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Message worker lease renewal error: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'worker_id': self.worker_id,
+            'configured': settings.MESSAGE_WORKER_ID,
+            'ttl': settings.MESSAGE_WORKER_LEASE_TTL,
+        }
+
+
+# 싱글톤 인스턴스
+worker_lease = WorkerLease()
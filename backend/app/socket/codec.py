@@ -0,0 +1,106 @@
+"""
+Socket.IO 페이로드 코덱 (클라이언트별 선택)
+
+기본은 기존과 같은 JSON 이벤트이며, 연결 시 codec=msgpack을 요청한 클라이언트에는
+자주 보내는 이벤트를 짧은 키의 msgpack 바이너리(Socket.IO 바이너리 첨부)로 보냅니다.
+병원 Wi-Fi에서 여러 방을 담당하는 상담사 화면의 대역폭과 JSON 인코딩 비용을 줄입니다.
+
+- 협상: connect auth {'codec': 'msgpack'} 또는 쿼리 ?codec=msgpack → 'connected' 이벤트로 결과 통보
+- 압축 대상 이벤트: COMPACT_SCHEMAS (new_message, typing, stop_typing, joined_room)
+  그 외 이벤트와 방 단위 브로드캐스트는 JSON 그대로
+- 클라이언트는 이벤트 인자로 받은 바이너리를 msgpack으로 디코드한 뒤 키를 원래 이름으로 복원
+  (스키마는 'connected' 이벤트의 schemas로 전달)
+
+python-socketio의 serializer 옵션은 서버 전체에 적용되므로 JSON 클라이언트와 섞어 쓸 수 없습니다.
+대신 Socket.IO 패킷은 JSON 그대로 두고 페이로드만 바이너리 첨부로 보내 클라이언트별로 선택합니다.
+"""
+
+from typing import Dict, Any, Optional
+from urllib.parse import parse_qs
+
+import msgpack
+
+CODEC_JSON = 'json'
+CODEC_MSGPACK = 'msgpack'
+CODECS = (CODEC_JSON, CODEC_MSGPACK)
+
+# 이벤트별 필드 → 짧은 키
+COMPACT_SCHEMAS: Dict[str, Dict[str, str]] = {
+    'new_message': {
+        'message_id': 'i',
+        'client_msg_id': 'c',
+        'sender_type': 's',
+        'text': 't',
+        'translated_text': 'x',
+        'source_lang': 'sl',
+        'target_lang': 'tl',
+    },
+    'typing': {'room_id': 'r'},
+    'stop_typing': {'room_id': 'r'},
+    'joined_room': {'room_id': 'r', 'user_type': 'u'},
+}
+
+
+def requested_codec(environ: Dict[str, Any], auth: Optional[Dict[str, Any]]) -> str:
+    """연결 요청의 코덱 (auth 우선, 쿼리 스트링 다음, 기본 JSON)"""
+    codec = (auth or {}).get('codec') if isinstance(auth, dict) else None
+    if not codec:
+        query = parse_qs(environ.get('QUERY_STRING', ''))
+        codec = (query.get('codec') or [None])[0]
+    return codec if codec in CODECS else CODEC_JSON
+
+
+def compact(event: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """스키마의 짧은 키로 변환 (None 값은 생략, 스키마에 없는 필드는 원래 키 유지)"""
+    schema = COMPACT_SCHEMAS[event]
+    return {schema.get(key, key): value for key, value in payload.items() if value is not None}
+
+
+def expand(event: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """compact의 역변환 (테스트/벤치마크용)"""
+    reverse = {short: key for key, short in COMPACT_SCHEMAS[event].items()}
+    return {reverse.get(key, key): value for key, value in payload.items()}
+
+
+class SocketCodec:
+    """연결(sid)별 코덱 및 인코딩 통계"""
+
+    def __init__(self):
+        self._codecs: Dict[str, str] = {}
+        self.stats = {
+            'connections': {codec: 0 for codec in CODECS},
+            'encoded': 0,
+            'msgpack_bytes': 0,
+        }
+
+    def negotiate(self, sid: str, codec: str) -> str:
+        self.stats['connections'][codec] += 1
+        if codec != CODEC_JSON:
+            self._codecs[sid] = codec
+        return codec
+
+    def forget(self, sid: str):
+        self._codecs.pop(sid, None)
+
+    def codec_for(self, sid: str) -> str:
+        return self._codecs.get(sid, CODEC_JSON)
+
+    def encode(self, event: str, payload: Dict[str, Any], sid: str):
+        """sid의 코덱에 맞는 이벤트 인자 (JSON 클라이언트는 그대로)"""
+        if event not in COMPACT_SCHEMAS or self._codecs.get(sid) != CODEC_MSGPACK:
+            return payload
+        data = msgpack.packb(compact(event, payload), use_bin_type=True)
+        self.stats['encoded'] += 1
+        self.stats['msgpack_bytes'] += len(data)
+        return data
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'active_msgpack': sum(1 for codec in self._codecs.values() if codec == CODEC_MSGPACK),
+            'schemas': COMPACT_SCHEMAS,
+        }
+
+
+# 싱글톤 인스턴스
+socket_codec = SocketCodec()
@@ -1,23 +1,133 @@
 import socketio
 from app.services.translation import translation_service
 from app.services.session import session_manager
-from app.database import SessionLocal
-from app.models.database import save_message
+from app.services.document_jobs import document_job_queue
+from app.services.langdetect import language_detector, detect
+from app.services.message_ids import message_ids
+from app.services.message_outbox import message_outbox, message_record, DEDUP_PENDING
+from app.services.recent_messages import sync_rooms
+from app.services.typing_indicator import typing_coalescer
+from app.services.room_state import room_state, agent_channel, WAITING_CHANNEL
+from app.services.dispatcher import dispatcher
+from app.services.auth import decode_access_token
+from app.socket.codec import socket_codec, requested_codec, COMPACT_SCHEMAS
+from app.config import settings
 import logging
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 
 def register_socket_handlers(sio: socketio.AsyncServer):
 
+    # 문서 번역 진행 상황 전송
+    document_job_queue.set_notifier(sio.emit)
+    # 상담사 방 목록 변경 전송
+    room_state.set_notifier(sio.emit)
+
+    async def emit_to(event: str, payload: dict, sid: str):
+        """단일 연결로 전송 (msgpack을 협상한 클라이언트는 압축 페이로드)"""
+        await sio.emit(event, socket_codec.encode(event, payload, sid), room=sid)
+
+    async def forward_typing(event: str, room_id: str, sid: str):
+        """타이핑 이벤트를 상대방에게만 전송"""
+        session = await session_manager.get_session(room_id)
+        if not session:
+            return
+        if sid == session.get('agent_sid'):
+            target_sid = session.get('customer_sid')
+        else:
+            target_sid = session.get('agent_sid')
+        if target_sid:
+            await emit_to(event, {'room_id': room_id}, target_sid)
+
+    async def typing_timeout(room_id: str, sid: str):
+        """입력이 끊긴 발신자의 타이핑 표시 자동 해제"""
+        await forward_typing('stop_typing', room_id, sid)
+
+    typing_coalescer.set_timeout_handler(typing_timeout)
+
+    async def resolve_customer_language(room_id: str, session: dict, text: str, claimed: str) -> str:
+        """
+        고객 메시지 원문 언어 보정
+
+        충분히 긴 메시지가 다른 고객 언어로 감지되면 대화 중 언어 전환으로 보고
+        세션 언어를 바꿔 이후 상담사 메시지도 새 언어로 번역합니다.
+        (한국어 인사 등 상담사 언어로 쓴 메시지, 영어 문장 속 베트남 이름처럼
+        불확실한 감지로 바뀐 언어는 전환으로 보지 않음)
+        """
+        claimed = claimed or session.get('customer_language') or 'en'
+        source_lang = language_detector.resolve(text, claimed)
+        detection = detect(text)
+        if (source_lang not in (session.get('customer_language'), 'ko')
+                and (source_lang == claimed or detection.certain)
+                and detection.letters >= settings.LANGDETECT_SWITCH_MIN_LETTERS):
+            await session_manager.update_customer_language(room_id, source_lang)
+            logger.info(f"Customer language switched in {room_id}: {source_lang}")
+            event = {'room_id': room_id, 'language': source_lang}
+            for target_sid in filter(None, [session.get('agent_sid'), session.get('customer_sid')]):
+                await sio.emit('customer_language_changed', event, room=target_sid)
+        return source_lang
+
+    async def claim_message(sid: str, room_id: str, data: dict) -> Optional[dict]:
+        """
+        중복 전송 확인 (client_msg_id 선점)
+
+        메시지 ID는 번역이 끝난 뒤 outbox에 넣기 직전에 발급합니다.
+        (먼저 발급하면 번역이 느린 메시지가 나중에 저장된 메시지보다 작은 ID를 받아
+        seq > cursor로 동기화하는 클라이언트가 놓침)
+        같은 client_msg_id의 재전송이면 번역/전송 없이 기존 메시지 ID로 다시 ack하고,
+        원본이 아직 처리 중이면 message_id 없이 pending ack를 보내 나중에 재전송하게 합니다.
+
+        Returns:
+            중복 재전송이면 ack 응답, 처음이면 None
+        """
+        # 메시지를 보냈으면 타이핑 상태 초기화 (다음 입력의 typing은 바로 전달)
+        typing_coalescer.clear(room_id, sid)
+
+        client_msg_id = data.get('client_msg_id')
+        existing = await message_outbox.claim(room_id, client_msg_id)
+        if existing is None:
+            return None
+        if existing == DEDUP_PENDING:
+            ack = message_ack(room_id, client_msg_id, None, duplicate=True, pending=True)
+        else:
+            ack = message_ack(room_id, client_msg_id, existing, duplicate=True)
+        await sio.emit('message_ack', ack, room=sid)
+        return ack
+
+    def message_ack(room_id: str, client_msg_id, seq: Optional[int], duplicate: bool = False,
+                    pending: bool = False) -> dict:
+        """발신자 ack (Socket.IO 콜백 응답 + 'message_ack' 이벤트, pending이면 재전송 필요)"""
+        return {
+            'room_id': room_id,
+            'client_msg_id': client_msg_id,
+            'message_id': seq,
+            'duplicate': duplicate,
+            'pending': pending,
+        }
+
     @sio.on('connect')
-    async def connect(sid, environ):
-        logger.info(f"Client connected: {sid}")
-        await sio.emit('connected', {'sid': sid}, room=sid)
+    async def connect(sid, environ, auth=None):
+        codec = socket_codec.negotiate(sid, requested_codec(environ, auth))
+        logger.info(f"Client connected: {sid} ({codec})")
+        connected = {'sid': sid, 'codec': codec}
+        if codec != 'json':
+            connected['schemas'] = COMPACT_SCHEMAS
+        await sio.emit('connected', connected, room=sid)
 
     @sio.on('disconnect')
     async def disconnect(sid):
         logger.info(f"Client disconnected: {sid}")
+        typing_coalescer.clear_sid(sid)
+        socket_codec.forget(sid)
+        dispatcher.agent_disconnected(sid)
+        # 방 목록 접속 상태 갱신
+        room_id = session_manager.sid_to_room.get(sid)
+        session = await session_manager.get_session(room_id) if room_id else None
+        if session:
+            user_type = 'customer' if session['customer_sid'] == sid else 'agent'
+            await room_state.set_presence(room_id, user_type, False)
         # 세션 정리
         await session_manager.remove_connection(sid)
 
@@ -48,12 +158,13 @@ def register_socket_handlers(sio: socketio.AsyncServer):
         )
 
         logger.info(f"{user_type} joined room {room_id}: {sid}")
+        await room_state.set_presence(room_id, user_type, True)
 
         # 입장 확인
-        await sio.emit('joined_room', {
+        await emit_to('joined_room', {
             'room_id': room_id,
             'user_type': user_type
-        }, room=sid)
+        }, sid)
 
         # 상대방이 이미 있으면 알림
         session = await session_manager.get_session(room_id)
@@ -85,7 +196,13 @@ def register_socket_handlers(sio: socketio.AsyncServer):
             }, room=sid)
             return
 
-        source_lang = session['customer_language']
+        duplicate_ack = await claim_message(sid, room_id, data)
+        if duplicate_ack:
+            return duplicate_ack
+
+        source_lang = await resolve_customer_language(
+            room_id, session, message, session['customer_language']
+        )
 
         try:
             # 1. 한국어로 번역
@@ -93,32 +210,40 @@ def register_socket_handlers(sio: socketio.AsyncServer):
                 text=message,
                 source_lang=source_lang,
                 target_lang='ko',
-                context='medical'
+                context='medical',
+                detect_source=False
             )
 
-            # 2. DB에 저장 (TODO: 구현 필요)
-            # await save_message(...)
+            # 2. DB 저장 (outbox → 일괄 INSERT, 메시지 ID는 저장 직전에 발급)
+            seq = message_ids.next_id()
+            await message_outbox.enqueue(message_record(
+                seq, room_id, 'customer', message, translated, source_lang, 'ko',
+                client_msg_id=data.get('client_msg_id')
+            ))
 
             # 3. 상담사에게 전송 (원문 + 번역)
             agent_sid = session.get('agent_sid')
             if agent_sid:
                 await sio.emit('agent_receive_message', {
-                    'message_id': f"msg_{data['timestamp']}",
+                    'message_id': seq,
                     'original': message,
                     'translated': translated,
                     'source_lang': source_lang,
-                    'timestamp': data['timestamp']
+                    'timestamp': data.get('timestamp')
                 }, room=agent_sid)
 
             # 4. 고객에게 발신 확인
             await sio.emit('message_sent', {
-                'message_id': f"msg_{data['timestamp']}",
+                'message_id': seq,
+                'client_msg_id': data.get('client_msg_id'),
                 'message': message,
-                'timestamp': data['timestamp']
+                'timestamp': data.get('timestamp')
             }, room=sid)
+            return message_ack(room_id, data.get('client_msg_id'), seq)
 
         except Exception as e:
             logger.error(f"Translation error: {str(e)}")
+            await message_outbox.release(room_id, data.get('client_msg_id'))
             await sio.emit('error', {
                 'message': 'Translation failed',
                 'detail': str(e)
@@ -144,6 +269,10 @@ def register_socket_handlers(sio: socketio.AsyncServer):
 
         target_lang = session['customer_language']
 
+        duplicate_ack = await claim_message(sid, room_id, data)
+        if duplicate_ack:
+            return duplicate_ack
+
         try:
             # 1. 고객 언어로 번역
             translated = await translation_service.translate(
@@ -153,29 +282,36 @@ def register_socket_handlers(sio: socketio.AsyncServer):
                 context='medical'
             )
 
-            # 2. DB 저장 (TODO: 구현 필요)
-            # await save_message(...)
+            # 2. DB 저장 (outbox → 일괄 INSERT, 메시지 ID는 저장 직전에 발급)
+            seq = message_ids.next_id()
+            await message_outbox.enqueue(message_record(
+                seq, room_id, 'agent', message, translated, 'ko', target_lang,
+                sender_id=session.get('agent_id'), client_msg_id=data.get('client_msg_id')
+            ))
 
             # 3. 고객에게 전송 (번역된 메시지만)
             customer_sid = session.get('customer_sid')
             if customer_sid:
                 await sio.emit('customer_receive_message', {
-                    'message_id': f"msg_{data['timestamp']}",
+                    'message_id': seq,
                     'message': translated,
-                    'timestamp': data['timestamp']
+                    'timestamp': data.get('timestamp')
                 }, room=customer_sid)
 
             # 4. 상담사에게 발신 확인 (원문 + 번역 미리보기)
             await sio.emit('message_sent', {
-                'message_id': f"msg_{data['timestamp']}",
+                'message_id': seq,
+                'client_msg_id': data.get('client_msg_id'),
                 'original': message,
                 'translated': translated,
                 'target_lang': target_lang,
-                'timestamp': data['timestamp']
+                'timestamp': data.get('timestamp')
             }, room=sid)
+            return message_ack(room_id, data.get('client_msg_id'), seq)
 
         except Exception as e:
             logger.error(f"Translation error: {str(e)}")
+            await message_outbox.release(room_id, data.get('client_msg_id'))
             await sio.emit('error', {
                 'message': 'Translation failed'
             }, room=sid)
@@ -187,12 +323,18 @@ def register_socket_handlers(sio: socketio.AsyncServer):
         data = {
             'room_id': 'room_123',
             'text': 'message text',
-            'language': 'en' or 'ko'
+            'language': 'en' or 'ko',
+            'client_msg_id': 'c_8f2a...'  # 선택, 재전송 시 같은 값 → 중복 저장/전송 없이 다시 ack
         }
+
+        Returns:
+            ack {'room_id', 'client_msg_id', 'message_id', 'duplicate', 'pending'} (Socket.IO 콜백)
+            pending이면 원본이 아직 처리 중이므로 잠시 후 같은 client_msg_id로 재전송
         """
         room_id = data['room_id']
         text = data['text']
         source_lang = data.get('language', 'ko')
+        client_msg_id = data.get('client_msg_id')
 
         # 세션 정보 가져오기
         session = await session_manager.get_session(room_id)
@@ -203,52 +345,55 @@ def register_socket_handlers(sio: socketio.AsyncServer):
         # 발신자 유형 확인
         sender_type = 'agent' if sid == session.get('agent_sid') else 'customer'
 
+        duplicate_ack = await claim_message(sid, room_id, data)
+        if duplicate_ack:
+            return duplicate_ack
+
         try:
             # 번역 처리
             if sender_type == 'customer':
-                # 고객 메시지 -> 한국어로 번역
+                # 고객 메시지 -> 한국어로 번역 (원문 언어 보정)
+                source_lang = await resolve_customer_language(
+                    room_id, session, text, data.get('language') or session.get('customer_language')
+                )
                 target_lang = 'ko'
                 translated = await translation_service.translate(
                     text=text,
                     source_lang=source_lang,
                     target_lang=target_lang,
-                    context='medical'
+                    context='medical',
+                    detect_source=False
                 )
 
-                # DB에 메시지 저장
-                db = SessionLocal()
-                try:
-                    save_message(
-                        db_session=db,
-                        room_id=room_id,
-                        sender_type='customer',
-                        original_text=text,
-                        translated_text=translated,
-                        source_lang=source_lang,
-                        target_lang=target_lang
-                    )
-                finally:
-                    db.close()
+                # DB에 메시지 저장 (outbox → 일괄 INSERT, 메시지 ID는 저장 직전에 발급)
+                seq = message_ids.next_id()
+                await message_outbox.enqueue(message_record(
+                    seq, room_id, 'customer', text, translated, source_lang, target_lang,
+                    client_msg_id=client_msg_id
+                ))
 
                 # 상담사에게 전송
                 agent_sid = session.get('agent_sid')
                 if agent_sid:
-                    await sio.emit('new_message', {
+                    await emit_to('new_message', {
+                        'message_id': seq,
                         'sender_type': 'customer',
                         'text': text,
                         'translated_text': translated,
                         'source_lang': source_lang,
                         'target_lang': target_lang
-                    }, room=agent_sid)
+                    }, agent_sid)
 
                 # 고객에게도 전송 (에코)
-                await sio.emit('new_message', {
+                await emit_to('new_message', {
+                    'message_id': seq,
+                    'client_msg_id': client_msg_id,
                     'sender_type': 'customer',
                     'text': text,
                     'translated_text': translated,
                     'source_lang': source_lang,
                     'target_lang': target_lang
-                }, room=sid)
+                }, sid)
 
             else:
                 # 상담사 메시지 -> 고객 언어로 번역
@@ -260,91 +405,192 @@ def register_socket_handlers(sio: socketio.AsyncServer):
                     context='medical'
                 )
 
-                # DB에 메시지 저장
-                db = SessionLocal()
-                try:
-                    save_message(
-                        db_session=db,
-                        room_id=room_id,
-                        sender_type='agent',
-                        original_text=text,
-                        translated_text=translated,
-                        source_lang='ko',
-                        target_lang=target_lang,
-                        sender_id=session.get('agent_id')
-                    )
-                finally:
-                    db.close()
+                # DB에 메시지 저장 (outbox → 일괄 INSERT, 메시지 ID는 저장 직전에 발급)
+                seq = message_ids.next_id()
+                await message_outbox.enqueue(message_record(
+                    seq, room_id, 'agent', text, translated, 'ko', target_lang,
+                    sender_id=session.get('agent_id'), client_msg_id=client_msg_id
+                ))
 
                 # 고객에게 전송
                 customer_sid = session.get('customer_sid')
                 if customer_sid:
-                    await sio.emit('new_message', {
+                    await emit_to('new_message', {
+                        'message_id': seq,
                         'sender_type': 'agent',
                         'text': translated,
                         'translated_text': text,
                         'source_lang': 'ko',
                         'target_lang': target_lang
-                    }, room=customer_sid)
+                    }, customer_sid)
 
                 # 상담사에게도 전송 (에코)
-                await sio.emit('new_message', {
+                await emit_to('new_message', {
+                    'message_id': seq,
+                    'client_msg_id': client_msg_id,
                     'sender_type': 'agent',
                     'text': text,
                     'translated_text': translated,
                     'source_lang': 'ko',
                     'target_lang': target_lang
-                }, room=sid)
+                }, sid)
+
+            return message_ack(room_id, client_msg_id, seq)
 
         except Exception as e:
             logger.error(f"Translation error: {str(e)}")
+            await message_outbox.release(room_id, client_msg_id)
             await sio.emit('error', {
                 'message': 'Translation failed',
                 'detail': str(e)
             }, room=sid)
 
-    @sio.on('typing')
-    async def handle_typing(sid, data):
-        """타이핑 표시"""
-        room_id = data['room_id']
+    @sio.on('broadcast_message')
+    async def handle_broadcast_message(sid, data):
+        """
+        상담사 공지/그룹 메시지를 여러 채팅방에 전송
+        data = {
+            'room_ids': ['room_123', 'room_456'],
+            'text': '내일 오전 진료는 휴진입니다.'
+        }
 
-        session = await session_manager.get_session(room_id)
-        if not session:
+        대상 방들의 고객 언어를 모아 한 번에 번역(translate_many_targets)한 뒤
+        방마다 해당 언어 번역문을 저장/전송합니다.
+        """
+        room_ids = list(dict.fromkeys(data.get('room_ids') or []))
+        text = data['text']
+
+        # 상담사로 참여 중인 방만 대상
+        sessions = {}
+        for room_id in room_ids:
+            session = await session_manager.get_session(room_id)
+            if session and session.get('agent_sid') == sid and session.get('customer_language'):
+                sessions[room_id] = session
+
+        if not sessions:
+            await sio.emit('error', {'message': 'No rooms to broadcast'}, room=sid)
             return
 
-        # 세션에서 발신자 타입 확인
-        user_type = 'agent' if sid == session.get('agent_sid') else 'customer'
+        try:
+            target_langs = [session['customer_language'] for session in sessions.values()]
+            translations = await translation_service.translate_many_targets(
+                text=text,
+                source_lang='ko',
+                target_langs=target_langs,
+                context='medical'
+            )
 
-        # 상대방에게만 전송
-        if user_type == 'customer':
-            agent_sid = session.get('agent_sid')
-            if agent_sid:
-                await sio.emit('typing', {}, room=agent_sid)
-        else:
-            customer_sid = session.get('customer_sid')
-            if customer_sid:
-                await sio.emit('typing', {}, room=customer_sid)
+            # DB에 메시지 저장 (방별, outbox에 한 번에 추가)
+            seqs = {room_id: message_ids.next_id() for room_id in sessions}
+            await message_outbox.enqueue(*[
+                message_record(
+                    seqs[room_id], room_id, 'agent', text,
+                    translations[session['customer_language']], 'ko', session['customer_language'],
+                    sender_id=session.get('agent_id')
+                )
+                for room_id, session in sessions.items()
+            ])
+
+            # 고객에게 전송 (방별 언어)
+            for room_id, session in sessions.items():
+                customer_sid = session.get('customer_sid')
+                if customer_sid:
+                    target_lang = session['customer_language']
+                    await emit_to('new_message', {
+                        'message_id': seqs[room_id],
+                        'sender_type': 'agent',
+                        'text': translations[target_lang],
+                        'translated_text': text,
+                        'source_lang': 'ko',
+                        'target_lang': target_lang
+                    }, customer_sid)
+
+            # 상담사에게 발신 확인 (언어별 번역 미리보기)
+            await sio.emit('broadcast_sent', {
+                'room_ids': list(sessions),
+                'message_ids': seqs,
+                'text': text,
+                'translations': translations
+            }, room=sid)
+
+        except Exception as e:
+            logger.error(f"Broadcast translation error: {str(e)}")
+            await sio.emit('error', {
+                'message': 'Translation failed',
+                'detail': str(e)
+            }, room=sid)
+
+    @sio.on('typing')
+    async def handle_typing(sid, data):
+        """타이핑 표시 (발신자별로 간격 제한, 억제된 이벤트는 세션 조회 없이 버림)"""
+        room_id = data['room_id']
+        if typing_coalescer.typing(room_id, sid):
+            await forward_typing('typing', room_id, sid)
 
     @sio.on('stop_typing')
     async def handle_stop_typing(sid, data):
-        """타이핑 중지"""
+        """타이핑 중지 (타이핑 중이었을 때만 전달)"""
         room_id = data['room_id']
+        if typing_coalescer.stop(room_id, sid):
+            await forward_typing('stop_typing', room_id, sid)
 
-        session = await session_manager.get_session(room_id)
-        if not session:
+    @sio.on('sync_since')
+    async def handle_sync_since(sid, data):
+        """
+        재접속 이어받기 (놓친 메시지만)
+        data = {
+            'rooms': {'room_123': 1792435770851328, 'room_456': None},  # 마지막으로 받은 메시지 ID
+            'limit': 100
+        }
+
+        Returns:
+            [{'room_id', 'messages', 'cursor', 'has_more', 'source'}] (Socket.IO 콜백, 'sync_result' 이벤트)
+        """
+        rooms = dict(list((data.get('rooms') or {}).items())[:settings.SYNC_MAX_ROOMS])
+        try:
+            results = await sync_rooms(rooms, data.get('limit'))
+        except Exception as e:
+            logger.error(f"Sync error: {str(e)}")
+            await sio.emit('error', {'message': 'Sync failed'}, room=sid)
             return
 
-        # 세션에서 발신자 타입 확인
-        user_type = 'agent' if sid == session.get('agent_sid') else 'customer'
+        await sio.emit('sync_result', {'rooms': results}, room=sid)
+        return results
 
-        if user_type == 'customer':
-            agent_sid = session.get('agent_sid')
-            if agent_sid:
-                await sio.emit('stop_typing', {}, room=agent_sid)
-        else:
-            customer_sid = session.get('customer_sid')
-            if customer_sid:
-                await sio.emit('stop_typing', {}, room=customer_sid)
+    @sio.on('subscribe_agent_rooms')
+    async def handle_subscribe_agent_rooms(sid, data):
+        """
+        상담사 방 목록 구독 (폴링 대신 변경분만 수신)
+        data = {'token': '<access token>'}
+
+        Returns:
+            {'rooms': [...], 'version'} (Socket.IO 콜백, 'room_state_snapshot' 이벤트)
+            이후 'room_state' 이벤트 {'op': 'upsert' | 'remove', 'room', 'version'}
+        """
+        payload = decode_access_token((data or {}).get('token', ''))
+        agent_id = payload.get('sub') if payload else None
+        if not agent_id:
+            await sio.emit('error', {'message': 'Invalid token'}, room=sid)
+            return
+
+        await sio.enter_room(sid, agent_channel(agent_id))
+        await sio.enter_room(sid, WAITING_CHANNEL)
+        await room_state.ensure_loaded()
+        snapshot = room_state.snapshot(agent_id)
+        await sio.emit('room_state_snapshot', snapshot, room=sid)
+
+        # 자동 배정 대상 등록 후 여유만큼 대기 방 배정 (배정 결과는 room_state delta로 전달)
+        dispatcher.agent_connected(agent_id, sid)
+        await dispatcher.fill(agent_id)
+        return snapshot
+
+    @sio.on('subscribe_document_job')
+    async def handle_subscribe_document_job(sid, data):
+        """
+        문서 번역 작업 진행 상황 구독
+        data = {'job_id': 'doc_abc123'}
+        """
+        await sio.enter_room(sid, f"docjob:{data['job_id']}")
 
     @sio.on('end_chat')
     async def handle_end_chat(sid, data):
@@ -0,0 +1,141 @@
+"""
+Socket.IO / Engine.IO 전송 설정 프로파일 및 패킷 지표
+
+SOCKET_TRANSPORT_PROFILE로 선택합니다.
+- development: 기존 동작 (polling + websocket 업그레이드, 패킷마다 로그)
+- production:
+  - websocket 전용 (클라이언트는 이미 transports: ['websocket']로 연결하므로 polling 핸드셰이크/업그레이드 왕복 없음)
+  - 패킷 로그 끄고 샘플링한 구조화 지표로 대체 (SOCKET_METRICS_SAMPLE_RATE)
+  - ping 주기/타임아웃, HTTP 버퍼 상한, 압축 임계값은 설정값 사용
+
+압축 임계값(compression_threshold)은 Engine.IO가 직접 압축하는 HTTP(polling) 응답에 적용됩니다.
+websocket 프레임 압축(permessage-deflate)은 ASGI 서버가 협상하므로
+uvicorn --ws-per-message-deflate(기본 켜짐)로 제어합니다 (SOCKET_WS_PER_MESSAGE_DEFLATE).
+"""
+
+from typing import Dict, Any
+import json
+import logging
+import random
+import time
+
+import socketio
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+metrics_logger = logging.getLogger("app.socket.metrics")
+
+PROFILE_DEVELOPMENT = 'development'
+PROFILE_PRODUCTION = 'production'
+
+
+def server_options(profile: str = None) -> Dict[str, Any]:
+    """프로파일별 AsyncServer 인자"""
+    profile = profile or settings.SOCKET_TRANSPORT_PROFILE
+    if profile == PROFILE_DEVELOPMENT:
+        return {
+            'logger': True,
+            'engineio_logger': True,
+        }
+    if profile != PROFILE_PRODUCTION:
+        raise ValueError(f"Unknown SOCKET_TRANSPORT_PROFILE: {profile}")
+    return {
+        'logger': False,
+        'engineio_logger': False,
+        'ping_interval': settings.SOCKET_PING_INTERVAL,
+        'ping_timeout': settings.SOCKET_PING_TIMEOUT,
+        'max_http_buffer_size': settings.SOCKET_MAX_HTTP_BUFFER_SIZE,
+        'http_compression': True,
+        'compression_threshold': settings.SOCKET_COMPRESSION_THRESHOLD,
+        'transports': ['websocket'] if settings.SOCKET_WEBSOCKET_ONLY else ['polling', 'websocket'],
+    }
+
+
+def _packet_size(data) -> int:
+    if isinstance(data, bytes):
+        return len(data)
+    if isinstance(data, str):
+        # 대부분 ASCII이므로 인코딩 없이 글자 수로 추정 (샘플 로그에만 정확한 바이트 기록)
+        return len(data)
+    return 0
+
+
+class SocketMetrics:
+    """송수신 패킷 수/크기 집계 + 샘플링 구조화 로그"""
+
+    def __init__(self):
+        self.stats = {
+            'sent_packets': 0,
+            'sent_bytes': 0,
+            'received_packets': 0,
+            'received_bytes': 0,
+            'sampled': 0,
+        }
+
+    def record(self, direction: str, data):
+        size = _packet_size(data)
+        self.stats[f'{direction}_packets'] += 1
+        self.stats[f'{direction}_bytes'] += size
+        rate = settings.SOCKET_METRICS_SAMPLE_RATE
+        if rate > 0 and random.random() < rate:
+            self.stats['sampled'] += 1
+            metrics_logger.info(json.dumps({
+                'metric': 'socket_packet',
+                'direction': direction,
+                'bytes': len(data.encode('utf-8')) if isinstance(data, str) else size,
+                'binary': isinstance(data, bytes),
+                # 이벤트 이름은 패킷 앞부분에서만 추출 (전체 디코드 없이)
+                'head': data[:32] if isinstance(data, str) else None,
+                'ts': round(time.time(), 3),
+            }, ensure_ascii=False))
+
+    def get_stats(self) -> Dict[str, Any]:
+        sent, received = self.stats['sent_packets'], self.stats['received_packets']
+        return {
+            **self.stats,
+            'avg_sent_bytes': round(self.stats['sent_bytes'] / sent, 1) if sent else None,
+            'avg_received_bytes': round(self.stats['received_bytes'] / received, 1) if received else None,
+            'profile': settings.SOCKET_TRANSPORT_PROFILE,
+            'sample_rate': settings.SOCKET_METRICS_SAMPLE_RATE,
+        }
+
+
+class MeteredAsyncServer(socketio.AsyncServer):
+    """
+    패킷 지표를 기록하는 AsyncServer
+
+    방 단위 emit은 패킷을 한 번 인코딩한 뒤 _send_eio_packet으로 수신자마다 보내고,
+    ack 응답 등 개별 패킷은 _send_packet으로 보냅니다.
+    """
+
+    async def _send_packet(self, eio_sid, pkt):
+        encoded_packet = pkt.encode()
+        if not isinstance(encoded_packet, list):
+            encoded_packet = [encoded_packet]
+        for ep in encoded_packet:
+            socket_metrics.record('sent', ep)
+            await self.eio.send(eio_sid, ep)
+
+    async def _send_eio_packet(self, eio_sid, eio_pkt):
+        socket_metrics.record('sent', eio_pkt.data)
+        await super()._send_eio_packet(eio_sid, eio_pkt)
+
+    async def _handle_eio_message(self, eio_sid, data):
+        socket_metrics.record('received', data)
+        await super()._handle_eio_message(eio_sid, data)
+
+
+def create_server() -> socketio.AsyncServer:
+    """설정된 프로파일로 Socket.IO 서버 생성"""
+    options = server_options()
+    logger.info(f"Socket.IO transport profile: {settings.SOCKET_TRANSPORT_PROFILE}")
+    return MeteredAsyncServer(
+        async_mode='asgi',
+        cors_allowed_origins=settings.CORS_ORIGINS,
+        **options,
+    )
+
+
+# 싱글톤 인스턴스
+socket_metrics = SocketMetrics()
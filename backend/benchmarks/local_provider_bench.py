@@ -0,0 +1,103 @@
+"""
+로컬 오프라인 프로바이더 벤치마크 (CPU 전용)
+
+동시 요청 수별 처리량/지연 시간과 dynamic batching 효과를 측정합니다.
+결과는 CPU 종류/코어 수/모델에 따라 크게 달라지므로 실행 환경과 함께 기록하세요.
+
+사용 (backend 디렉터리에서):
+    pip install -r requirements-local.txt
+    python -m benchmarks.local_provider_bench --pair ko-en --requests 200 --concurrency 1,8,32
+    python -m benchmarks.local_provider_bench --pair ko-en --max-batch 1   # 배칭 없음 (비교용)
+"""
+
+from typing import List
+import argparse
+import asyncio
+import os
+import platform
+import statistics
+import time
+
+from app.config import settings
+from app.services.cache_warmup import CURATED_PHRASES
+from app.services.providers.local_provider import LocalProvider
+
+
+def _percentile(samples: List[float], ratio: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * ratio), len(ordered) - 1)]
+
+
+async def run_level(provider: LocalProvider, source_lang: str, target_lang: str,
+                    sentences: List[str], requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await provider.translate(sentences[i % len(sentences)], source_lang, target_lang)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    batches_before = provider.stats['batches']
+    sentences_before = provider.stats['sentences']
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    elapsed = time.perf_counter() - started
+    batches = provider.stats['batches'] - batches_before
+
+    print(
+        f"concurrency={concurrency:<4} req/s={requests / elapsed:8.1f}  "
+        f"p50={statistics.median(latencies):8.1f}ms  p95={_percentile(latencies, 0.95):8.1f}ms  "
+        f"avg_batch={(provider.stats['sentences'] - sentences_before) / max(batches, 1):5.1f}"
+    )
+
+
+async def main(args: argparse.Namespace):
+    source_lang, target_lang = args.pair.split('-', 1)
+    provider = LocalProvider(
+        model_dir=args.model_dir,
+        compute_type=args.compute_type,
+        workers=args.workers,
+        threads_per_worker=args.threads,
+        max_batch=args.max_batch,
+        batch_wait_ms=args.batch_wait_ms,
+        beam_size=args.beam_size,
+    )
+    if not provider.is_available() or not provider.supports(source_lang, target_lang):
+        raise SystemExit(f"No local model for {args.pair} in {args.model_dir}")
+
+    sentences = CURATED_PHRASES
+    if args.input:
+        with open(args.input, encoding='utf-8') as f:
+            sentences = [line.strip() for line in f if line.strip()]
+
+    print(f"# {platform.processor() or platform.machine()} / {os.cpu_count()} cpus / {platform.python_version()}")
+    print(f"# pair={args.pair} compute_type={args.compute_type} workers={args.workers} "
+          f"threads={args.threads} max_batch={args.max_batch} wait={args.batch_wait_ms}ms beam={args.beam_size}")
+
+    started = time.perf_counter()
+    await provider.warmup()
+    print(f"# warm-up (process start + model load): {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    try:
+        for concurrency in [int(level) for level in args.concurrency.split(',')]:
+            await run_level(provider, source_lang, target_lang, sentences, args.requests, concurrency)
+    finally:
+        provider.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the local CTranslate2 translation provider")
+    parser.add_argument("--pair", default="ko-en")
+    parser.add_argument("--model-dir", default=settings.LOCAL_MODEL_DIR)
+    parser.add_argument("--compute-type", default=settings.LOCAL_COMPUTE_TYPE)
+    parser.add_argument("--workers", type=int, default=settings.LOCAL_WORKERS)
+    parser.add_argument("--threads", type=int, default=settings.LOCAL_THREADS_PER_WORKER)
+    parser.add_argument("--max-batch", type=int, default=settings.LOCAL_MAX_BATCH)
+    parser.add_argument("--batch-wait-ms", type=float, default=settings.LOCAL_BATCH_WAIT_MS)
+    parser.add_argument("--beam-size", type=int, default=settings.LOCAL_BEAM_SIZE)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--input", help="문장 파일 (한 줄에 한 문장, 기본: 큐레이션 문구)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,108 @@
+"""
+Socket.IO 페이로드 코덱 벤치마크 (JSON vs msgpack)
+
+new_message 이벤트를 서버가 실제로 보내는 Socket.IO 패킷으로 인코딩해
+패킷당 전송 바이트와 인코딩/디코딩 CPU 시간을 비교합니다.
+msgpack은 패킷(JSON) + 바이너리 첨부를 합산합니다.
+
+사용 (backend 디렉터리에서):
+    python -m benchmarks.socket_codec_bench --messages 20000
+    python -m benchmarks.socket_codec_bench --text-length 400   # 긴 메시지
+"""
+
+import argparse
+import json
+import platform
+import time
+
+import msgpack
+from socketio import packet
+
+from app.socket.codec import compact, expand
+
+SAMPLE_TEXTS = [
+    ("안녕하세요, 오늘 검사 결과 설명 드리겠습니다.", "Hello, I will explain today's test results."),
+    ("약은 식후 30분에 드세요.", "Please take the medicine 30 minutes after meals."),
+    ("Where is the radiology department?", "영상의학과는 어디에 있나요?"),
+]
+
+
+def _payloads(count: int, text_length: int):
+    payloads = []
+    for i in range(count):
+        text, translated = SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]
+        if text_length:
+            text = (text * (text_length // len(text) + 1))[:text_length]
+            translated = (translated * (text_length // len(translated) + 1))[:text_length]
+        payloads.append({
+            'message_id': 1234567890123 + i,
+            'client_msg_id': f"c-{i:08d}",
+            'sender_type': 'patient' if i % 2 else 'agent',
+            'text': text,
+            'translated_text': translated,
+            'source_lang': 'ko',
+            'target_lang': 'en',
+        })
+    return payloads
+
+
+def _wire_bytes(encoded) -> int:
+    if isinstance(encoded, list):
+        # 첫 항목: 텍스트 패킷, 나머지: 바이너리 첨부
+        return len(encoded[0].encode('utf-8')) + sum(len(part) for part in encoded[1:])
+    return len(encoded.encode('utf-8'))
+
+
+def bench_json(payloads):
+    started = time.perf_counter()
+    encoded = [packet.Packet(packet.EVENT, data=['new_message', payload]).encode() for payload in payloads]
+    encode_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for item in encoded:
+        packet.Packet(encoded_packet=item)
+    decode_s = time.perf_counter() - started
+    return encode_s, decode_s, sum(_wire_bytes(item) for item in encoded)
+
+
+def bench_msgpack(payloads):
+    started = time.perf_counter()
+    encoded = [
+        packet.Packet(packet.EVENT, data=[
+            'new_message', msgpack.packb(compact('new_message', payload), use_bin_type=True)
+        ]).encode()
+        for payload in payloads
+    ]
+    encode_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for item in encoded:
+        pkt = packet.Packet(encoded_packet=item[0])
+        for attachment in item[1:]:
+            pkt.add_attachment(attachment)
+        expand('new_message', msgpack.unpackb(pkt.data[1], raw=False))
+    decode_s = time.perf_counter() - started
+    return encode_s, decode_s, sum(_wire_bytes(item) for item in encoded)
+
+
+def main(args: argparse.Namespace):
+    payloads = _payloads(args.messages, args.text_length)
+    print(f"# {platform.python_version()} / messages={args.messages} text_length={args.text_length or 'sample'}")
+
+    results = {'json': bench_json(payloads), 'msgpack': bench_msgpack(payloads)}
+    base_bytes = results['json'][2]
+    for codec, (encode_s, decode_s, wire_bytes) in results.items():
+        print(
+            f"{codec:<8} encode={encode_s / args.messages * 1e6:7.2f}us  "
+            f"decode={decode_s / args.messages * 1e6:7.2f}us  "
+            f"bytes/msg={wire_bytes / args.messages:7.1f}  "
+            f"vs_json={wire_bytes / base_bytes * 100:6.1f}%"
+        )
+    print(f"# json payload sample: {len(json.dumps(payloads[0], ensure_ascii=False).encode('utf-8'))} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare JSON and msgpack Socket.IO payload encoding")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--text-length", type=int, default=0, help="메시지 길이 (0이면 샘플 문장 그대로)")
+    main(parser.parse_args())
@@ -0,0 +1,138 @@
+"""
+Socket.IO 전송 프로파일 벤치마크 (압축, 패킷 로그)
+
+서버가 보내는 실제 Socket.IO 패킷(new_message/typing)을 만들어 다음을 비교합니다.
+- websocket permessage-deflate (raw deflate + sync flush, context takeover 유무) 대비 무압축 바이트와 CPU
+- development 프로파일의 패킷별 Engine.IO 로그 vs production의 샘플링 지표 CPU
+
+로그는 메모리 스트림으로 출력하므로 실제 stdout/파일 출력 비용은 이보다 큽니다.
+
+사용 (backend 디렉터리에서):
+    python -m benchmarks.socket_transport_bench --packets 20000 --connections 200
+    python -m benchmarks.socket_transport_bench --sample-rate 0.1
+"""
+
+from typing import List
+import argparse
+import io
+import logging
+import platform
+import time
+import zlib
+
+from socketio import packet
+
+from app.config import settings
+from app.socket import transport
+from app.socket.transport import SocketMetrics
+
+SAMPLE_TEXTS = [
+    ("안녕하세요, 오늘 검사 결과 설명 드리겠습니다.", "Hello, I will explain today's test results."),
+    ("약은 식후 30분에 드세요.", "Please take the medicine 30 minutes after meals."),
+    ("Where is the radiology department?", "영상의학과는 어디에 있나요?"),
+]
+
+
+def _packets(count: int) -> List[str]:
+    """메시지 1개당 typing 2개 비율의 인코딩된 Socket.IO 패킷"""
+    packets = []
+    for i in range(count):
+        if i % 3:
+            data = ['typing', {'room_id': f"room_{i % 50:04d}"}]
+        else:
+            text, translated = SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]
+            data = ['new_message', {
+                'message_id': 1234567890123 + i,
+                'client_msg_id': f"c-{i:08d}",
+                'sender_type': 'patient' if i % 2 else 'agent',
+                'text': text,
+                'translated_text': translated,
+                'source_lang': 'ko',
+                'target_lang': 'en',
+            }]
+        # Engine.IO 메시지 타입 접두사('4') 포함
+        packets.append('4' + packet.Packet(packet.EVENT, data=data).encode())
+    return packets
+
+
+def bench_deflate(packets: List[str], connections: int, context_takeover: bool, threshold: int = 0):
+    """
+    permessage-deflate 프레임 페이로드 크기 (RFC 7692: raw deflate, 끝의 00 00 ff ff 제거)
+
+    압축 컨텍스트는 연결마다 따로이므로 패킷을 connections개 연결에 번갈아 나눠 보냅니다.
+    """
+    compressors = [zlib.compressobj(wbits=-15) for _ in range(connections)]
+    total = 0
+    started = time.perf_counter()
+    for i, item in enumerate(packets):
+        data = item.encode('utf-8')
+        if len(data) < threshold:
+            total += len(data)
+            continue
+        if context_takeover:
+            compressor = compressors[i % connections]
+        else:
+            compressor = zlib.compressobj(wbits=-15)
+        compressed = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        total += len(compressed) - 4
+    return time.perf_counter() - started, total
+
+
+def bench_packet_logging(packets: List[str]) -> float:
+    """engineio_logger=True와 같은 형식으로 패킷마다 로그"""
+    log = logging.getLogger("bench.engineio")
+    log.handlers = [logging.StreamHandler(io.StringIO())]
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    started = time.perf_counter()
+    for item in packets:
+        log.info('%s: Sending packet %s data %s', 'sid_0000', 'MESSAGE', item)
+    return time.perf_counter() - started
+
+
+def bench_sampled_metrics(packets: List[str], sample_rate: float) -> float:
+    """production 프로파일의 패킷 집계 + 샘플링 로그"""
+    log = transport.metrics_logger
+    log.handlers = [logging.StreamHandler(io.StringIO())]
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    settings.SOCKET_METRICS_SAMPLE_RATE = sample_rate
+    metrics = SocketMetrics()
+    started = time.perf_counter()
+    for item in packets:
+        metrics.record('sent', item)
+    return time.perf_counter() - started
+
+
+def main(args: argparse.Namespace):
+    packets = _packets(args.packets)
+    raw = sum(len(item.encode('utf-8')) for item in packets)
+    count = len(packets)
+    print(f"# {platform.python_version()} / packets={count} (new_message:typing = 1:2) connections={args.connections}")
+
+    print(f"{'uncompressed':<28} bytes/pkt={raw / count:7.1f}  vs_raw=100.0%")
+    for label, context_takeover, threshold in [
+        ('deflate (context takeover)', True, 0),
+        ('deflate (no takeover)', False, 0),
+        (f'deflate (>= {args.threshold}B)', True, args.threshold),
+    ]:
+        elapsed, total = bench_deflate(packets, args.connections, context_takeover, threshold)
+        print(
+            f"{label:<28} bytes/pkt={total / count:7.1f}  vs_raw={total / raw * 100:5.1f}%  "
+            f"cpu={elapsed / count * 1e6:6.2f}us/pkt"
+        )
+
+    logged = bench_packet_logging(packets)
+    sampled = bench_sampled_metrics(packets, args.sample_rate)
+    print(f"{'packet logging (dev)':<28} cpu={logged / count * 1e6:6.2f}us/pkt")
+    print(f"{f'sampled metrics ({args.sample_rate})':<28} cpu={sampled / count * 1e6:6.2f}us/pkt")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare Socket.IO transport profile costs")
+    parser.add_argument("--packets", type=int, default=20000)
+    parser.add_argument("--connections", type=int, default=200, help="패킷을 나눠 받는 연결 수")
+    parser.add_argument("--threshold", type=int, default=settings.SOCKET_COMPRESSION_THRESHOLD,
+                        help="이보다 작은 패킷은 압축하지 않음 (바이트)")
+    parser.add_argument("--sample-rate", type=float, default=settings.SOCKET_METRICS_SAMPLE_RATE)
+    main(parser.parse_args())
@@ -17,18 +17,26 @@ CREATE INDEX IF NOT EXISTS idx_chat_rooms_created_at ON chat_rooms(created_at DE
 -- 복합 인덱스: 상담사 + 상태 (상담사의 활성 채팅방)
 CREATE INDEX IF NOT EXISTS idx_chat_rooms_agent_status ON chat_rooms(agent_id, status);
 
+-- 미배정 대기 방 (언어별 배정 대기열 재구성)
+CREATE INDEX IF NOT EXISTS idx_chat_rooms_waiting ON chat_rooms(customer_language, created_at)
+    WHERE status = 'waiting' AND agent_id IS NULL;
+
+-- 보관 대상 방 (종료 후 메시지 보관 전)
+CREATE INDEX IF NOT EXISTS idx_chat_rooms_archivable ON chat_rooms(ended_at)
+    WHERE status = 'ended' AND archived_at IS NULL;
+
 -- ============================================
 -- messages 인덱스
 -- ============================================
 
--- 채팅방별 메시지 조회 (가장 빈번한 쿼리)
-CREATE INDEX IF NOT EXISTS idx_messages_room_id ON messages(room_id);
+-- messages는 seq 범위 월별 파티션 테이블 (alembic d2a8c5f17e43)
+-- 파티션 테이블에 만든 인덱스는 모든 파티션에 자동 생성됨
 
--- 시간순 정렬 (메시지 히스토리)
-CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages(created_at DESC);
+-- 복합 인덱스: 채팅방 + seq (채팅 히스토리/이어받기, 가장 빈번한 쿼리)
+CREATE INDEX IF NOT EXISTS idx_messages_room_seq ON messages(room_id, seq);
 
--- 복합 인덱스: 채팅방 + 시간 (채팅 히스토리 조회 최적화)
-CREATE INDEX IF NOT EXISTS idx_messages_room_timestamp ON messages(room_id, created_at DESC);
+-- 시간순 조회 (통계)
+CREATE INDEX IF NOT EXISTS idx_messages_created_at ON messages(created_at);
 
 -- ============================================
 -- agents 인덱스